@@ -0,0 +1,197 @@
+"""Convert many videos, or one long video, in parallel with a process pool.
+
+Every input video is split into time-range segments that are decoded,
+deduplicated and encoded by worker processes. The parent process collects
+each video's segments in order, drops a segment's first slide when it
+repeats the last slide of the previous segment (a slide spanning the split)
+and writes the deck. Segment boundaries sit on the sampling grid, so the
+frames sampled are exactly those of a sequential ``video_file`` run.
+
+    python batch.py course/*.mp4 -o decks/ --workers 8 --segment-minutes 10
+"""
+import argparse
+import collections
+import io
+import math
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from video_file import iter_video_frames, video_info
+from video_to_ppt import VideoToPPT
+
+
+def plan_segments(path, interval, segment_seconds):
+    """Split a video into (start, end) seconds aligned to the sampling grid."""
+    fps, frames = video_info(path)
+    step = max(1, round(interval * fps))
+    if not segment_seconds or frames <= 0:
+        return [(0.0, None)]
+
+    # Whole sampling steps per segment so samples land on the same frames
+    segment_frames = max(1, math.ceil(segment_seconds * fps / step)) * step
+    return [(begin / fps, min(begin + segment_frames, frames) / fps)
+            for begin in range(0, frames, segment_frames)]
+
+
+def configure(app, settings):
+    """Apply conversion settings (a plain dict, so it pickles) to a VideoToPPT."""
+    app.similarity_threshold = settings.get("threshold", app.similarity_threshold)
+    app.image_format = settings.get("format", app.image_format)
+    app.png_compress_level = settings.get("png_compress_level", app.png_compress_level)
+    app.jpeg_quality = settings.get("jpeg_quality", app.jpeg_quality)
+    return app
+
+
+def convert_segment(path, start, end, settings):
+    """Worker: return the slide candidates of one segment.
+
+    Each candidate is (seconds, encoded bytes, features). Every candidate
+    keeps its downscaled frame: the parent compares the next segment's
+    first candidate with whichever of them ends up as the deck's last slide.
+    """
+    app = configure(VideoToPPT(), settings)
+    candidates = []
+    for seconds, frame in iter_video_frames(path, settings.get("interval", 1.0), start, end,
+                                            settings.get("region"), settings.get("seek", False)):
+        features = app.duplicate_detector.features(frame)
+        if app.is_duplicate(frame, features):
+            continue
+        candidates.append((seconds, app.encode_image(frame).getvalue(), features))
+        app.last_features = features
+    return candidates
+
+
+def limit_memory(limit_mb):
+    """Worker initializer: cap the address space of each worker process."""
+    if not limit_mb:
+        return
+    try:
+        import resource
+        limit = int(limit_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Could not set worker memory limit: {e}")
+
+
+class BatchConverter:
+    """Fans video segments out over a process pool and assembles the decks."""
+
+    def __init__(self, workers=None, segment_seconds=600, memory_limit_mb=None, settings=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds  # None or 0 converts each video as one segment
+        self.memory_limit_mb = memory_limit_mb  # Per-worker address space cap (POSIX only)
+        self.settings = dict(settings or {})
+        self.max_pending = 2 * self.workers  # Segment results held before merging
+        self.errors = {}  # Video -> segments that failed, e.g. ["segment 3: ..."]
+
+    def run(self, videos, output_dir=None):
+        """Convert every video and return {video: output path}."""
+        interval = self.settings.get("interval", 1.0)
+        jobs = []
+        for path in videos:
+            output = os.path.splitext(path)[0] + ".pptx"
+            if output_dir:
+                output = os.path.join(output_dir, os.path.basename(output))
+            jobs.append((path, output, plan_segments(path, interval, self.segment_seconds)))
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Spawn rather than fork: OpenCV's decoder threads don't survive a fork
+        context = multiprocessing.get_context("spawn")
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=limit_memory, initargs=(self.memory_limit_mb,)) as pool:
+            # Segments are submitted in order across all videos so the pool
+            # stays busy, but only a bounded window of finished-but-unmerged
+            # results is held in memory at once
+            pending = collections.deque()
+            for path, output, segments in jobs:
+                job = {"path": path, "output": output, "segments": len(segments), "started": None,
+                       "app": configure(VideoToPPT(), self.settings)}
+                job["app"].new_presentation()
+                for index, (start, end) in enumerate(segments):
+                    future = pool.submit(convert_segment, path, start, end, self.settings)
+                    pending.append((job, index, future))
+                    if len(pending) >= self.max_pending:
+                        self.finish_segment(results, *pending.popleft())
+            while pending:
+                self.finish_segment(results, *pending.popleft())
+        return results
+
+    def finish_segment(self, results, job, index, future):
+        """Merge one segment's result and write the deck after its last segment."""
+        app, output = job["app"], job["output"]
+        if job["started"] is None:
+            job["started"] = time.time()
+        try:
+            self.merge_segment(app, future.result(), output)
+        except Exception as e:
+            print(f"Error converting {job['path']} segment {index + 1}: {e}")
+            traceback.print_exc()
+            self.errors.setdefault(job["path"], []).append(f"segment {index + 1}: {e}")
+
+        if index == job["segments"] - 1:
+            if app.captures:
+                app.saver.save(app.ppt, output)
+                # A deck missing a segment's slides is kept, but not reported as converted
+                if job["path"] not in self.errors:
+                    results[job["path"]] = output
+            print(f"{os.path.basename(job['path'])}: {job['segments']} segment(s), "
+                  f"{len(app.captures)} slides -> {output} ({time.time() - job['started']:.1f} s)")
+            if job["path"] in self.errors:
+                print(f"ERROR: {output} is incomplete - {len(self.errors[job['path']])} segment(s) failed")
+
+    def merge_segment(self, app, candidates, output):
+        """Append one segment's candidates, deduplicating across the boundary."""
+        for index, (seconds, encoded, features) in enumerate(candidates):
+            # Within a segment the worker already compared each candidate
+            # with the one before it; only the first needs a fresh check
+            if index == 0 and app.last_features is not None:
+                result = app.duplicate_detector.compare(features, app.last_features)
+                if result.is_duplicate:
+                    continue
+            # Workers only see their own segment; earlier slides live in the deck index
+            if app.deck_wide_dedup and app.slide_index.find(features):
+                continue
+            app.add_encoded_to_presentation(io.BytesIO(encoded), features)
+            app.capture_count += 1
+            if app.capture_count % app.save_interval == 0:
+                app.saver.save(app.ppt, output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert video files into PowerPoint decks in parallel.")
+    parser.add_argument("videos", nargs="+", help="input video files")
+    parser.add_argument("-o", "--output-dir", help="directory for the decks (default: next to each video)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--segment-minutes", type=float, default=10.0,
+                        help="split videos into segments of this length (0 = no splitting)")
+    parser.add_argument("--memory-limit-mb", type=float, help="address space limit per worker")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between sampled frames")
+    parser.add_argument("--region", help="crop as left,top,right,bottom")
+    parser.add_argument("--seek", action="store_true", help="seek to each sample instead of grabbing through")
+    parser.add_argument("--threshold", type=float, default=0.85, help="SSIM similarity threshold for duplicates")
+    parser.add_argument("--format", default="PNG", choices=["PNG", "JPEG"], help="image codec for slides")
+    args = parser.parse_args()
+
+    settings = {
+        "interval": args.interval,
+        "region": tuple(map(int, args.region.split(","))) if args.region else None,
+        "seek": args.seek,
+        "threshold": args.threshold,
+        "format": args.format,
+    }
+    converter = BatchConverter(args.workers, args.segment_minutes * 60, args.memory_limit_mb, settings)
+    results = converter.run(args.videos, args.output_dir)
+    for path, errors in converter.errors.items():
+        print(f"Failed: {path} ({'; '.join(errors)})", file=sys.stderr)
+    sys.exit(0 if len(results) == len(args.videos) else 1)
+
+
+if __name__ == "__main__":
+    main()
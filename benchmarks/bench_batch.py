@@ -0,0 +1,72 @@
+"""Parallel batch conversion vs. a sequential run on generated videos.
+
+Converts the same synthetic videos with ``video_file.video_to_deck`` one
+after another and with ``batch.BatchConverter`` at each worker count,
+checking that every run produces the same slides.
+
+    python benchmarks/bench_batch.py --videos 4 --workers 1,2,4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from batch import BatchConverter
+from bench_video_file import write_slide_video
+from video_file import video_to_deck
+
+
+def slide_hashes(path):
+    return [slide.shapes[-1].image.sha1 for slide in Presentation(path).slides]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=4)
+    parser.add_argument("--slides", type=int, default=12, help="slides per video")
+    parser.add_argument("--hold", type=float, default=10.0, help="seconds per slide")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--segment-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = []
+        for index in range(args.videos):
+            video = os.path.join(tmp, f"module{index + 1}.mp4")
+            write_slide_video(video, args.slides, args.hold, 30, width, height)
+            videos.append(video)
+
+        decks = {video: os.path.join(tmp, os.path.basename(video) + ".sequential.pptx") for video in videos}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for video in videos:
+                video_to_deck(video, decks[video])
+        sequential = time.perf_counter() - start
+        expected = {video: slide_hashes(deck) for video, deck in decks.items()}
+        print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8} {'same slides':>12}")
+        print(f"{'seq':>8} {sequential:>9.1f} {1.0:>8.2f} {'-':>12}")
+
+        for workers in map(int, args.workers.split(",")):
+            output_dir = os.path.join(tmp, f"workers{workers}")
+            converter = BatchConverter(workers, args.segment_seconds)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = converter.run(videos, output_dir)
+            elapsed = time.perf_counter() - start
+            same = all(slide_hashes(results[video]) == expected[video] for video in videos)
+            print(f"{workers:>8} {elapsed:>9.1f} {sequential / elapsed:>8.2f} {str(same):>12}")
+
+    print(f"({os.cpu_count()} CPU cores available)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Grabs per second and bytes allocated per frame for each capture backend.
+
+Each frame goes through what ``capture_loop`` does for every grab: grab
+the region, compute the duplicate detector's features and feed the
+slide-change detector. Allocations are counted two ways: the pixel memory
+of every image Pillow allocates (Pillow's own allocator is invisible to
+tracemalloc), and the peak of everything tracemalloc sees (NumPy arrays,
+bytes) during the frame.
+
+Without ``--screen`` the screen is emulated, so the numbers don't depend on
+a display: ``pillow`` stands for X11's ``ImageGrab.grab`` (the whole
+screen as BGRX bytes, converted to RGB, then cropped) and ``buffer`` for a
+region grab handing over BGRX bytes. With ``--screen`` both grab the real
+display (an X server or Xvfb, or mss).
+
+    python benchmarks/bench_capture.py --frames 300
+    python benchmarks/bench_capture.py --screen
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import capture
+from dedup import DuplicateDetector
+from scene import SlideChangeDetector
+
+PIXEL_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2}  # Pillow stores every other mode at 4 bytes a pixel
+
+
+class PillowAllocations:
+    """Adds up the pixel memory of the images Pillow allocates."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.mapping = False
+        self.new = Image.Image._new
+        self.frombuffer = Image.frombuffer
+
+    def __enter__(self):
+        counter = self
+
+        def new(image, im):
+            if not counter.mapping:
+                counter.bytes += im.size[0] * im.size[1] * PIXEL_BYTES.get(im.mode, 4)
+            return counter.new(image, im)
+
+        def frombuffer(*args, **kwargs):
+            # Shares the caller's memory instead of allocating
+            counter.mapping = True
+            try:
+                return counter.frombuffer(*args, **kwargs)
+            finally:
+                counter.mapping = False
+
+        Image.Image._new = new
+        Image.frombuffer = frombuffer
+        return self
+
+    def __exit__(self, *exc):
+        Image.Image._new = self.new
+        Image.frombuffer = self.frombuffer
+
+
+def emulated_screen(width, height):
+    rng = np.random.default_rng(0)
+    screen = np.full((height, width, 4), 240, np.uint8)
+    screen[height // 8:-height // 8, width // 8:-width // 8, :3] = rng.integers(
+        0, 255, (height - 2 * (height // 8), width - 2 * (width // 8), 3), np.uint8)
+    return screen
+
+
+def emulated_pillow(screen):
+    height, width = screen.shape[:2]
+
+    def grab(bbox=None, **kwargs):
+        # What ImageGrab does on X11: the whole screen, converted, then cropped
+        image = Image.frombytes("RGB", (width, height), screen.tobytes(), "raw", "BGRX")
+        return image.crop(bbox) if bbox else image
+    return grab
+
+
+def emulated_source(screen):
+    class Source:
+        def screen_box(self):
+            return (0, 0, screen.shape[1], screen.shape[0])
+
+        def grab(self, left, top, width, height):
+            return screen[top:top + height, left:left + width].tobytes(), (width, height)
+
+        def close(self):
+            pass
+    return Source
+
+
+def make_backend(name, args):
+    if name == "pillow":
+        if not args.screen:
+            ImageGrab.grab = emulated_pillow(emulated_screen(args.screen_width, args.screen_height))
+        return capture.PillowBackend()
+    if args.screen:
+        return capture.ScreenBackend()
+    return capture.ScreenBackend(source_class=emulated_source(emulated_screen(args.screen_width, args.screen_height)))
+
+
+def run(name, args):
+    backend = make_backend(name, args)
+    detector = DuplicateDetector()
+    changes = SlideChangeDetector(detector)
+    left, top = (args.screen_width - args.width) // 2, (args.screen_height - args.height) // 2
+    bbox = (left, top, left + args.width, top + args.height)
+
+    def frame(index):
+        image = backend.grab(bbox)
+        changes.feed(index * 0.1, image, detector.features(image))
+
+    for index in range(5):  # Warm up: imports, buffers
+        frame(index)
+
+    start = time.perf_counter()
+    for index in range(args.frames):
+        frame(index)
+    rate = args.frames / (time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    with PillowAllocations() as pillow:
+        for index in range(args.frames // 4):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            frame(index)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    backend.close()
+    return rate, pillow.bytes / (args.frames // 4), float(np.mean(peaks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280, help="capture region width")
+    parser.add_argument("--height", type=int, default=720, help="capture region height")
+    parser.add_argument("--screen-width", type=int, default=1920)
+    parser.add_argument("--screen-height", type=int, default=1080)
+    parser.add_argument("--screen", action="store_true", help="grab the real display")
+    args = parser.parse_args()
+
+    print(f"{'backend':>8}  {'grabs/s':>7}  {'Pillow MB/frame':>15}  {'traced MB/frame':>15}")
+    for name in ("pillow", "buffer"):
+        try:
+            rate, pillow_bytes, traced = run(name, args)
+        except (ImportError, OSError) as e:
+            print(f"{name:>8}  unavailable: {e}")
+            continue
+        print(f"{name:>8}  {rate:7.1f}  {pillow_bytes / 1e6:15.2f}  {traced / 1e6:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""End-to-end run of the control daemon with concurrent clients.
+
+Starts ``control.ControlServer`` on a temporary Unix socket, with every
+session grabbing synthetic slides through the file capture backend (a
+new slide per grab, though ``--repeat`` of them show the previous slide
+again and share its picture). ``--clients`` client threads then each
+switch to one of ``--decks`` decks, send ``--captures`` captures, flush
+and ask for stats. Reports round-trip latency percentiles per command and
+captures per second, and checks that each deck ends up with exactly the
+slides its clients added (queued captures are dropped while the capture
+queue is full).
+
+    python benchmarks/bench_control.py --clients 4 --decks 2 --captures 50
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from pptx import Presentation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_video_file import slide_frame
+from control import ControlClient, ControlServer
+
+
+class SlideSource:
+    """Callable source for the file backend: a new slide per grab, sometimes the same one again."""
+
+    def __init__(self, width, height, repeat, seed):
+        self.width, self.height = width, height
+        self.repeat = repeat
+        self.rng = np.random.default_rng(seed)
+        self.index = seed * 100000
+        self.lock = threading.Lock()
+
+    def __call__(self, bbox):
+        with self.lock:
+            if self.rng.random() >= self.repeat:
+                self.index += 1
+            return slide_frame(self.index, self.width, self.height)
+
+
+def client(args, socket_path, deck, captures, latencies, results):
+    connection = ControlClient(socket_path)
+    connection.call("switch-deck", deck=deck)
+    added = 0
+    for _ in range(captures):
+        start = time.perf_counter()
+        reply = connection.call("capture", wait=args.wait)
+        latencies["capture"].append(time.perf_counter() - start)
+        added += bool(reply.get("added", reply.get("queued")))
+    for command in ("flush", "stats"):
+        start = time.perf_counter()
+        results.append((deck, command, connection.call(command)))
+        latencies[command].append(time.perf_counter() - start)
+    connection.close()
+    results.append((deck, "added", added))
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--decks", type=int, default=2)
+    parser.add_argument("--captures", type=int, default=50, help="per client")
+    parser.add_argument("--repeat", type=float, default=0.2, help="share of grabs showing the previous slide")
+    parser.add_argument("--queued", dest="wait", action="store_false",
+                        help="queue captures like key presses instead of waiting for each")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "control.sock")
+        decks = [os.path.join(tmp, f"deck{number + 1}.pptx") for number in range(args.decks)]
+        sources = iter(range(1, 1000))
+
+        def configure(app):
+            app.capture_backend = "file"
+            app.capture_source = SlideSource(args.width, args.height, args.repeat, next(sources))
+            app.video_region = (0, 0, args.width, args.height)
+            app.deck_wide_dedup = False
+
+        server = ControlServer(decks[0], configure)
+        ready = threading.Event()
+        output = io.StringIO()
+
+        def serve():
+            with contextlib.redirect_stdout(output):
+                asyncio.run(server.serve(socket_path, ready=ready))
+        thread = threading.Thread(target=serve)
+        thread.start()
+        ready.wait()
+
+        latencies = {"capture": [], "flush": [], "stats": []}
+        results = []
+        threads = [threading.Thread(target=client, args=(args, socket_path, decks[number % args.decks],
+                                                         args.captures, latencies, results))
+                   for number in range(args.clients)]
+        start = time.perf_counter()
+        for worker in threads:
+            worker.start()
+        for worker in threads:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        ControlClient(socket_path).call("shutdown")
+        thread.join()
+
+        print(f"{args.clients} clients on {args.decks} deck(s), {args.captures} captures each "
+              f"({'waiting for each' if args.wait else 'queued'}): "
+              f"{args.clients * args.captures / elapsed:.1f} captures/s")
+        print(f"{'command':>8} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+        for command, values in latencies.items():
+            print(f"{command:>8} {len(values):>6} {percentile(values, 0.5) * 1000:>8.1f} "
+                  f"{percentile(values, 0.9) * 1000:>8.1f} {percentile(values, 0.99) * 1000:>8.1f}")
+
+        errors = [reply for _, command, reply in results if command != "added" and not reply.get("ok")]
+        for deck in decks:
+            slides = len(Presentation(deck).slides)
+            added = sum(count for name, command, count in results if name == deck and command == "added")
+            status = "ok" if slides == added and not errors else "MISMATCH"
+            print(f"{os.path.basename(deck)}: {slides} slides saved, {added} captures added - {status}")
+        for reply in errors:
+            print(f"error: {reply.get('error')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Duplicate-detection throughput per tier at common capture resolutions.
+
+Each tier is timed on a frame pair that it settles, including the cost of
+computing the new frame's features, and compared with the old approach
+(SSIM over the full-resolution RGB arrays).
+
+    python benchmarks/bench_dedup.py --resolutions 720p,1080p,4k
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+from skimage.metrics import structural_similarity as ssim
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dedup import DuplicateDetector
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+
+
+def slide(size, title, bullets, seed=0):
+    """Synthetic lecture slide: title, bullet lines and a noisy picture block."""
+    width, height = size
+    image = Image.new("RGB", size, (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    unit = height // 20
+    draw.rectangle((0, 0, width, 2 * unit), fill=(30, 60, 120))
+    draw.rectangle((unit, unit // 2, unit + len(title) * unit // 2, unit * 3 // 2), fill=(240, 240, 240))
+    for line in range(bullets):
+        y = 4 * unit + line * 2 * unit
+        draw.rectangle((2 * unit, y, 2 * unit + (width // 3) * (1 + line % 3) // 3, y + unit), fill=(40, 40, 40))
+    noise = np.random.default_rng(seed).integers(0, 255, (height // 3, width // 3, 3), np.uint8)
+    image.paste(Image.fromarray(noise), (width // 2, height // 2))
+    return image
+
+
+def per_second(func, min_time=1.0):
+    """Calls per second of ``func``, measured for at least ``min_time``."""
+    count, start = 0, time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and count >= 3:
+            return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", default="720p,1080p,4k")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'resolution':>10} {'tier':>12} {'decision':>9} {'fps':>9}")
+    for name in args.resolutions.split(","):
+        size = RESOLUTIONS[name.lower()]
+        base = slide(size, "Lecture title", 3)
+        pairs = {
+            "hash": (base, base.copy()),  # Unchanged frame
+            "ssim": (base, slide(size, "Lecture title", 4)),  # One new bullet
+            "full": (base, slide(size, "Lecture title", 4)),
+        }
+
+        for tier, (last_image, new_image) in pairs.items():
+            detector = DuplicateDetector()
+            detector.full_resolution_check = tier == "full"
+            detector.full_margin = 1.0 if tier == "full" else detector.full_margin
+            last = detector.features(last_image)
+            result = detector.compare(detector.features(new_image), last)
+            assert result.tier == tier, f"{tier} pair was decided by {result.tier}"
+            fps = per_second(lambda: detector.compare(detector.features(new_image), last), args.min_time)
+            decision = "dup" if result.is_duplicate else "new"
+            print(f"{name:>10} {tier:>12} {decision:>9} {fps:>9.1f}")
+
+        # The original check: SSIM over full-resolution RGB arrays
+        last_array = np.array(base)
+        new_image = pairs["ssim"][1]
+        fps = per_second(lambda: ssim(np.array(new_image), last_array, channel_axis=2), args.min_time)
+        print(f"{name:>10} {'legacy rgb':>12} {'':>9} {fps:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-capture save cost: journal with periodic deck saves vs. a deck save per capture.
+
+Runs ``VideoToPPT`` end to end with the screen grab stubbed out and counts
+the time and the bytes written to disk (from /proc/self/io on Linux) for
+three durability strategies:
+
+- full:    rewrite the whole deck after every capture (the original code)
+- append:  append each capture to the deck in place
+- journal: append each capture to the journal, fsync in batches, and
+           write the deck every ``materialize_every`` captures and at exit
+
+    python benchmarks/bench_journal.py --captures 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+from bench_memory import make_grabber
+
+
+def written_bytes():
+    """Bytes this process has caused to be written to storage, or None."""
+    try:
+        with open("/proc/self/io") as status:
+            for line in status:
+                if line.startswith("write_bytes:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run(strategy, args):
+    ImageGrab.grab = make_grabber(args.width, args.height)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.video_region = (0, 0, args.width, args.height)
+        app.deck_wide_dedup = False
+        app.rollover_slides = app.rollover_mb = 0  # Measure one growing deck
+        app.journal_enabled = strategy == "journal"
+        app.incremental_save = strategy != "full"
+        app.materialize_every = args.materialize_every
+        before = written_bytes()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.captures):
+                app.toggle_capture()
+            app.shutdown()
+        elapsed = time.perf_counter() - start
+        after = written_bytes()
+        deck_mb = os.path.getsize("Introduction Module1.pptx") / 1e6
+        os.chdir(os.path.dirname(tmp))
+    written_mb = (after - before) / 1e6 if before is not None else float("nan")
+    return elapsed, written_mb, deck_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--captures", type=int, default=200)
+    parser.add_argument("--strategies", default="full,append,journal")
+    parser.add_argument("--materialize-every", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+
+    print(f"{'strategy':>8} {'ms/capture':>11} {'written MB':>11} {'MB/capture':>11} {'deck MB':>8}")
+    for strategy in args.strategies.split(","):
+        elapsed, written_mb, deck_mb = run(strategy, args)
+        print(f"{strategy:>8} {elapsed / args.captures * 1000:>11.1f} {written_mb:>11.1f} "
+              f"{written_mb / args.captures:>11.2f} {deck_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
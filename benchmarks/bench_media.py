@@ -0,0 +1,80 @@
+"""Deck size and capture time with and without the content-addressed media store.
+
+Runs ``VideoToPPT`` end to end with the screen grab stubbed out. A share
+of the manual captures repeats the previous frame exactly (double key
+presses, a paused video). With ``share_media`` those slides reuse the
+existing picture without encoding it again; without it python-pptx's
+``add_picture`` still finds the identical bytes, but only after encoding
+the frame and scanning the package.
+
+    python benchmarks/bench_media.py --captures 300 --repeat 0.3
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+
+
+def make_grabber(width, height, repeat, seed=0):
+    """Grab stub: a new frame each call, except that ``repeat`` of them equal the previous one."""
+    rng = np.random.default_rng(seed)
+    base = np.full((height, width, 3), 245, np.uint8)
+    base[height // 6:-height // 6, width // 10:-width // 10] = rng.integers(
+        200, 232, (height - 2 * (height // 6), width - 2 * (width // 10), 3), np.uint8)
+    state = {"count": 0, "frame": None}
+
+    def grab(bbox=None, **kwargs):
+        if state["frame"] is None or rng.random() >= repeat:
+            state["count"] += 1
+            frame = base.copy()
+            frame[20:60, 20:20 + state["count"] % (width - 40)] = (state["count"] * 37) % 255
+            state["frame"] = Image.fromarray(frame)
+        return state["frame"].copy()
+    return grab
+
+
+def run(share_media, args):
+    ImageGrab.grab = make_grabber(args.width, args.height, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.share_media = share_media
+        app.video_region = (0, 0, args.width, args.height)
+        app.rollover_slides = app.rollover_mb = 0  # Measure one growing deck
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.captures):
+                app.toggle_capture()
+            app.shutdown()
+        elapsed = time.perf_counter() - start
+        deck_mb = os.path.getsize("Introduction Module1.pptx") / 1e6
+        os.chdir(os.path.dirname(tmp))
+    return elapsed, deck_mb, app.media.shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--captures", type=int, default=300)
+    parser.add_argument("--repeat", type=float, default=0.3, help="share of captures repeating the last frame")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+
+    print(f"{'share_media':>11} {'total s':>8} {'ms/capture':>11} {'deck MB':>8} {'shared':>7}")
+    for share_media in (False, True):
+        elapsed, deck_mb, shared = run(share_media, args)
+        print(f"{str(share_media):>11} {elapsed:>8.1f} {elapsed / args.captures * 1000:>11.1f} "
+              f"{deck_mb:>8.1f} {shared:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Resident memory across a long synthetic capture session.
+
+Runs ``VideoToPPT`` end to end with the screen grab stubbed out and prints
+RSS as captures accumulate. RSS should level off after the first few
+captures instead of growing with every slide.
+
+    python benchmarks/bench_memory.py --captures 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def make_grabber(width, height):
+    rng = np.random.default_rng(0)
+    base = np.full((height, width, 3), 245, np.uint8)
+    base[height // 6:-height // 6, width // 10:-width // 10] = rng.integers(
+        200, 232, (height - 2 * (height // 6), width - 2 * (width // 10), 3), np.uint8)
+    count = [0]
+
+    def grab(bbox=None, **kwargs):
+        count[0] += 1
+        frame = base.copy()
+        frame[20:60, 20:20 + count[0] % (width - 40)] = (count[0] * 37) % 255
+        return Image.fromarray(frame)
+    return grab
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--captures", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--every", type=int, default=100, help="report interval")
+    args = parser.parse_args()
+
+    ImageGrab.grab = make_grabber(args.width, args.height)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.video_region = (0, 0, args.width, args.height)
+        app.rollover_slides = app.rollover_mb = 0  # Measure one growing deck
+
+        print(f"{'captures':>9} {'RSS (MB)':>9}")
+        print(f"{0:>9} {rss_mb():>9.1f}")
+        for index in range(1, args.captures + 1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                app.toggle_capture()
+            if index % args.every == 0:
+                print(f"{index:>9} {rss_mb():>9.1f}")
+        deck_mb = os.path.getsize("Introduction Module1.pptx") / 1e6
+        print(f"deck size: {deck_mb:.1f} MB")
+        os.chdir(os.path.dirname(tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Deck size and run time of optimize_deck.py on a deck of oversized captures.
+
+Builds a deck the way live capture does from a 4K region that isn't 16:9
+(3840x2400 by default), each slide a distinct slide-like frame with a
+little noise, as grabbed from a compressed video stream, then optimizes it for a 1920-pixel display with each worker count.
+
+    python benchmarks/bench_optimize.py --slides 20 --workers 1,2,4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+from bench_video_file import slide_frame
+from optimize_deck import DeckOptimizer
+
+
+def captured_frame(index, width, height, noise):
+    frame = slide_frame(index, width, height)[:, :, ::-1]
+    if noise:
+        rng = np.random.default_rng(index)
+        frame = np.clip(frame + rng.integers(-noise, noise + 1, frame.shape), 0, 255).astype(np.uint8)
+    return Image.fromarray(frame)
+
+
+def build_deck(path, slides, width, height, noise):
+    app = video_to_ppt.VideoToPPT()
+    app.deck_wide_dedup = False
+    app.new_presentation()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(slides):
+            app.add_to_presentation(captured_frame(index, width, height, noise))
+    app.ppt.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--width", type=int, default=3840, help="capture width")
+    parser.add_argument("--height", type=int, default=2400, help="capture height")
+    parser.add_argument("--noise", type=int, default=2, help="capture noise, in grey levels")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--format", default="keep")
+    parser.add_argument("--max-kb", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = os.path.join(tmp, "deck.pptx")
+        build_deck(deck, args.slides, args.width, args.height, args.noise)
+        before = os.path.getsize(deck)
+        print(f"{args.slides} slides of {args.width}x{args.height}: {before / 1e6:.1f} MB")
+        print(f"{'workers':>7} {'seconds':>8} {'slides/s':>9} {'MB':>6} {'smaller':>8}")
+        for workers in map(int, args.workers.split(",")):
+            output = os.path.join(tmp, f"optimized-{workers}.pptx")
+            optimizer = DeckOptimizer(workers, image_format=args.format, max_kb=args.max_kb)
+            start = time.perf_counter()
+            optimizer.run(deck, output)
+            elapsed = time.perf_counter() - start
+            after = os.path.getsize(output)
+            print(f"{workers:>7} {elapsed:>8.2f} {args.slides / elapsed:>9.1f} {after / 1e6:>6.1f} "
+                  f"{(1 - after / before) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
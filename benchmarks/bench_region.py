@@ -0,0 +1,57 @@
+"""Region detection latency and accuracy: pyramid detector vs. full resolution.
+
+Runs both detectors on the synthetic desktop fixtures and reports time and
+intersection-over-union with the true player rectangle.
+
+    python benchmarks/bench_region.py --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from desktop_fixtures import fixture_set, iou
+from video_to_ppt import VideoToPPT
+
+
+def timed(func, screen, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(screen)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per fixture (best time is kept)")
+    args = parser.parse_args()
+
+    app = VideoToPPT()
+    detectors = {"full": app.auto_detect_video_full, "pyramid": app.region_detector.detect}
+    totals = {name: [0.0, 0.0] for name in detectors}
+
+    print(f"{'fixture':>16} " + " ".join(f"{name + ' ms':>11} {name + ' IoU':>11}" for name in detectors))
+    fixtures = list(fixture_set())
+    for name, image, truth in fixtures:
+        row = [f"{name:>16}"]
+        for detector, func in detectors.items():
+            ms, region = timed(func, image, args.repeat)
+            overlap = iou(region, truth)
+            totals[detector][0] += ms
+            totals[detector][1] += overlap
+            row.append(f"{ms:>11.1f} {overlap:>11.2f}")
+        print(" ".join(row))
+    count = len(fixtures)
+    print(f"{'mean':>16} " + " ".join(f"{ms / count:>11.1f} {overlap / count:>11.2f}"
+                                      for ms, overlap in totals.values()))
+
+
+if __name__ == "__main__":
+    main()
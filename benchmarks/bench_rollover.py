@@ -0,0 +1,88 @@
+"""Deck save and reload time over a long session: one deck vs. part files.
+
+Runs ``VideoToPPT`` end to end with the screen grab stubbed out, journaling
+captures and writing the deck every ``materialize_every`` captures, once
+with rollover off (one ever-growing deck) and once starting a new part
+every ``rollover_slides`` slides. Reports the mean deck save time per
+bucket of captures, and how long a restart takes to load the deck it
+continues in (the whole session, or just the last part).
+
+    python benchmarks/bench_rollover.py --captures 1500 --rollover 300
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+from bench_memory import make_grabber
+
+
+def save_seconds(app):
+    stats = app.metrics.stages.get("save")
+    return stats.total if stats else 0.0
+
+
+def run(rollover, args):
+    ImageGrab.grab = make_grabber(args.width, args.height)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.video_region = (0, 0, args.width, args.height)
+        app.deck_wide_dedup = False
+        app.rollover_slides, app.rollover_mb = rollover, 0
+        app.materialize_every = args.materialize_every
+        app.metrics.slow_log_path = os.devnull
+        buckets = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(args.captures):
+                if index % args.bucket == 0:
+                    buckets.append(save_seconds(app))
+                app.toggle_capture()
+            app.shutdown()
+        buckets.append(save_seconds(app))
+        # Seconds of saving done within each bucket of captures
+        per_bucket = [end - start for start, end in zip(buckets, buckets[1:])]
+        parts = len(app.deck_parts.parts)
+
+        restart = video_to_ppt.VideoToPPT()
+        restart.metrics.enabled = False
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            restart.initialize_ppt()
+        reload = time.perf_counter() - start
+        slides = len(restart.ppt.slides)
+        os.chdir(os.path.dirname(tmp))
+    return per_bucket, buckets[-1], reload, parts, slides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--captures", type=int, default=1500)
+    parser.add_argument("--rollover", type=int, default=300, help="slides per part")
+    parser.add_argument("--bucket", type=int, default=300, help="captures per row of save times")
+    parser.add_argument("--materialize-every", type=int, default=20)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    args = parser.parse_args()
+
+    results = {label: run(rollover, args) for label, rollover in (("one deck", 0), ("parts", args.rollover))}
+    print(f"{'captures':>11} " + " ".join(f"{label + ' s':>10}" for label in results))
+    for row in range(len(results["one deck"][0])):
+        first = row * args.bucket
+        label = f"{first + 1}-{min(first + args.bucket, args.captures)}"
+        print(f"{label:>11} " + " ".join(f"{result[0][row]:>10.2f}" for result in results.values()))
+    print(f"{'total save':>11} " + " ".join(f"{result[1]:>10.2f}" for result in results.values()))
+    print(f"{'reload':>11} " + " ".join(f"{result[2]:>10.2f}" for result in results.values()))
+    for label, (_, _, _, parts, slides) in results.items():
+        print(f"{label}: {parts} part file(s), restart continues in one with {slides} slides")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Per-capture save time: full rewrite vs. append-only saving.
+
+Builds a deck slide by slide and, at each checkpoint size, times saving one
+more capture with ``Presentation.save`` and with ``IncrementalSaver``.
+
+    python benchmarks/bench_save.py --sizes 10,100,1000
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from incremental_save import IncrementalSaver
+
+
+def synthetic_capture(index, base):
+    """Slide-like PNG that differs per index (identical images would be shared)."""
+    frame = base.copy()
+    frame[40:80, 40:40 + (index % 600) + 1] = (index * 37) % 255
+    buffer = io.BytesIO()
+    Image.fromarray(frame).save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def add_slide(prs, picture):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_picture(picture, 0, 0, prs.slide_width, prs.slide_height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated deck sizes")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    rng = np.random.default_rng(0)
+    base = np.full((args.height, args.width, 3), 245, np.uint8)
+    base[120:-120, 80:-80] = rng.integers(0, 255, (args.height - 240, args.width - 160, 3), np.uint8) // 8 + 200
+
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.33), Inches(7.5)
+    saver = IncrementalSaver(compact_ratio=float("inf"))  # Measure pure appends
+
+    with tempfile.TemporaryDirectory() as tmp:
+        full_path = os.path.join(tmp, "full.pptx")
+        append_path = os.path.join(tmp, "append.pptx")
+
+        print(f"{'slides':>7} {'full save (ms)':>15} {'append save (ms)':>17} {'deck (MB)':>10}")
+        count = 0
+        for size in sizes:
+            # Grow the deck up to one below the checkpoint, appending as we go
+            while count < size - 1:
+                add_slide(prs, synthetic_capture(count, base))
+                saver.save(prs, append_path)
+                count += 1
+
+            add_slide(prs, synthetic_capture(count, base))
+            count += 1
+
+            start = time.perf_counter()
+            saver.save(prs, append_path)
+            append_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            prs.save(full_path)
+            full_ms = (time.perf_counter() - start) * 1000
+
+            deck_mb = os.path.getsize(full_path) / 1e6
+            print(f"{size:>7} {full_ms:>15.1f} {append_ms:>17.1f} {deck_mb:>10.1f}")
+
+        # The appended file must still open as a normal deck
+        assert len(Presentation(append_path).slides) == count
+
+
+if __name__ == "__main__":
+    main()
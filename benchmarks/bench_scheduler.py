@@ -0,0 +1,85 @@
+"""Grabs and missed slides: fixed 10 Hz capture vs. the adaptive scheduler.
+
+Runs ``VideoToPPT.capture_loop`` on a scripted lecture (see
+``synthetic_session``) under a fake clock, so a session of several minutes
+takes seconds and every run sees exactly the same frames. The session
+mixes a few long-held slides, a stretch of talking head, a burst of rapid
+slide flips and a long static slide.
+
+    python benchmarks/bench_scheduler.py --grab-cost 0.02
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import ImageGrab
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import video_to_ppt
+from scheduler import CaptureScheduler
+from synthetic_session import FakeClock, SyntheticScreen
+
+SESSION = [
+    ("slides", 30, 3),
+    ("talking", 120),
+    ("slides", 12, 12),
+    ("slides", 60, 1),
+    ("slides", 20, 4),
+]
+
+
+def run(mode, args):
+    clock = FakeClock()
+    screen = SyntheticScreen(clock, SESSION, args.width, args.height, grab_cost=args.grab_cost)
+    ImageGrab.grab = screen.grab
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.video_region = (0, 0, args.width, args.height)
+        app.scheduler = CaptureScheduler(clock.time, clock.sleep)
+        if mode == "fixed":
+            app.scheduler.min_interval = app.scheduler.max_interval = 0.1
+            app.scheduler.cpu_budget = 1.0
+        app.start_time = clock.time()
+        app.max_capture_time = screen.duration
+        app.running = True
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            app.capture_loop()
+            app.shutdown()
+        elapsed = time.perf_counter() - start
+        os.chdir(os.path.dirname(tmp))
+    scheduler = app.scheduler
+    return {
+        "grabs": screen.grabs,
+        "per_min": screen.grabs / (screen.duration / 60),
+        "slides": app.capture_count,
+        "expected": screen.slide_count,
+        "skipped": scheduler.skipped,
+        "dropped": scheduler.dropped,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--grab-cost", type=float, default=0.02,
+                        help="fake seconds each grab takes")
+    args = parser.parse_args()
+
+    print(f"{'mode':>8}  {'grabs':>6}  {'grabs/min':>9}  {'slides':>9}  {'skipped':>7}  {'dropped':>7}  {'real s':>6}")
+    for mode in ("fixed", "adaptive"):
+        result = run(mode, args)
+        print(f"{mode:>8}  {result['grabs']:6d}  {result['per_min']:9.0f}  "
+              f"{result['slides']:4d}/{result['expected']:<4d}  {result['skipped']:7d}  "
+              f"{result['dropped']:7d}  {result['seconds']:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Deck-wide duplicate lookup latency: multi-index hash vs. a linear scan.
+
+Builds an index of synthetic slide fingerprints - lectures are runs of
+similar slides (same template, a bullet more or less), so hashes come in
+tight clusters - and times lookups of near-copies and of unseen slides.
+
+    python benchmarks/bench_slide_index.py --slides 1000,5000,20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dedup import hamming
+from slide_index import SlideIndex
+
+
+class Features:
+    """Just what the index reads from dedup.FrameFeatures."""
+
+    def __init__(self, fingerprint, thumbnail):
+        self.fingerprint = fingerprint
+        self.thumbnail = thumbnail
+
+
+def flip_bits(value, bits, rng):
+    for bit in rng.choice(64, bits, replace=False):
+        value ^= 1 << int(bit)
+    return value
+
+
+def synthetic_deck(count, rng, cluster_size=20):
+    """Fingerprints in clusters of slides that differ by a few bits from a template."""
+    features = []
+    while len(features) < count:
+        template = int(rng.integers(0, 2 ** 63)) | int(rng.integers(0, 2)) << 63
+        for _ in range(min(cluster_size, count - len(features))):
+            value = flip_bits(template, int(rng.integers(8, 20)), rng)
+            features.append(Features(value, rng.integers(0, 255, (18, 32), np.uint8)))
+    return features
+
+
+def timed(func, queries):
+    """Per-query latencies in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", default="1000,5000,20000")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'slides':>7} {'query':>8} {'method':>7} {'mean ms':>9} {'p99 ms':>9} {'found':>6}")
+    for count in map(int, args.slides.split(",")):
+        deck = synthetic_deck(count, rng)
+        index = SlideIndex()
+        start = time.perf_counter()
+        for number, features in enumerate(deck):
+            index.insert((number, 0), features.fingerprint, features.thumbnail.tobytes())
+        build = time.perf_counter() - start
+
+        picks = rng.choice(count, args.queries)
+        queries = {
+            # A slide shown again: a couple of bits of capture noise
+            "repeat": [Features(flip_bits(deck[i].fingerprint, 2, rng), deck[i].thumbnail) for i in picks],
+            "new": synthetic_deck(args.queries, rng),
+        }
+
+        def linear(features):
+            thumbnail = features.thumbnail.astype(np.int16).ravel()
+            for key, (fingerprint, stored) in index.entries.items():
+                if hamming(features.fingerprint, fingerprint) <= index.max_distance:
+                    stored = np.frombuffer(stored, np.uint8)
+                    if np.mean(np.abs(thumbnail - stored)) <= index.max_thumb_diff:
+                        return key
+            return None
+
+        for name, batch in queries.items():
+            for method, func in (("index", index.find), ("linear", linear)):
+                found = sum(func(query) is not None for query in batch)
+                latencies = timed(func, batch)
+                print(f"{count:>7} {name:>8} {method:>7} {latencies.mean():>9.3f} "
+                      f"{np.percentile(latencies, 99):>9.3f} {found:>6}")
+        print(f"{count:>7} {'':>8} {'build':>7} {build * 1000:>9.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Startup latency: time until the hotkey listener is ready and until the first capture is safe.
+
+Builds a deck of ``--slides`` captures, then starts fresh interpreters that
+run what ``video_to_ppt.py`` does at startup (the listener itself is not
+started - it needs a display) and take one capture right away:
+
+- ready:  module imported, app constructed, background preload started;
+          this is when the real script starts the keyboard listener
+- first:  the first capture is durable (journaled and fsynced)
+- index:  the deck-wide duplicate index covers every slide
+
+Each run saves its capture at exit, so the deck grows by one slide per run.
+The "no index" runs delete the deck's .slideindex first, like a deck saved
+before the index existed: its slides are fingerprinted in the background.
+
+``--eager`` imports numpy, OpenCV, pptx, skimage and tkinter up front and
+parses the deck with python-pptx's own loader, as the script used to.
+
+    python benchmarks/bench_startup.py --slides 1000 --runs 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = r"""
+import sys, time, json
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+eager = {eager!r}
+if eager:
+    import numpy, cv2, pptx, tkinter
+    from skimage.metrics import structural_similarity
+import video_to_ppt
+app = video_to_ppt.VideoToPPT()
+app.lazy_deck = not eager
+app.rollover_slides = app.rollover_mb = 0  # Keep capturing into the big deck
+app.video_region = (0, 0, {width}, {height})
+app.preload()
+ready = time.perf_counter() - started
+
+from PIL import Image, ImageGrab
+ImageGrab.grab = lambda bbox=None, **kwargs: Image.new("RGB", ({width}, {height}), (12, 34, 56))
+app.request_capture()
+app.capture_queue.join()
+first = time.perf_counter() - started
+if app.slide_index_thread:
+    app.slide_index_thread.join()
+index = time.perf_counter() - started
+app.shutdown()
+print(json.dumps({{"ready": ready, "first": first, "index": index}}))
+"""
+
+
+def build_deck(directory, slides, width, height):
+    """A deck of distinct JPEG captures, plus its duplicate index."""
+    import video_to_ppt
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height // 8, width // 8, 3), np.uint8)
+    count = [0]
+
+    def grab(bbox=None, **kwargs):
+        count[0] += 1
+        frame = np.roll(base, count[0], axis=1)
+        frame[count[0] % base.shape[0]] = count[0] % 255
+        return Image.fromarray(frame).resize((width, height), Image.NEAREST)
+
+    ImageGrab.grab = grab
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        app = video_to_ppt.VideoToPPT()
+        app.image_format = "JPEG"
+        app.deck_wide_dedup = False
+        app.materialize_every = 250
+        app.rollover_slides = app.rollover_mb = 0
+        app.video_region = (0, 0, width, height)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(slides):
+                app.toggle_capture()
+            app.shutdown()
+            # Write the duplicate index once, as a previous session would have
+            indexed = video_to_ppt.VideoToPPT()
+            indexed.initialize_ppt()
+            indexed.slide_index_thread.join()
+    finally:
+        os.chdir(cwd)
+    return os.path.getsize(os.path.join(directory, "Introduction Module1.pptx")) / 1e6
+
+
+def measure(directory, eager, args, index=True):
+    if not index:
+        from slide_index import SlideIndex
+        os.remove(SlideIndex.index_path(os.path.join(directory, "Introduction Module1.pptx")))
+    code = CHILD.format(root=ROOT, eager=eager, width=args.width, height=args.height)
+    output = subprocess.run([sys.executable, "-c", code], cwd=directory, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--eager", action="store_true", help="also measure eager imports and loading")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck_mb = build_deck(tmp, args.slides, args.width, args.height)
+        print(f"deck: {args.slides} slides, {deck_mb:.1f} MB")
+        print(f"{'mode':>8} {'ready ms':>9} {'first capture ms':>17} {'index ms':>9}")
+        modes = [("lazy", False, True), ("no index", False, False)]
+        if args.eager:
+            modes.append(("eager", True, True))
+        for mode, eager, index in modes:
+            results = [measure(tmp, eager, args, index) for _ in range(args.runs)]
+            ready, first, indexed = (np.median([result[key] for result in results]) * 1000
+                                     for key in ("ready", "first", "index"))
+            print(f"{mode:>8} {ready:>9.0f} {first:>17.0f} {indexed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
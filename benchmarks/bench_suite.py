@@ -0,0 +1,333 @@
+"""Whole-pipeline benchmark suite on scripted sessions, with JSON results.
+
+Each scenario plays a scripted lecture (see ``synthetic_session``) on a
+fake clock and runs it through the real ``VideoToPPT`` pipeline with only
+the screen grab stubbed out: region detection on a fake desktop, grabbing,
+slide-change and duplicate detection, encoding, journaling and saving. A
+scenario runs in a fresh process of its own, so peak RSS is its own and
+nothing is cached between scenarios, and the same seed always gives the
+same frames.
+
+- ``lecture``: continuous capture of a player on a 1080p desktop - slides
+  fading into each other, animated builds, talking head, rapid flips
+- ``keys``:    the same lecture, with a key press per slide (and a few
+  double presses)
+- ``long``:    key presses over a 600-slide session, for save time as the
+  deck grows (rollover at 300 slides included, as configured)
+
+Per scenario: throughput (grabs and slides per real second, and how much
+faster than real time the session ran), capture latency percentiles,
+per-stage percentiles, save time against deck size, peak RSS and deck
+size. ``--json`` writes everything plus the machine, Python, library
+versions and git commit; ``--compare`` prints the change from an earlier
+results file. Timings of a single run vary by ten percent or more on a
+busy machine; ``--runs 3`` keeps the median run of three.
+
+    python benchmarks/bench_suite.py --runs 3 --json results.json
+    python benchmarks/bench_suite.py --quick --compare results.json
+    python benchmarks/bench_suite.py --scenarios long --set image_format=JPEG
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+LECTURE = [
+    ("slides", 40, 4),
+    ("builds", 48, 4, 3),
+    ("talking", 60),
+    ("slides", 12, 8),
+    ("slides", 60, 2),
+]
+
+SCENARIOS = {
+    "lecture": {"mode": "continuous", "segments": LECTURE, "desktop": 0, "transition": 0.6},
+    "keys": {"mode": "keys", "segments": LECTURE, "desktop": 0, "transition": 0.6, "double_every": 5},
+    "long": {"mode": "keys", "segments": [("slides", 3600, 600)], "size": (640, 360), "double_every": 0},
+}
+
+# Metrics compared by --compare: (path in the results, higher is better)
+HEADLINE = [
+    (("throughput", "grabs_per_s"), True),
+    (("throughput", "realtime_x"), True),
+    (("capture_latency_ms", "p50"), False),
+    (("capture_latency_ms", "p99"), False),
+    (("save", "mean_ms"), False),
+    (("peak_rss_mb",), False),
+    (("output_mb",), False),
+]
+
+
+def scaled(segments, scale):
+    """``segments`` with every duration and slide count multiplied by ``scale``."""
+    result = []
+    for segment in segments:
+        kind, seconds, *rest = segment
+        if rest:
+            rest[0] = max(1, round(rest[0] * scale))
+        result.append((kind, seconds * scale, *rest))
+    return result
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def press_times(screen, double_every):
+    """Key presses: halfway through each slide's hold (after its builds), some pressed twice."""
+    times = []
+    for number, (start, end, slide, steps) in enumerate(screen.timeline):
+        if slide is None:
+            continue
+        at = start + (end - start) * (1 - 0.5 / steps)
+        times.append(at)
+        if double_every and number % double_every == double_every - 1:
+            times.append(at + 0.2)
+    return times
+
+
+def run_scenario(name, scale, overrides):
+    """Run one scenario in this process and return its results."""
+    from PIL import ImageGrab
+
+    import video_to_ppt
+    from desktop_fixtures import FIXTURES, iou, make_desktop
+    from scheduler import CaptureScheduler
+    from synthetic_session import FakeClock, SyntheticScreen
+
+    scenario = SCENARIOS[name]
+    clock = FakeClock()
+    desktop = truth = None
+    if scenario.get("desktop") is not None:
+        size, share, position = FIXTURES[scenario["desktop"]]
+        image, truth = make_desktop(size, share, position, seed=scenario["desktop"])
+        # The lecture plays inside the player's dark edge, above its controls bar
+        controls = 2 * max(4, (truth[3] - truth[1]) // 20)
+        desktop = (image, (truth[0] + 2, truth[1] + 2, truth[2] - 2, truth[3] - controls))
+    width, height = scenario.get("size", (640, 360))
+    screen = SyntheticScreen(clock, scaled(scenario["segments"], scale), width, height,
+                             grab_cost=0.02, transition=scenario.get("transition", 0.0), desktop=desktop)
+    ImageGrab.grab = screen.grab
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app = video_to_ppt.VideoToPPT()
+        app.scheduler = CaptureScheduler(clock.time, clock.sleep)
+        for attribute, value in overrides.items():
+            setattr(app, attribute, value)
+
+        saves = []  # (slides in the part, seconds) per deck save
+        save_ppt = app.save_ppt
+
+        def timed_save(final=True):
+            start = time.perf_counter()
+            try:
+                return save_ppt(final)
+            finally:
+                saves.append((len(app.ppt.slides) if app.ppt else 0, time.perf_counter() - start))
+        app.save_ppt = timed_save
+
+        output = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            region_overlap = None
+            if truth is not None:
+                with app.metrics.stage("region"):
+                    region = app.auto_detect_video(screen.grab())
+                region_overlap = iou(region, truth)
+                app.video_region = region or screen.box
+            else:
+                app.video_region = (0, 0, screen.width, screen.height)
+
+            if scenario["mode"] == "continuous":
+                app.start_time = clock.time()
+                app.max_capture_time = screen.duration
+                app.running = True
+                app.capture_loop()
+            else:
+                presses = press_times(screen, scenario.get("double_every", 0))
+                for at in presses:
+                    clock.now = screen.start + at
+                    app.request_capture()
+                    # Key presses are seconds apart: each is done before the next
+                    app.capture_queue.join()
+            app.shutdown()
+        elapsed = time.perf_counter() - started
+
+        report = app.metrics.report()
+        decks = [file for file in os.listdir(tmp) if file.endswith(".pptx")]
+        output_bytes = sum(os.path.getsize(os.path.join(tmp, deck)) for deck in decks)
+        os.chdir(ROOT)
+
+    latency = report["capture_latency"].get("frame" if scenario["mode"] == "continuous" else "capture", {})
+    save_seconds = [seconds for _, seconds in saves]
+    return {
+        "mode": scenario["mode"],
+        "session_s": round(screen.duration, 1),
+        "real_s": round(elapsed, 2),
+        "slides": app.capture_count if scenario["mode"] == "continuous" else len(app.captures),
+        # Key presses aren't deduplicated: a double press is a second slide
+        "expected_slides": screen.slide_count if scenario["mode"] == "continuous" else len(presses),
+        "parts": len(decks),
+        "region_iou": round(region_overlap, 3) if region_overlap is not None else None,
+        "throughput": {
+            "grabs": screen.grabs,
+            "grabs_per_s": round(screen.grabs / elapsed, 1),
+            "slides_per_s": round(len(app.captures) / elapsed, 2),
+            "realtime_x": round(screen.duration / elapsed, 1),
+        },
+        "capture_latency_ms": {key[:-3]: value for key, value in latency.items() if key.endswith("_ms")},
+        "stages_ms": {stage: {key[:-3]: value for key, value in stats.items() if key.endswith("_ms")}
+                      for stage, stats in report["stages"].items()},
+        "save": {
+            "count": len(saves),
+            "mean_ms": round(sum(save_seconds) / len(saves) * 1000, 2) if saves else 0.0,
+            "max_ms": round(max(save_seconds) * 1000, 2) if saves else 0.0,
+            "by_slides": [[slides, round(seconds * 1000, 2)] for slides, seconds in saves],
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "output_mb": round(output_bytes / 1e6, 2),
+    }
+
+
+def environment():
+    """Machine, Python, library versions and git commit, for comparing runs."""
+    versions = {}
+    for module in ("PIL", "numpy", "cv2", "pptx", "skimage"):
+        try:
+            versions[module] = __import__(module).__version__
+        except (ImportError, AttributeError):
+            versions[module] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "libraries": versions,
+    }
+
+
+def lookup(result, path):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(results, baseline, args):
+    print(f"\nChange from {baseline['environment'].get('commit')} ({baseline['environment'].get('time')}):")
+    for name, result in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        changes = []
+        for path, higher_is_better in HEADLINE:
+            new, old = lookup(result, path), lookup(before, path)
+            if not new or not old:
+                continue
+            change = (new - old) / old * 100
+            better = change > 0 if higher_is_better else change < 0
+            flag = "" if abs(change) < args.threshold else (" better" if better else " WORSE")
+            changes.append(f"{'.'.join(path)} {change:+.0f}%{flag}")
+        print(f"  {name}: " + ", ".join(changes))
+
+
+def parse_overrides(pairs):
+    """``attribute=value`` pairs for VideoToPPT, values read as JSON when they parse."""
+    overrides = {}
+    for pair in pairs:
+        attribute, _, value = pair.partition("=")
+        try:
+            overrides[attribute] = json.loads(value)
+        except ValueError:
+            overrides[attribute] = value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--quick", action="store_true", help="quarter-length sessions, e.g. for a smoke test")
+    parser.add_argument("--set", action="append", default=[], metavar="ATTRIBUTE=VALUE",
+                        help="VideoToPPT setting for every scenario, e.g. image_format=JPEG")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="earlier --json results to compare against")
+    parser.add_argument("--runs", type=int, default=1, help="runs per scenario; the median one is kept")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change --compare flags as better or worse")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    scale = 0.25 if args.quick else 1.0
+
+    if args.child:
+        result = run_scenario(args.child, scale, parse_overrides(args.set))
+        print(json.dumps(result))
+        return
+
+    results = {}
+    print(f"{'scenario':>8} {'slides':>9} {'grabs/s':>8} {'x real':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'save ms':>8} {'RSS MB':>7} {'deck MB':>8}")
+    for name in args.scenarios.split(","):
+        command = [sys.executable, os.path.abspath(__file__), "--child", name]
+        command += ["--quick"] if args.quick else []
+        for pair in args.set:
+            command += ["--set", pair]
+        runs = []
+        for _ in range(args.runs):
+            child = subprocess.run(command, capture_output=True, text=True)
+            if child.returncode:
+                print(f"{name:>8} failed:\n{child.stderr}")
+                break
+            runs.append(json.loads(child.stdout.strip().splitlines()[-1]))
+        if len(runs) < args.runs:
+            continue
+        # The run of median wall time, whole, so its numbers belong together
+        result = results[name] = sorted(runs, key=lambda run: run["real_s"])[len(runs) // 2]
+        result["runs"] = len(runs)
+        latency = result["capture_latency_ms"]
+        print(f"{name:>8} {result['slides']:>4}/{result['expected_slides']:<4} "
+              f"{result['throughput']['grabs_per_s']:>8.1f} {result['throughput']['realtime_x']:>7.1f} "
+              f"{latency.get('p50', 0):>7.1f} {latency.get('p99', 0):>7.1f} {result['save']['mean_ms']:>8.1f} "
+              f"{result['peak_rss_mb'] or 0:>7.0f} {result['output_mb']:>8.2f}")
+
+    document = {"environment": environment(), "quick": args.quick, "settings": parse_overrides(args.set),
+                "scenarios": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Offline video-file conversion speed on a generated lecture video.
+
+Writes a synthetic video of ``--slides`` slides, each held for
+``--hold`` seconds with a short cross-fade, converts it with
+``video_file.video_to_deck`` and reports the speed relative to real time.
+
+    python benchmarks/bench_video_file.py --slides 20 --hold 10 --size 1920x1080
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from video_file import video_to_deck
+
+
+def slide_frame(index, width, height):
+    """BGR slide: title bar, a few text-like bars and a picture block."""
+    rng = np.random.default_rng(index)
+    frame = np.full((height, width, 3), 250, np.uint8)
+    unit = height // 20
+    frame[:2 * unit] = (120, 60, 30)
+    for line in range(2 + index % 4):
+        y = 4 * unit + line * 2 * unit
+        length = int(width * rng.uniform(0.3, 0.7))
+        frame[y:y + unit, 2 * unit:2 * unit + length] = 40
+    # Blocky "photo" so slides differ the way real figures do
+    block_h, block_w = height // 2 - 2 * unit, width // 2 - 2 * unit
+    photo = rng.integers(0, 255, (9, 16, 3), np.uint8)
+    frame[height // 2:height // 2 + block_h, width // 2:width // 2 + block_w] = cv2.resize(
+        photo, (block_w, block_h), interpolation=cv2.INTER_NEAREST)
+    return frame
+
+
+def write_slide_video(path, slides, hold, fps, width, height, fade=0.5):
+    """Write a slide-show video and return its duration in seconds."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    previous = None
+    for index in range(slides):
+        frame = slide_frame(index, width, height)
+        fade_frames = int(fade * fps) if previous is not None else 0
+        for step in range(fade_frames):
+            alpha = (step + 1) / (fade_frames + 1)
+            writer.write(cv2.addWeighted(frame, alpha, previous, 1 - alpha, 0))
+        for _ in range(int(hold * fps) - fade_frames):
+            writer.write(frame)
+        previous = frame
+    writer.release()
+    return slides * hold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--hold", type=float, default=10.0, help="seconds per slide")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seek", action="store_true")
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "lecture.mp4")
+        duration = write_slide_video(video, args.slides, args.hold, args.fps, width, height)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            app = video_to_deck(video, os.path.join(tmp, "lecture.pptx"),
+                                interval=args.interval, seek=args.seek)
+        elapsed = time.perf_counter() - start
+
+    print(f"video: {duration:.0f} s at {width}x{height}, {args.fps:g} fps, {args.slides} slides")
+    print(f"converted in {elapsed:.1f} s ({duration / elapsed:.0f}x real time), "
+          f"{len(app.captures)} slides written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic desktop screenshots with an embedded video player.
+
+Each fixture is a desktop background with a browser window (tab strip,
+address bar, page text) and a dark video player somewhere in the page
+showing a lecture slide (16:9, or 4:3 pillarboxed), with a controls bar
+along its bottom. The player
+rectangle is the ground truth for region detection.
+"""
+import numpy as np
+from PIL import Image, ImageDraw
+
+# (screen size, player width as a share of the browser page, player position in the page)
+FIXTURES = [
+    ((1920, 1080), 0.70, (0.05, 0.10)),
+    ((1920, 1080), 0.45, (0.30, 0.20)),
+    ((1920, 1080), 0.90, (0.04, 0.06)),
+    ((2560, 1440), 0.60, (0.10, 0.12)),
+    ((2560, 1440), 0.35, (0.50, 0.30)),
+    ((3840, 2160), 0.70, (0.05, 0.10)),
+    ((3840, 2160), 0.40, (0.25, 0.25)),
+    ((3840, 1080), 0.30, (0.10, 0.15)),  # Two side-by-side 1080p monitors
+    ((5120, 1440), 0.25, (0.60, 0.20)),  # Two 1440p monitors
+]
+
+
+def make_desktop(screen_size, player_share, player_pos, seed=0):
+    """Return (RGB PIL image, (left, top, right, bottom) of the player)."""
+    rng = np.random.default_rng(seed)
+    width, height = screen_size
+
+    # Desktop wallpaper gradient
+    ramp = np.linspace(0, 1, width)[None, :, None]
+    wallpaper = (np.array([40, 70, 110]) * (1 - ramp) + np.array([90, 50, 120]) * ramp)
+    image = Image.fromarray(np.broadcast_to(wallpaper, (height, width, 3)).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+
+    # Browser window on the first monitor-sized area
+    monitor_w = width if width / height < 2.5 else width // 2
+    bx0, by0 = int(monitor_w * 0.03), int(height * 0.03)
+    bx1, by1 = int(monitor_w * 0.97), int(height * 0.95)
+    unit = max(8, height // 60)
+    draw.rectangle((bx0, by0, bx1, by1), fill=(255, 255, 255))
+    draw.rectangle((bx0, by0, bx1, by0 + 2 * unit), fill=(222, 225, 230))  # Tab strip
+    for tab in range(4):
+        tx = bx0 + unit + tab * 12 * unit
+        draw.rectangle((tx, by0 + unit // 2, tx + 11 * unit, by0 + 2 * unit), fill=(245, 245, 245))
+    draw.rectangle((bx0, by0 + 2 * unit, bx1, by0 + 4 * unit), fill=(245, 246, 248))  # Toolbar
+    draw.rounded_rectangle((bx0 + 6 * unit, by0 + 2 * unit + 4, bx1 - 6 * unit, by0 + 4 * unit - 4),
+                           radius=unit // 2, fill=(255, 255, 255), outline=(200, 200, 200))
+
+    # Page text around the player
+    page_x0, page_y0 = bx0 + 2 * unit, by0 + 5 * unit
+    page_w, page_h = bx1 - bx0 - 4 * unit, by1 - by0 - 6 * unit
+    for line in range(0, page_h, 2 * unit):
+        length = int(page_w * rng.uniform(0.2, 0.9))
+        draw.rectangle((page_x0, page_y0 + line, page_x0 + length, page_y0 + line + unit // 2), fill=(90, 90, 90))
+
+    # The player: 16:9, a lecture slide inside and a controls bar at the bottom
+    pw = int(page_w * player_share)
+    ph = int(pw * 9 / 16)
+    px0 = page_x0 + int(page_w * player_pos[0])
+    py0 = page_y0 + int(page_h * player_pos[1])
+    px0 = min(px0, page_x0 + page_w - pw)
+    py0 = min(py0, by1 - ph - unit)
+    truth = (px0, py0, px0 + pw, py0 + ph)
+
+    draw.rectangle((px0 - unit, py0 - unit, px0 + pw + unit, py0 + ph + unit), fill=(255, 255, 255))
+    draw.rectangle((truth[0], truth[1], truth[2] - 1, truth[3] - 1), fill=(12, 12, 12))  # Player background
+
+    # Every other fixture shows a 4:3 slide pillarboxed in the 16:9 player
+    sx0, sx1 = px0, px0 + pw - 1
+    if seed % 2:
+        inset = (pw - ph * 4 // 3) // 2
+        sx0, sx1 = px0 + inset, px0 + pw - 1 - inset
+    else:
+        sx0, sx1 = px0 + 2, px0 + pw - 3
+    draw.rectangle((sx0, py0 + 2, sx1, py0 + ph - 3), fill=(252, 252, 250))
+    slide_unit = max(4, ph // 20)
+    draw.rectangle((sx0, py0 + 2, sx1, py0 + 2 * slide_unit), fill=(30, 60, 120))
+    for line in range(3):
+        y = py0 + 4 * slide_unit + line * 2 * slide_unit
+        draw.rectangle((sx0 + 2 * slide_unit, y, sx0 + int((sx1 - sx0) * rng.uniform(0.3, 0.7)), y + slide_unit),
+                       fill=(50, 50, 50))
+    draw.rectangle((px0, py0 + ph - 2 * slide_unit, px0 + pw - 1, py0 + ph - 1), fill=(60, 60, 60))  # Controls
+    draw.ellipse((px0 + slide_unit // 2, py0 + ph - int(1.7 * slide_unit),
+                  px0 + 2 * slide_unit, py0 + ph - slide_unit // 3), fill=(240, 240, 240))  # Play button
+    return image, truth
+
+
+def fixture_set(seed=0):
+    """All fixtures as (name, image, truth)."""
+    for index, (size, share, pos) in enumerate(FIXTURES):
+        image, truth = make_desktop(size, share, pos, seed + index)
+        yield f"{size[0]}x{size[1]}-{int(share * 100)}%", image, truth
+
+
+def iou(a, b):
+    """Intersection over union of two (left, top, right, bottom) boxes."""
+    if not a or not b:
+        return 0.0
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
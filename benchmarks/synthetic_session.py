@@ -0,0 +1,143 @@
+"""Fake clock and scripted screen content for deterministic capture runs.
+
+``SyntheticScreen.grab`` stands in for ``ImageGrab.grab``: it renders what
+a scripted lecture shows at the fake clock's current time and advances the
+clock by ``grab_cost``, so a capture loop driven by ``FakeClock`` runs a
+ten-minute session in seconds and the same way every time. Slides can fade
+into each other and build up step by step, and the lecture can play inside
+a player on a fake desktop (see ``desktop_fixtures``) instead of filling
+the whole screen.
+"""
+import numpy as np
+from PIL import Image
+
+from bench_video_file import slide_frame
+
+
+class FakeClock:
+    """time()/sleep() pair where sleeping just moves time forward."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class SyntheticScreen:
+    """A scripted lecture: runs of slides and stretches of talking head.
+
+    ``segments`` is a list of ``("slides", seconds, count)`` - ``count``
+    slides shown for equal shares of ``seconds`` -, ``("builds", seconds,
+    count, steps)`` - the same, each slide revealed top to bottom in
+    ``steps`` steps - and ``("talking", seconds)`` - continuous motion,
+    like a webcam feed. Each slide fades in from what was on screen over
+    its first ``transition`` seconds.
+
+    With ``desktop=(image, box)`` the lecture plays in ``box`` of the
+    desktop ``image``: ``grab()`` returns the whole desktop and
+    ``grab(bbox)`` any part of it, and frames are the size of the box.
+    """
+
+    def __init__(self, clock, segments, width=640, height=360, grab_cost=0.01, transition=0.0, desktop=None):
+        self.clock = clock
+        self.desktop, self.box = desktop or (None, None)
+        if self.box:
+            width, height = self.box[2] - self.box[0], self.box[3] - self.box[1]
+        self.width = width
+        self.height = height
+        self.grab_cost = grab_cost  # Fake seconds each grab takes
+        self.transition = transition  # Fade-in seconds at the start of each slide
+        self.start = clock.time()
+        self.grabs = 0
+        self.timeline = []  # (start, end, slide number or None, build steps)
+        self.slide_count = 0
+        offset = 0.0
+        for segment in segments:
+            kind, seconds = segment[0], segment[1]
+            if kind in ("slides", "builds"):
+                steps = segment[3] if kind == "builds" else 1
+                for _ in range(segment[2]):
+                    hold = seconds / segment[2]
+                    self.timeline.append((offset, offset + hold, self.slide_count, steps))
+                    self.slide_count += 1
+                    offset += hold
+            else:
+                self.timeline.append((offset, offset + seconds, None, 1))
+                offset += seconds
+        self.duration = offset
+        self.slides = {}
+        self.rng = np.random.default_rng(0)
+
+    def content_at(self, seconds):
+        """(timeline index, slide number or None, seconds into it) at ``seconds``."""
+        for index, (start, end, slide, _) in enumerate(self.timeline):
+            if start <= seconds < end:
+                return index, slide, seconds - start
+        index = len(self.timeline) - 1
+        return index, self.timeline[index][2], seconds - self.timeline[index][0]
+
+    def slide_image(self, slide, step=None, steps=1):
+        """Slide ``slide`` as an RGB array, revealed up to build ``step`` of ``steps``."""
+        if slide not in self.slides:
+            # Only the last few slides, so long sessions don't inflate the pipeline's memory use
+            while len(self.slides) >= 4:
+                self.slides.pop(next(iter(self.slides)))
+            self.slides[slide] = slide_frame(slide, self.width, self.height)[:, :, ::-1].copy()
+        frame = self.slides[slide]
+        if step is None or step >= steps - 1:
+            return frame
+        # Below the title the rest of the slide appears a band at a time
+        title = self.height // 10
+        shown = title + (self.height - title) * (step + 1) // steps
+        frame = frame.copy()
+        frame[shown:] = 250
+        return frame
+
+    def frame_at(self, seconds):
+        index, slide, into = self.content_at(seconds)
+        if slide is None:
+            return Image.fromarray(self.talking_head(into))
+        start, end, _, steps = self.timeline[index]
+        step = min(steps - 1, int(into / ((end - start) / steps)))
+        frame = self.slide_image(slide, step, steps)
+        if self.transition and into < self.transition and index:
+            # Cross-fade from the end of what came before
+            before = self.frame_array(start - 1e-6)
+            alpha = into / self.transition
+            frame = (before * (1 - alpha) + frame * alpha).astype(np.uint8)
+        return Image.fromarray(frame)
+
+    def frame_array(self, seconds):
+        index, slide, into = self.content_at(seconds)
+        if slide is None:
+            return self.talking_head(into)
+        return self.slide_image(slide)
+
+    def talking_head(self, into):
+        """A face that drifts and nods over a noisy backdrop, ``into`` seconds in."""
+        frame = np.full((self.height, self.width, 3), 90, np.uint8)
+        frame += self.rng.integers(0, 12, frame.shape, np.uint8)
+        cx = int(self.width * (0.5 + 0.1 * np.sin(into * 0.7)))
+        cy = int(self.height * (0.45 + 0.03 * np.sin(into * 2.3)))
+        yy, xx = np.ogrid[:self.height, :self.width]
+        face = ((xx - cx) / (self.width * 0.12)) ** 2 + ((yy - cy) / (self.height * 0.3)) ** 2 <= 1
+        frame[face] = (200, 160, 140)
+        return frame
+
+    def grab(self, bbox=None, **kwargs):
+        self.grabs += 1
+        image = self.frame_at(self.clock.time() - self.start).copy()
+        self.clock.sleep(self.grab_cost)
+        if self.desktop is not None:
+            if bbox == self.box:
+                return image
+            screen = self.desktop.copy()
+            screen.paste(image, self.box[:2])
+            image = screen
+        if bbox:
+            image = image.crop(bbox)
+        return image
@@ -0,0 +1,263 @@
+"""Screen capture backends.
+
+``ImageGrab.grab`` allocates a new image for every grab - on X11 it even
+grabs the whole screen and crops it afterwards. At several grabs a second
+that is a steady stream of full-frame allocations. A backend hides where
+the pixels come from behind ``grab(bbox)``:
+
+- ``pillow``: ``ImageGrab.grab``, as before. Works wherever Pillow can grab.
+- ``buffer``: grabs only the region, through mss if it is installed or
+  python-xlib on X11 (which also works under Xvfb), and converts it into a
+  preallocated RGBX buffer.
+- ``file``: frames from a video file, a folder of images or a callable,
+  copied into the same kind of buffers - for headless runs and tests.
+
+The buffered backends return PIL images that share the buffer's memory,
+so features, hashing and encoding read the grabbed pixels directly. Each
+thread gets its own small ring of buffers per frame size, and a buffer is
+overwritten ``ring`` grabs later. Such frames are marked *transient*:
+anything that keeps a frame beyond the next grab must ``retain`` it.
+"""
+import os
+import threading
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+def retain(image):
+    """Return ``image``, copied if it lives in a backend's reusable buffer."""
+    if getattr(image, "transient", False):
+        return image.copy()
+    return image
+
+
+def frame_image(buffer):
+    """A transient RGBX PIL image over ``buffer``'s memory, without copying it."""
+    height, width = buffer.shape[:2]
+    image = Image.frombuffer("RGBX", (width, height), buffer, "raw", "RGBX", 0, 1)
+    image.transient = True
+    image.array = buffer  # The pixels, for hashing without a copy
+    return image
+
+
+class PillowBackend:
+    """``ImageGrab.grab``: a newly allocated image per grab."""
+    name = "pillow"
+
+    def grab(self, bbox=None):
+        return ImageGrab.grab(bbox=bbox)
+
+    def close(self):
+        pass
+
+
+class BufferedBackend:
+    """Base for backends that fill preallocated RGBX buffers."""
+
+    def __init__(self, ring=2):
+        self.ring = ring  # Buffers per frame size; a frame stays valid for ring - 1 more grabs
+        self.local = threading.local()  # Per thread: open source and buffer rings
+
+    def buffer_for(self, size):
+        """The next buffer of the calling thread's ring for frames of ``size``."""
+        rings = getattr(self.local, "rings", None)
+        if rings is None:
+            rings = self.local.rings = {}
+        ring = rings.get(size)
+        if ring is None:
+            # Keep the rings of the last two sizes only, e.g. the region and its border check
+            while len(rings) >= 2:
+                rings.pop(next(iter(rings)))
+            width, height = size
+            ring = rings[size] = [[np.full((height, width, 4), 255, np.uint8) for _ in range(self.ring)], 0]
+        buffers, index = ring
+        ring[1] = (index + 1) % len(buffers)
+        return buffers[index]
+
+    def grab(self, bbox=None):
+        return frame_image(self.fill(bbox))
+
+    def fill(self, bbox):
+        """Write the frame for ``bbox`` into a buffer from ``buffer_for`` and return it."""
+        raise NotImplementedError
+
+    def close(self):
+        source = getattr(self.local, "source", None)
+        if source is not None:
+            source.close()
+            self.local.source = None
+
+
+class _MssSource:
+    """Region grabs through mss (Windows, macOS, X11)."""
+
+    def __init__(self):
+        import mss
+        self.sct = mss.mss()
+
+    def screen_box(self):
+        monitor = self.sct.monitors[0]  # Bounding box of all monitors
+        return (monitor["left"], monitor["top"],
+                monitor["left"] + monitor["width"], monitor["top"] + monitor["height"])
+
+    def grab(self, left, top, width, height):
+        shot = self.sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return shot.raw, shot.size  # BGRA
+
+    def close(self):
+        self.sct.close()
+
+
+class _XlibSource:
+    """Region grabs through python-xlib (X11 and Xvfb); installed with pynput on Linux."""
+
+    def __init__(self):
+        from Xlib import X, display
+        self.display = display.Display()
+        self.root = self.display.screen().root
+        self.format = X.ZPixmap
+
+    def screen_box(self):
+        geometry = self.root.get_geometry()
+        return (0, 0, geometry.width, geometry.height)
+
+    def grab(self, left, top, width, height):
+        reply = self.root.get_image(left, top, width, height, self.format, 0xFFFFFFFF)
+        if len(reply.data) != width * height * 4:
+            raise ValueError(f"unsupported X11 pixel format (depth {reply.depth})")
+        return reply.data, (width, height)  # BGRX
+
+    def close(self):
+        self.display.close()
+
+
+class ScreenBackend(BufferedBackend):
+    """Grabs just the region from the screen into preallocated buffers."""
+    name = "buffer"
+
+    def __init__(self, ring=2, source_class=None):
+        super().__init__(ring)
+        self.source_class = source_class or self.pick_source()  # Opened once per grabbing thread
+
+    @staticmethod
+    def pick_source():
+        try:
+            import mss  # noqa: F401
+            return _MssSource
+        except ImportError:
+            pass
+        try:
+            import Xlib.display  # noqa: F401
+        except ImportError:
+            raise ImportError("the buffer capture backend needs mss, or python-xlib on X11") from None
+        if not os.environ.get("DISPLAY"):
+            raise ImportError("the buffer capture backend needs mss outside X11 (DISPLAY is not set)")
+        return _XlibSource
+
+    def fill(self, bbox):
+        import cv2
+        source = getattr(self.local, "source", None)
+        if source is None:
+            source = self.local.source = self.source_class()
+        left, top, right, bottom = bbox or source.screen_box()
+        raw, size = source.grab(left, top, right - left, bottom - top)
+
+        # HiDPI grabs can come back larger than the requested box
+        buffer = self.buffer_for(size)
+        pixels = np.frombuffer(raw, np.uint8).reshape(size[1], size[0], 4)
+        cv2.cvtColor(pixels, cv2.COLOR_BGRA2RGBA, dst=buffer)
+        return buffer
+
+
+class FileBackend(BufferedBackend):
+    """Frames from a video file, a folder of images or a callable instead of the screen.
+
+    ``source`` is a video path, a directory (its images in name order), or
+    a callable ``source(bbox)`` returning a PIL image or an RGB array. Each
+    grab shows the next frame, cropped to the box; after the last one the
+    video starts over with ``loop``, else its last frame stays on screen.
+    """
+    name = "file"
+
+    def __init__(self, source, loop=True, ring=2):
+        super().__init__(ring)
+        self.source = source
+        self.loop = loop
+        self.lock = threading.Lock()  # One position in the source, whatever thread grabs
+        self.video = None
+        self.bgr = None  # Decode buffer, reused by VideoCapture.read
+        self.images = None
+        self.position = 0
+        self.frame = None  # Last frame read, shown again once a non-looping source runs out
+        if not callable(source):
+            if os.path.isdir(source):
+                self.images = sorted(os.path.join(source, name) for name in os.listdir(source)
+                                     if name.lower().endswith(IMAGE_EXTENSIONS))
+                if not self.images:
+                    raise ValueError(f"no images in {source}")
+            elif not os.path.exists(source):
+                raise FileNotFoundError(source)
+
+    def next_frame(self, bbox):
+        """The next source frame as an RGB or BGR array; returns (array, is_bgr)."""
+        if callable(self.source):
+            frame = self.source(bbox)
+            if isinstance(frame, Image.Image):
+                frame = np.asarray(frame.convert("RGB") if frame.mode != "RGB" else frame)
+            return frame, False
+
+        if self.images is not None:
+            if self.position >= len(self.images):
+                if not self.loop:
+                    return self.frame, False
+                self.position = 0
+            with Image.open(self.images[self.position]) as image:
+                self.frame = np.asarray(image.convert("RGB"))
+            self.position += 1
+            return self.frame, False
+
+        import cv2
+        if self.video is None:
+            self.video = cv2.VideoCapture(self.source)
+            if not self.video.isOpened():
+                raise ValueError(f"could not open video {self.source}")
+        ok, frame = self.video.read(self.bgr)
+        if not ok and self.loop and self.bgr is not None:
+            self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.video.read(self.bgr)
+        if not ok:
+            if self.bgr is None:
+                raise ValueError(f"no frames in {self.source}")
+            return self.bgr, True
+        self.bgr = frame
+        return frame, True
+
+    def fill(self, bbox):
+        import cv2
+        with self.lock:
+            frame, is_bgr = self.next_frame(bbox)
+            if bbox and not callable(self.source):
+                left, top, right, bottom = bbox
+                frame = frame[top:bottom, left:right]
+            height, width = frame.shape[:2]
+            buffer = self.buffer_for((width, height))
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA if is_bgr else cv2.COLOR_RGB2RGBA, dst=buffer)
+        return buffer
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+
+
+BACKENDS = {backend.name: backend for backend in (PillowBackend, ScreenBackend, FileBackend)}
+
+
+def create_backend(name, **options):
+    """Instantiate the backend registered as ``name`` (see ``BACKENDS``)."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name} (use {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
@@ -0,0 +1,354 @@
+"""Local control daemon: drive capture sessions over a socket.
+
+``ControlServer`` is a long-running asyncio service that owns one
+``VideoToPPT`` session per deck. A session stays warm between requests:
+its deck, video region, duplicate index and capture backend are loaded
+once and reused by every client. Clients connect over a Unix socket (or
+localhost TCP with ``--port``) and send one JSON object per line, e.g.
+``{"command": "capture"}``; each gets one JSON line back with ``"ok"``
+and either the result or an ``"error"``.
+
+Commands (``deck`` is optional on all of them and defaults to the deck
+this connection last switched to, else the server's default deck; only
+``capture`` and ``switch-deck`` open a session for a deck that has none):
+
+- ``capture``: grab now and queue the capture, like a key press (so it
+  is added even if it repeats a slide); with ``"wait": true`` it is in
+  the deck on return
+- ``flush``: finish queued captures and save the deck
+- ``switch-deck``: make ``deck`` this connection's deck, opening it if no
+  session has it yet; ``region`` sets its video region
+- ``stats``: slide counts, pending captures and stage timings
+- ``new-part``, ``refresh-region``: as the ``n`` and ``r`` keys
+- ``close``: save a deck and end its session; ``shutdown``: all of them
+
+Blocking work runs on a thread pool; each session's own locks keep its
+captures in order, so clients working on different decks run in parallel.
+
+Any client that can connect can name a deck, and the session writes to
+it, so decks must be ``.pptx`` files inside the deck directory (by
+default the default deck's directory), and an existing file must be a
+deck.
+
+    python control.py serve --deck "Introduction Module1.pptx"
+    python control.py keys               # the hotkeys, as a client
+    python control.py capture --wait
+    python control.py stats
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import traceback
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from video_to_ppt import VideoToPPT
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "video_to_ppt.sock")
+
+
+class ControlServer:
+    """Serves control commands for a set of warm ``VideoToPPT`` sessions."""
+
+    def __init__(self, deck_path="Introduction Module1.pptx", configure=None, workers=8, deck_dir=None):
+        # Clients may only open decks in here; the default deck's directory unless given
+        self.deck_dir = os.path.realpath(deck_dir or os.path.dirname(os.path.abspath(deck_path)))
+        self.default_deck = self.resolve_deck(deck_path)
+        self.configure = configure  # Called with each new session, e.g. to pick a capture backend
+        self.sessions = {}  # Absolute deck path -> VideoToPPT
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="control")
+        self.stopped = None
+        self.commands = {
+            "capture": self.capture, "flush": self.flush, "switch-deck": self.switch_deck,
+            "stats": self.stats, "new-part": self.new_part, "refresh-region": self.refresh_region,
+            "close": self.close, "shutdown": self.shutdown,
+        }
+        self.opening = {"capture", "switch-deck"}  # Commands that start a session for a new deck
+
+    def resolve_deck(self, path):
+        """Absolute path of a deck a client may open; raises ValueError for anything else."""
+        path = os.path.abspath(path)
+        if os.path.splitext(path)[1].lower() != ".pptx":
+            raise ValueError(f"{path} is not a .pptx file")
+        if os.path.commonpath([os.path.realpath(path), self.deck_dir]) != self.deck_dir:
+            raise ValueError(f"{path} is outside the deck directory {self.deck_dir}")
+        # The session would replace anything there that it can't open with a new deck
+        if os.path.lexists(path) and not is_deck(path):
+            raise ValueError(f"{path} exists but is not a PowerPoint deck")
+        return path
+
+    def session(self, deck):
+        """The session for ``deck``, started (and warming up in the background) if needed."""
+        app = self.sessions.get(deck)
+        if app is None:
+            app = VideoToPPT()
+            app.deck_path = deck
+            if self.configure:
+                self.configure(app)
+            # Same screen, same player: a region found for another deck still holds
+            if app.video_region is None:
+                app.video_region = next((other.video_region for other in self.sessions.values()
+                                         if other.video_region), None)
+            app.preload()
+            self.sessions[deck] = app
+            print(f"Opened session for {deck}")
+        return app
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def capture(self, app, request):
+        if not request.get("wait"):
+            queued = await self.run_blocking(app.request_capture)
+            return {"queued": queued, "pending": app.capture_queue.qsize()}
+        added = await self.run_blocking(capture_now, app)
+        return {"added": added, "slides": len(app.ppt.slides) if app.ppt else 0}
+
+    async def flush(self, app, request):
+        saved = await self.run_blocking(flush, app)
+        return {"saved": saved, "slides": len(app.ppt.slides) if app.ppt else 0}
+
+    async def switch_deck(self, app, request):
+        if request.get("region"):
+            app.video_region = tuple(request["region"])
+        return {"deck": app.deck_path, "sessions": sorted(self.sessions)}
+
+    async def stats(self, app, request):
+        report = app.metrics.report()
+        return {
+            "deck": app.deck_path,
+            "part": app.part_path,
+            "slides": len(app.ppt.slides) if app.ppt else None,
+            "captures": len(app.captures),
+            "pending": app.capture_queue.qsize(),
+            "unsaved": app.unsaved_captures,
+            "region": app.video_region,
+            "stages": report["stages"],
+            "sessions": sorted(self.sessions),
+        }
+
+    async def new_part(self, app, request):
+        app.request_new_part(request.get("reason", "chapter break"))
+        return {}
+
+    async def refresh_region(self, app, request):
+        app.refresh_region()
+        return {}
+
+    async def close(self, app, request):
+        await self.run_blocking(app.shutdown)
+        self.sessions.pop(app.deck_path, None)
+        return {"closed": app.deck_path}
+
+    async def shutdown(self, app, request):
+        self.stopped.set()
+        return {}
+
+    async def handle(self, reader, writer):
+        """Serve one client connection: a JSON request per line, a JSON reply per line."""
+        deck = self.default_deck  # switch-deck changes it for this connection only
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                command = self.commands.get(request.get("command"))
+                if command is None:
+                    raise ValueError(f"unknown command {request.get('command')!r} (use {', '.join(self.commands)})")
+                target = self.resolve_deck(request["deck"]) if request.get("deck") else deck
+                if request["command"] in self.opening:
+                    app = self.session(target)
+                elif command == self.shutdown:
+                    app = None
+                else:
+                    app = self.sessions.get(target)
+                    if app is None:
+                        raise ValueError(f"no session for {target} (open it with switch-deck or capture)")
+                if request["command"] == "switch-deck":
+                    deck = target
+                reply = {"ok": True, **await command(app, request)}
+            except Exception as e:
+                traceback.print_exc()
+                reply = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        writer.close()
+
+    async def serve(self, socket_path=DEFAULT_SOCKET, port=None, ready=None):
+        """Serve until a ``shutdown`` command (or SIGINT/SIGTERM), then save every session."""
+        import signal
+        self.stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopped.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Windows, or not the main thread
+
+        if port:
+            server = await asyncio.start_server(self.handle, "127.0.0.1", port)
+            print(f"Listening on 127.0.0.1:{port}")
+        else:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)  # Left behind by a server that didn't exit cleanly
+            server = await asyncio.start_unix_server(self.handle, socket_path)
+            print(f"Listening on {socket_path}")
+        self.session(self.default_deck)
+        if ready is not None:
+            ready.set()
+
+        async with server:
+            await self.stopped.wait()
+        for deck, app in list(self.sessions.items()):
+            print(f"Saving {deck}...")
+            await self.run_blocking(app.shutdown)
+        self.sessions.clear()
+        self.executor.shutdown()
+        if not port and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def is_deck(path):
+    """Whether ``path`` is a .pptx package, without loading it."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return "ppt/presentation.xml" in archive.NameToInfo
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def capture_now(app):
+    """Capture synchronously; returns whether a slide was added."""
+    with app.ppt_lock:
+        before = len(app.captures)
+        app.toggle_capture()
+        return len(app.captures) > before
+
+
+def flush(app):
+    """Wait for queued captures and save the deck."""
+    app.capture_queue.join()
+    with app.ppt_lock:
+        return app.save_ppt(final=True) if app.ppt else True
+
+
+class ControlClient:
+    """Blocking client for ``ControlServer``, one connection per client."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, port=None, timeout=60):
+        if port:
+            self.socket = socket.create_connection(("127.0.0.1", port), timeout)
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(socket_path)
+        self.file = self.socket.makefile("rb")
+
+    def call(self, command, **params):
+        """Send one command and return the server's reply as a dict."""
+        self.socket.sendall(json.dumps({"command": command, **params}).encode() + b"\n")
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("control server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+class RemoteApp:
+    """Stands in for ``VideoToPPT`` in the hotkey handler, forwarding keys to the daemon."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def send(self, command, **params):
+        reply = self.client.call(command, **params)
+        if not reply.get("ok"):
+            print(f"Control server error: {reply.get('error')}")
+        return reply
+
+    def request_capture(self):
+        reply = self.send("capture")
+        if reply.get("ok"):
+            print(f"Capture queued ({reply['pending']} pending)")
+
+    def refresh_region(self):
+        self.send("refresh-region")
+
+    def request_new_part(self):
+        self.send("new-part")
+
+    def shutdown(self):
+        # The daemon keeps the session; just make what was captured durable
+        reply = self.send("flush")
+        if reply.get("ok"):
+            print(f"Saved ({reply['slides']} slides)")
+
+    emergency_save = shutdown
+
+
+def configure_from(args):
+    """Session setup from the serve command's options."""
+    def configure(app):
+        app.capture_backend = args.backend
+        app.capture_source = args.source
+        if args.region:
+            app.video_region = tuple(map(int, args.region.split(",")))
+        if args.format:
+            app.image_format = args.format
+    return configure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run or talk to the capture control daemon.")
+    parser.add_argument("command", help="serve, keys, or a command to send: "
+                                        "capture, flush, switch-deck, stats, new-part, refresh-region, close, shutdown")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--port", type=int, help="use localhost TCP on this port instead")
+    parser.add_argument("--deck", help="deck to work on (serve: the default deck)")
+    parser.add_argument("--deck-dir", help="serve: directory clients may open decks in (default: the default deck's)")
+    parser.add_argument("--wait", action="store_true", help="capture: return once the slide is in the deck")
+    parser.add_argument("--region", help="video region as left,top,right,bottom")
+    parser.add_argument("--backend", default="pillow", help="serve: capture backend (see capture.py)")
+    parser.add_argument("--source", help="serve: video or image folder for the file backend")
+    parser.add_argument("--format", choices=["PNG", "JPEG"], help="serve: image codec for slides")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = ControlServer(args.deck or "Introduction Module1.pptx", configure_from(args),
+                               deck_dir=args.deck_dir)
+        asyncio.run(server.serve(args.socket, args.port))
+        return
+
+    client = ControlClient(args.socket, args.port)
+    if args.command == "keys":
+        import video_to_ppt
+        app = RemoteApp(client)
+        if args.deck:
+            app.send("switch-deck", deck=args.deck)
+        print("Sending hotkeys to the control server - press ESC to stop")
+        video_to_ppt.listen_for_keys(app)
+        return
+
+    params = {}
+    if args.deck:
+        params["deck"] = args.deck
+    if args.wait:
+        params["wait"] = True
+    if args.region:
+        params["region"] = list(map(int, args.region.split(",")))
+    reply = client.call(args.command, **params)
+    print(json.dumps(reply, indent=2))
+    client.close()
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    main()
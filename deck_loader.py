@@ -0,0 +1,88 @@
+"""Open a saved deck without reading its pictures.
+
+``Presentation(path)`` reads every member of the .pptx into memory before
+building a single part, so opening a deck of a few thousand full-screen
+captures reads the whole file - and ``IncrementalSaver`` throws the
+picture bytes away again right after. Capturing only ever appends slides,
+so the existing pictures are almost never needed.
+
+``open_presentation`` loads the package the same way python-pptx does, but
+reads members one at a time and turns picture members into
+``ArchivedImagePart``s straight from the ZIP directory: their bytes are
+only read if something asks for them (a full rewrite, for instance).
+"""
+import os
+import zipfile
+
+from pptx.api import _is_pptx_package
+from pptx.opc.package import PartFactory, _PackageLoader
+from pptx.opc.packuri import PACKAGE_URI, PackURI
+from pptx.package import Package
+from pptx.parts.image import ImagePart
+from pptx.util import lazyproperty
+
+from incremental_save import ArchivedImagePart
+
+
+class _LazyZipReader:
+    """Package reader that reads single members on demand from an open archive."""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.infos = {PackURI("/" + info.filename): info for info in archive.infolist()}
+
+    def __contains__(self, pack_uri):
+        return pack_uri in self.infos
+
+    def __getitem__(self, pack_uri):
+        if pack_uri not in self.infos:
+            raise KeyError(f"no member '{pack_uri}' in package")
+        return self.archive.read(self.infos[pack_uri])
+
+    def rels_xml_for(self, partname):
+        uri = partname.rels_uri
+        return self[uri] if uri in self else None
+
+
+class _LazyPackageLoader(_PackageLoader):
+    """python-pptx's package loader, minus reading the picture members."""
+
+    def __init__(self, pkg_file, package, archive):
+        super().__init__(pkg_file, package)
+        self.archive = archive
+
+    @lazyproperty
+    def _package_reader(self):
+        return _LazyZipReader(self.archive)
+
+    @lazyproperty
+    def _parts(self):
+        content_types = self._content_types
+        reader = self._package_reader
+        parts = {}
+        for partname in self._xml_rels:
+            if partname == "/" or partname not in reader:
+                continue
+            content_type = content_types[partname]
+            if PartFactory._part_cls_for(content_type) is ImagePart:
+                part = ImagePart(partname, content_type, self._package, b"")
+                ArchivedImagePart.release(part, self._pkg_file, reader.infos[partname])
+            else:
+                part = PartFactory(partname, content_type, self._package, blob=reader[partname])
+            parts[partname] = part
+        return parts
+
+
+def open_presentation(path):
+    """Same as ``pptx.Presentation(path)``, with picture bytes left in the file."""
+    path = os.path.abspath(path)
+    package = Package(path)
+    with zipfile.ZipFile(path) as archive:
+        pkg_xml_rels, parts = _LazyPackageLoader(path, package, archive)._load()
+    package._rels.load_from_xml(PACKAGE_URI, pkg_xml_rels, parts)
+
+    presentation_part = package.main_document_part
+    if not _is_pptx_package(presentation_part):
+        raise ValueError(f"file '{path}' is not a PowerPoint file, "
+                         f"content type is '{presentation_part.content_type}'")
+    return presentation_part.presentation
@@ -0,0 +1,213 @@
+"""Split a long capture session over several deck files ("parts").
+
+Saving and opening a deck both take longer the more slides it has, so a
+multi-hour session in one file gets slower with every capture. Instead,
+``VideoToPPT`` starts a new part file after a number of slides or
+megabytes, after a long pause, or when asked to (a chapter break).
+
+Part 1 is the configured deck itself; later parts add ``-part002`` and so
+on before the extension. A small JSON manifest next to the deck,
+``<deck>.manifest.json``, lists the parts in order (file names relative
+to the manifest), with the range of session-wide slide numbers each one
+holds, when it was started and last written, and why it was started.
+
+``merge_parts`` (or ``python deck_parts.py <manifest>``) joins the parts
+into one deck offline, appending them to a copy of part 1 one part at a
+time, so a merge never holds more than one part's pictures in memory.
+"""
+import argparse
+import copy
+import datetime
+import json
+import os
+import shutil
+import time
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def timestamp(seconds):
+    return datetime.datetime.fromtimestamp(seconds).isoformat(timespec="seconds")
+
+
+def parse_timestamp(text):
+    try:
+        return datetime.datetime.fromisoformat(text).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class DeckParts:
+    """The manifest of one capture session's part files."""
+
+    def __init__(self, deck_path):
+        self.deck_path = deck_path
+        self.path = self.manifest_path(deck_path)
+        self.parts = []  # Dicts: path, slides, first_slide, last_slide, started, ended, reason
+
+    @staticmethod
+    def manifest_path(deck_path):
+        return os.path.splitext(deck_path)[0] + MANIFEST_SUFFIX
+
+    def part_path(self, number):
+        if number == 1:
+            return self.deck_path
+        base, ext = os.path.splitext(self.deck_path)
+        return f"{base}-part{number:03d}{ext}"
+
+    @property
+    def current(self):
+        return self.parts[-1]
+
+    @property
+    def current_path(self):
+        return os.path.join(os.path.dirname(self.deck_path), self.current["path"])
+
+    @property
+    def last_activity(self):
+        """When the current part was last written, as seconds since the epoch (or None)."""
+        return parse_timestamp(self.current.get("ended")) if self.parts else None
+
+    def load(self):
+        """Read the manifest, or start one for a single part; returns the current part's path."""
+        try:
+            with open(self.path) as f:
+                self.parts = json.load(f)["parts"]
+        except FileNotFoundError:
+            self.parts = []
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read {self.path} ({e}) - starting a new manifest")
+            self.parts = []
+        if not self.parts:
+            self.parts = [self.new_part(1, "start")]
+        return self.current_path
+
+    def new_part(self, number, reason):
+        now = timestamp(time.time())
+        return {"path": os.path.basename(self.part_path(number)), "slides": 0,
+                "started": now, "ended": now, "reason": reason}
+
+    def start_next(self, reason):
+        """Close the current part and add the next one; returns its path."""
+        self.current["ended"] = timestamp(time.time())
+        self.parts.append(self.new_part(len(self.parts) + 1, reason))
+        self.write()
+        return self.current_path
+
+    def record(self, slides):
+        """Note the current part's slide count, e.g. after saving it."""
+        self.current["slides"] = slides
+        self.current["ended"] = timestamp(time.time())
+        self.write()
+
+    def write(self):
+        # Session-wide slide numbers follow from the part sizes
+        first = 1
+        for part in self.parts:
+            part["first_slide"] = first
+            part["last_slide"] = first + part["slides"] - 1
+            first += part["slides"]
+        manifest = {"deck": os.path.basename(self.deck_path), "parts": self.parts}
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not write deck manifest: {e}")
+
+
+def copy_slide(prs, media, source, layouts):
+    """Append a copy of ``source`` (a slide of another deck) to ``prs``; returns shapes skipped."""
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+    from pptx.oxml.ns import qn
+    from pptx.parts.image import ImagePart
+
+    layout = layouts.get(source.slide_layout.name, prs.slide_layouts[5])
+    slide = prs.slides.add_slide(layout)
+    tree = slide.shapes._spTree
+    for shape in list(slide.shapes):  # The layout's empty placeholders
+        tree.remove(shape._element)
+
+    skipped = 0
+    for shape in source.shapes:
+        element = copy.deepcopy(shape._element)
+        # Pictures are re-added through the media store, so they're shared
+        # across parts too; anything else linked (charts, media) isn't copied
+        if element.xpath(".//@r:id | .//@r:link"):
+            skipped += 1
+            continue
+        pictures = element.xpath(".//*[@r:embed]")
+        targets = [source.part.related_part(node.get(qn("r:embed"))) for node in pictures]
+        if not all(isinstance(target, ImagePart) for target in targets):
+            skipped += 1
+            continue
+        for node, target in zip(pictures, targets):
+            part, _ = media.get_or_add(target.blob)
+            node.set(qn("r:embed"), slide.part.relate_to(part, RT.IMAGE))
+        # The copy isn't in the tree yet, so a group's shapes need consecutive ids of their own
+        shape_id = slide.shapes._next_shape_id
+        for properties in element.xpath(".//p:cNvPr"):
+            properties.set("id", str(shape_id))
+            shape_id += 1
+        tree.insert_element_before(element, "p:extLst")
+
+    if source.has_notes_slide and source.notes_slide.notes_text_frame is not None:
+        text = source.notes_slide.notes_text_frame.text
+        if text:
+            slide.notes_slide.notes_text_frame.text = text
+    return skipped
+
+
+def merge_parts(manifest_path, output):
+    """Join the parts listed in ``manifest_path`` into one deck at ``output``."""
+    from deck_loader import open_presentation
+    from incremental_save import IncrementalSaver
+    from media import MediaStore
+
+    with open(manifest_path) as f:
+        paths = [part["path"] for part in json.load(f)["parts"]]
+    # Relative part paths are relative to the manifest
+    paths = [os.path.join(os.path.dirname(os.path.abspath(manifest_path)), path) for path in paths]
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        raise ValueError(f"none of the parts in {manifest_path} exist")
+
+    # Part 1 is the start of the merged deck as it is, edits and all
+    shutil.copyfile(paths[0], output)
+    merged = open_presentation(output)
+    media = MediaStore()
+    media.adopt(merged)
+    saver = IncrementalSaver(release_media=True)
+    saver.adopt(merged, output)
+    layouts = {layout.name: layout for layout in merged.slide_layouts}
+
+    skipped = 0
+    for path in paths[1:]:
+        part = open_presentation(path)
+        for slide in part.slides:
+            skipped += copy_slide(merged, media, slide, layouts)
+        saver.save(merged, output)
+        print(f"Merged {path} ({len(part.slides)} slides)")
+    if skipped:
+        print(f"Skipped {skipped} shape(s) linked to something other than a picture")
+    return len(merged.slides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the part files of a capture session into one deck.")
+    parser.add_argument("manifest", help="the session's .manifest.json, or its deck")
+    parser.add_argument("-o", "--output", help="merged .pptx (default: <deck>-merged.pptx)")
+    args = parser.parse_args()
+
+    manifest = args.manifest
+    if not manifest.endswith(MANIFEST_SUFFIX):
+        manifest = DeckParts.manifest_path(manifest)
+    output = args.output or manifest[:-len(MANIFEST_SUFFIX)] + "-merged.pptx"
+    started = time.time()
+    slides = merge_parts(manifest, output)
+    print(f"{slides} slides -> {output} ({time.time() - started:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Tiered duplicate detection for captured frames.
+
+Comparing two full-resolution frames with SSIM takes tens to hundreds of
+milliseconds, far too slow to run on every grab. Most comparisons are
+obvious though - the frame is either unchanged or a completely different
+slide - so the detector works in tiers and stops at the first one that is
+confident:
+
+1. ``hash``: 64-bit difference hash plus a 32x18 thumbnail difference.
+   Settles identical and clearly different frames in microseconds.
+2. ``ssim``: SSIM on a downscaled grayscale copy, for the ambiguous rest.
+3. ``full``: optional full-resolution grayscale SSIM when the downscaled
+   score lands within ``full_margin`` of the threshold.
+
+Every decision reports the tier that made it and the score it used.
+"""
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+THUMBNAIL_SIZE = (32, 18)  # 16:9 grayscale, 576 bytes
+
+DuplicateResult = namedtuple("DuplicateResult", ["is_duplicate", "tier", "score"])
+
+
+def dhash(gray):
+    """64-bit difference hash of a grayscale PIL image."""
+    small = np.asarray(gray.resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+class FrameFeatures:
+    """Everything the detector needs from one frame, computed once."""
+    __slots__ = ("size", "fingerprint", "thumbnail", "small", "gray")
+
+    def __init__(self, size, fingerprint, thumbnail, small, gray=None):
+        self.size = size
+        self.fingerprint = fingerprint
+        self.thumbnail = thumbnail  # uint8 array at THUMBNAIL_SIZE
+        self.small = small  # uint8 grayscale array, downscaled for SSIM
+        self.gray = gray  # Full-resolution grayscale array, only for the full tier
+
+
+class DuplicateDetector:
+    """Decides whether a frame repeats the previous one, cheapest test first."""
+
+    def __init__(self, similarity_threshold=0.85):
+        self.similarity_threshold = similarity_threshold  # SSIM above this is a duplicate
+        self.hash_duplicate_distance = 0  # dHash distance at or below this (with thumb_duplicate_diff) is a duplicate
+        self.thumb_duplicate_diff = 0.5  # Mean thumbnail difference (0-255) that still counts as identical
+        self.hash_distinct_distance = 16  # dHash distance at or above this is a new frame
+        self.thumb_distinct_diff = 24.0  # Mean thumbnail difference at or above this is a new frame
+        self.ssim_width = 320  # Width of the downscaled grayscale frame for tier 2
+        self.full_resolution_check = False  # Enable tier 3
+        self.full_margin = 0.03  # Tier 2 scores this close to the threshold go to tier 3
+
+    def features(self, image):
+        """Compute comparison features for a PIL image."""
+        gray = image.convert("L")
+        width, height = gray.size
+        small_size = (min(self.ssim_width, width), max(1, round(height * min(self.ssim_width, width) / width)))
+        small = gray.resize(small_size, Image.BILINEAR, reducing_gap=2.0)
+        thumbnail = small.resize(THUMBNAIL_SIZE, Image.BILINEAR)
+        return FrameFeatures(
+            size=image.size,
+            fingerprint=dhash(small),
+            thumbnail=np.asarray(thumbnail),
+            small=np.asarray(small),
+            gray=np.asarray(gray) if self.full_resolution_check else None,
+        )
+
+    def compare(self, new, last):
+        """Return a DuplicateResult for ``new`` against ``last`` (both FrameFeatures)."""
+        if last is None or new.size != last.size:
+            return DuplicateResult(False, "size", None)
+
+        # Tier 1: hash and thumbnail
+        distance = hamming(new.fingerprint, last.fingerprint)
+        thumb_diff = float(np.mean(np.abs(new.thumbnail.astype(np.int16) - last.thumbnail)))
+        if distance <= self.hash_duplicate_distance and thumb_diff <= self.thumb_duplicate_diff:
+            return DuplicateResult(True, "hash", distance)
+        if distance >= self.hash_distinct_distance or thumb_diff >= self.thumb_distinct_diff:
+            return DuplicateResult(False, "hash", distance)
+
+        # Tier 2: SSIM on the downscaled grayscale frame
+        score = ssim_gray(new.small, last.small)
+        ambiguous = abs(score - self.similarity_threshold) < self.full_margin
+        if not (self.full_resolution_check and ambiguous and new.gray is not None and last.gray is not None):
+            return DuplicateResult(score > self.similarity_threshold, "ssim", score)
+
+        # Tier 3: full-resolution grayscale SSIM
+        score = ssim_gray(new.gray, last.gray)
+        return DuplicateResult(score > self.similarity_threshold, "full", score)
+
+
+def ssim_gray(a, b):
+    """SSIM between two uint8 grayscale arrays of the same shape."""
+    # skimage pulls in scipy, which takes longer to import than everything else
+    from skimage.metrics import structural_similarity as ssim
+    # SSIM's default 7x7 window doesn't fit very small frames
+    win_size = min(7, min(a.shape) - (min(a.shape) + 1) % 2)
+    if win_size < 3:
+        return 1.0 - float(np.mean(np.abs(a.astype(np.int16) - b))) / 255
+    return float(ssim(a, b, data_range=255, win_size=win_size))
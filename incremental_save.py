@@ -0,0 +1,187 @@
+"""Append-only saving for python-pptx presentations.
+
+A normal ``Presentation.save`` re-serializes and re-zips every part of the
+deck, so saving after each capture gets slower as the deck grows. Slides are
+only ever appended while capturing, so after the first full save each save
+only needs to add the new slide and picture parts and replace the handful of
+package-level entries that list them (presentation.xml, its relationships
+and [Content_Types].xml).
+
+ZIP readers locate entries through the central directory at the end of the
+archive, so the replaced entries are simply dropped from the directory and
+their old bytes are left in place as dead space. New entries and the new
+directory are written after the old directory rather than over it, so the
+file up to its previous size stays a valid archive: an append torn by a
+crash can be undone by truncating back to that size. Once the dead space
+grows past ``compact_ratio`` of the file a full save rewrites the archive
+cleanly.
+
+Once a picture is safely in the saved file its bytes don't need to stay in
+memory too: with ``release_media`` the saver swaps each written image part
+for an ``ArchivedImagePart`` that reads its bytes back from the file on the
+rare occasions they are needed (a full rewrite, for instance).
+"""
+import hashlib
+import os
+import zipfile
+
+from pptx.opc.oxml import serialize_part_xml
+from pptx.parts.image import ImagePart
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+
+# Media is already compressed, deflating it again only costs time
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.tif', '.tiff', '.bmp')
+
+
+class ArchivedImagePart(ImagePart):
+    """Image part whose bytes live only in the saved deck, not in memory."""
+
+    @classmethod
+    def release(cls, part, path, info):
+        """Turn ``part`` into an archived part backed by ``info`` inside ``path``."""
+        # Keep the digest if it was ever computed; otherwise it's worked out on demand
+        sha1 = part.__dict__.get('sha1')
+        part.__class__ = cls
+        part.__dict__.pop('_blob', None)
+        part._archive = (path, info.filename, info.CRC, info.file_size)
+        part._sha1 = sha1
+
+    @property
+    def _blob(self):
+        path, name, crc, size = self._archive
+        with zipfile.ZipFile(path) as archive:
+            info = archive.NameToInfo.get(name)
+            # The file may have been rewritten (e.g. by PowerPoint) and the
+            # media renumbered, so fall back to matching on content checksum
+            if info is None or info.CRC != crc or info.file_size != size:
+                info = next((candidate for candidate in archive.infolist()
+                             if candidate.CRC == crc and candidate.file_size == size), None)
+            if info is None:
+                raise FileNotFoundError(f"{name} is no longer in {path}")
+            return archive.read(info)
+
+    @property
+    def sha1(self):
+        if self._sha1 is None:
+            self._sha1 = hashlib.sha1(self._blob).hexdigest()
+        return self._sha1
+
+
+class IncrementalSaver:
+    """Saves a presentation to one file, appending new parts when possible."""
+
+    def __init__(self, compact_ratio=0.5, release_media=False):
+        self.compact_ratio = compact_ratio  # Full rewrite once dead bytes exceed this share of the file
+        self.release_media = release_media  # Drop in-memory picture bytes once they are saved
+        self.fsync = False  # Flush each save to disk before returning
+        self.path = None
+        self.written = set()  # Part names already present in the archive
+        self.stamp = None  # (size, mtime) of the file right after our last write
+        self.dead_bytes = 0
+        self.last_mode = None
+
+    def adopt(self, prs, path):
+        """Record that ``path`` holds exactly the parts of ``prs`` (e.g. it was just loaded)."""
+        self.path = os.path.abspath(path)
+        self.written = {str(part.partname) for part in prs.part.package.iter_parts()}
+        self.stamp = self._stat(path)
+        self.dead_bytes = 0
+        if self.release_media:
+            self._release_media(prs, path)
+
+    def save(self, prs, path):
+        """Save ``prs`` to ``path`` and return "append" or "full" for the mode used."""
+        parts = list(prs.part.package.iter_parts())
+        if self._can_append(parts, path):
+            self._append(prs, parts, path)
+            self.last_mode = "append"
+        else:
+            # Write next to the target and swap it in, so a crash mid-save
+            # never leaves a half-written deck (and archived pictures can
+            # still be read from the old file while writing)
+            temp_path = path + ".saving"
+            prs.save(temp_path)
+            self._sync(temp_path)
+            os.replace(temp_path, path)
+            self.adopt(prs, path)
+            self.last_mode = "full"
+        return self.last_mode
+
+    def _can_append(self, parts, path):
+        if self.path != os.path.abspath(path) or self.stamp is None:
+            return False
+
+        # Someone else (e.g. PowerPoint) rewrote the file since our last save
+        if self._stat(path) != self.stamp:
+            return False
+
+        # Appending can only add parts; anything removed needs a rewrite
+        current = {str(part.partname) for part in parts}
+        if not self.written <= current:
+            return False
+
+        return self.dead_bytes <= self.compact_ratio * self.stamp[0]
+
+    def _append(self, prs, parts, path):
+        package = prs.part.package
+        entries = []
+
+        for part in parts:
+            partname = str(part.partname)
+            if partname in self.written and part is not prs.part:
+                continue
+            entries.append((part.partname.membername, part.blob))
+            if part._rels:
+                entries.append((part.partname.rels_uri.membername, part.rels.xml))
+
+        # Package-level entries that list every part
+        entries.append((PACKAGE_URI.rels_uri.membername, package._rels.xml))
+        entries.append((CONTENT_TYPES_URI.membername,
+                        serialize_part_xml(_ContentTypesItem.xml_for(parts))))
+
+        with zipfile.ZipFile(path, 'a', compression=zipfile.ZIP_DEFLATED) as archive:
+            # Keep the old directory intact: write from the end of the file
+            archive.fp.seek(0, os.SEEK_END)
+            self.dead_bytes += archive.fp.tell() - archive.start_dir
+            archive.start_dir = archive.fp.tell()
+            for name, blob in entries:
+                # Drop the old directory entry; its bytes stay behind as dead space
+                old = archive.NameToInfo.pop(name, None)
+                if old is not None:
+                    archive.filelist.remove(old)
+                    self.dead_bytes += old.compress_size + 30 + len(old.filename)
+
+                compress_type = zipfile.ZIP_DEFLATED
+                if name.lower().endswith(STORED_EXTENSIONS):
+                    compress_type = zipfile.ZIP_STORED
+                archive.writestr(name, blob, compress_type=compress_type)
+
+        self._sync(path)
+        self.written.update(str(part.partname) for part in parts)
+        self.stamp = self._stat(path)
+        if self.release_media:
+            self._release_media(prs, path)
+
+    def _release_media(self, prs, path):
+        path = os.path.abspath(path)
+        with zipfile.ZipFile(path) as archive:
+            for part in prs.part.package.iter_parts():
+                if type(part) is not ImagePart:
+                    continue
+                info = archive.NameToInfo.get(part.partname.membername)
+                if info is not None:
+                    ArchivedImagePart.release(part, path, info)
+
+    def _sync(self, path):
+        if self.fsync:
+            with open(path, 'rb+') as f:
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
@@ -0,0 +1,171 @@
+"""Append-only journal of captures, for durability between deck saves.
+
+Saving the deck after every capture is the only thing that makes a capture
+survive a crash, and it is the most expensive step of a capture. Instead,
+each capture's encoded picture is appended to a journal file next to the
+deck, and the journal is fsynced in batches: at most every
+``fsync_interval`` seconds or ``fsync_every`` records, and whenever the
+capture queue runs dry. The deck itself only has to be written now and
+then, and at exit.
+
+Each record carries the slide number the capture became in the deck. After
+a successful deck save the journal is emptied; on restart any records for
+slides beyond the end of the loaded deck are replayed into it.
+
+Before the deck is appended to in place, a checkpoint record notes its
+size. The saver never overwrites the old ZIP directory, so a deck torn by
+a crash mid-append is repaired by truncating it back to that size. A
+torn tail can't be told apart by opening the deck - ``zipfile`` looks
+for the directory record in the last 64 KB and happily finds the old
+one - so any deck that still starts with the checkpointed archive and
+has grown past it is truncated; whatever the append held is replayed
+from the journal.
+
+Record layout: magic, kind, slide number, CRC-32 and length of the
+payload (``HEADER``), then the payload. A torn or corrupt tail ends the
+journal at the last good record.
+"""
+import collections
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+HEADER = struct.Struct("<4sBIIQ")
+MAGIC = b"VTPJ"
+
+PICTURE = ord("P")  # Payload: the encoded picture
+REFERENCE = ord("R")  # Payload: (CRC-32, size) of a picture already in the deck or journal
+CHECKPOINT = ord("C")  # Payload: deck size before an in-place append
+
+JournalRecord = collections.namedtuple("JournalRecord", ["kind", "slide_number", "payload"])
+
+REFERENCE_PAYLOAD = struct.Struct("<IQ")
+CHECKPOINT_PAYLOAD = struct.Struct("<Q")
+
+
+class CaptureJournal:
+    """Append-only record of captures not yet saved in the deck."""
+
+    def __init__(self, fsync_interval=1.0, fsync_every=8):
+        self.fsync_interval = fsync_interval  # Seconds a written record may wait for fsync
+        self.fsync_every = fsync_every  # Records a batch may hold before fsync
+        self.path = None
+        self.file = None
+        self.pending = 0  # Records written but not yet fsynced
+        self.last_sync = time.time()
+
+    @staticmethod
+    def journal_path(deck_path):
+        return os.path.splitext(deck_path)[0] + ".journal"
+
+    def recover(self, deck_path):
+        """Read the journal for ``deck_path`` and repair a torn append; returns its records."""
+        self.close()
+        self.path = self.journal_path(deck_path)
+        records, good_length = self.read(self.path)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > good_length:
+            print(f"Journal ends in a partial record; keeping the first {len(records)} record(s)")
+            with open(self.path, "rb+") as f:
+                f.truncate(good_length)
+
+        checkpoints = [record for record in records if record.kind == CHECKPOINT]
+        if checkpoints and os.path.exists(deck_path):
+            size = CHECKPOINT_PAYLOAD.unpack(checkpoints[-1].payload)[0]
+            if os.path.getsize(deck_path) > size and self.archive_ends_at(deck_path, size):
+                print(f"{deck_path} was not saved completely; restoring it to its last complete state")
+                with open(deck_path, "rb+") as f:
+                    f.truncate(size)
+        return [record for record in records if record.kind != CHECKPOINT]
+
+    @staticmethod
+    def read(path):
+        """Return (records, length of the valid prefix) of a journal file."""
+        records = []
+        good_length = 0
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    header = f.read(HEADER.size)
+                    if len(header) < HEADER.size:
+                        break
+                    magic, kind, slide_number, crc, length = HEADER.unpack(header)
+                    if magic != MAGIC:
+                        break
+                    payload = f.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != crc:
+                        break
+                    records.append(JournalRecord(kind, slide_number, payload))
+                    good_length = f.tell()
+        except OSError:
+            pass
+        return records, good_length
+
+    @staticmethod
+    def archive_ends_at(deck_path, size):
+        """Whether the first ``size`` bytes of the deck end in a ZIP directory record.
+
+        True after an append (the old archive is still there in front of
+        it); false once a full save has replaced the file.
+        """
+        end = zipfile.sizeEndCentDir
+        if size < end:
+            return False
+        try:
+            with open(deck_path, "rb") as f:
+                f.seek(size - end)
+                return f.read(4) == zipfile.stringEndArchive
+        except OSError:
+            return False
+
+    def open(self):
+        """Start appending to the journal found by ``recover``."""
+        if self.file is None and self.path:
+            self.file = open(self.path, "ab")
+
+    def append(self, kind, slide_number, payload):
+        """Write one record; it is fsynced with the current batch. Returns the bytes written."""
+        if self.file is None:
+            return 0
+        self.file.write(HEADER.pack(MAGIC, kind, slide_number, zlib.crc32(payload), len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.time() - self.last_sync >= self.fsync_interval:
+            self.sync()
+        return HEADER.size + len(payload)
+
+    def add_picture(self, slide_number, blob):
+        return self.append(PICTURE, slide_number, blob)
+
+    def add_reference(self, slide_number, key):
+        return self.append(REFERENCE, slide_number, REFERENCE_PAYLOAD.pack(*key))
+
+    def checkpoint(self, deck_size):
+        """Note the deck's size right before it is appended to in place."""
+        self.append(CHECKPOINT, 0, CHECKPOINT_PAYLOAD.pack(deck_size))
+        self.sync()
+
+    def sync(self):
+        if self.file is not None and self.pending:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.time()
+
+    def reset(self):
+        """Empty the journal once everything in it is safely in the deck."""
+        if self.file is not None:
+            self.file.truncate(0)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+        elif self.path and os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                f.truncate(0)
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
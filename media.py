@@ -0,0 +1,104 @@
+"""Content-addressed picture parts for a python-pptx presentation.
+
+``add_picture`` looks for an existing part with the same bytes by walking
+every relationship in the package and comparing SHA-1 digests, and then
+walks every part again to number the new one, so each picture costs time
+proportional to the deck. Identical captures (a double key press, a
+paused video) still have to be encoded before they can be matched.
+
+``MediaStore`` keeps two maps instead:
+
+- pixels -> part, for captures whose raw pixels were seen this session,
+  so an identical frame reuses the part without being encoded at all;
+- (CRC-32, size) -> part, for everything in the deck. For pictures loaded
+  from a saved deck both values come from the ZIP directory, so rebuilding
+  the map on load reads no image data.
+
+A slide showing identical pixels therefore references one shared media
+part; what the slides look like never changes.
+"""
+import hashlib
+import zlib
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image, ImagePart
+
+
+def content_key(part):
+    """(CRC-32, size) of an image part's bytes, without reading them if they're archived."""
+    archive = getattr(part, "_archive", None)
+    if archive is not None:
+        return archive[2], archive[3]
+    blob = part.blob
+    return zlib.crc32(blob), len(blob)
+
+
+def pixel_key(image):
+    """Digest of a PIL image's mode, size and raw pixels."""
+    # Frames from a buffered capture backend are hashed in place (see capture.py)
+    pixels = getattr(image, "array", None)
+    digest = hashlib.blake2b(pixels if pixels is not None else image.tobytes(), digest_size=16)
+    digest.update(f"{image.mode}{image.size}".encode("ascii"))
+    return digest.digest()
+
+
+class MediaStore:
+    """One picture part per distinct image in a presentation."""
+
+    def __init__(self):
+        self.package = None
+        self.by_pixels = {}  # pixel_key -> part, captures of this session
+        self.by_content = {}  # (crc, size) -> part
+        self.next_index = 1  # Next free /ppt/media/imageN number
+        self.shared = 0  # Pictures that reused an existing part
+
+    def adopt(self, prs):
+        """Index the picture parts of ``prs``, e.g. right after loading or creating it."""
+        self.package = prs.part.package
+        self.by_pixels = {}
+        self.by_content = {}
+        self.shared = 0
+        highest = 0
+        for part in self.package.iter_parts():
+            if not isinstance(part, ImagePart):
+                continue
+            self.by_content.setdefault(content_key(part), part)
+            if str(part.partname).startswith("/ppt/media/image") and part.partname.idx:
+                highest = max(highest, part.partname.idx)
+        self.next_index = highest + 1
+
+    def find(self, key):
+        """Part already holding these pixels, or None."""
+        part = self.by_pixels.get(key)
+        if part is not None:
+            self.shared += 1
+        return part
+
+    def get_or_add(self, blob, key=None):
+        """Return (part holding exactly ``blob``, whether it already existed)."""
+        content = (zlib.crc32(blob), len(blob))
+        part = self.by_content.get(content)
+        # A checksum match is confirmed on the bytes (archived parts read them back once)
+        existing = part is not None and part.blob == blob
+        if existing:
+            self.shared += 1
+        else:
+            image = Image.from_blob(blob)
+            partname = PackURI(f"/ppt/media/image{self.next_index}.{image.ext}")
+            self.next_index += 1
+            part = ImagePart(partname, image.content_type, self.package, blob, image.filename)
+            self.by_content[content] = part
+        if key is not None:
+            self.by_pixels[key] = part
+        return part, existing
+
+    @staticmethod
+    def add_picture(slide, part, left, top, width, height):
+        """Place ``part`` on ``slide`` at the given position and size."""
+        rId = slide.part.relate_to(part, RT.IMAGE)
+        shapes = slide.shapes
+        # Same as shapes.add_picture, minus the lookup and the native-size read
+        shape_id = shapes._next_shape_id
+        shapes._grpSp.add_pic(shape_id, f"Picture {shape_id - 1}", part.desc, rId, left, top, width, height)
+        return shapes[-1]
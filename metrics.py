@@ -0,0 +1,281 @@
+"""Per-stage timing of the capture pipeline.
+
+Every stage of a capture - grab, region detection, dedup, encode, slide
+insert, journal, save, and the wait in the capture queue - is timed with
+``perf_counter`` into a ``StageStats``: count, total, maximum, bytes
+written, and the most recent ``samples`` durations for latency
+percentiles. A stage timed inside another one (the journal write inside
+a slide insert) is subtracted from the outer stage, so stages never count
+the same time twice. Recording is a few dictionary operations under a
+lock, and with ``enabled`` off ``stage`` hands back a shared no-op timer.
+
+A capture (a key press, or one frame of continuous capture) also collects
+its own per-stage breakdown on the thread that handles it, and its total
+time goes into a latency distribution per kind of capture. When it takes
+longer than its budget, or a stage takes longer than that stage's budget,
+one JSON line naming the offending stages goes to the slow-capture log.
+
+``write_report`` dumps everything as JSON (at exit) and
+``write_prometheus`` as a node_exporter textfile (while running).
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+STAGES = ("grab", "region", "dedup", "encode", "insert", "journal", "save", "queue_wait")
+
+
+class StageStats:
+    """Counters and recent latencies for one stage."""
+    __slots__ = ("count", "total", "max", "bytes", "recent")
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+        self.recent = collections.deque(maxlen=samples)
+
+    def add(self, seconds, nbytes):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes += nbytes
+        self.recent.append(seconds)
+
+    def percentile(self, share):
+        """Latency at ``share`` (0-1) over the recent samples."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class _StageTimer:
+    """Times one ``with`` block; set ``nbytes`` inside it to count bytes written."""
+    __slots__ = ("metrics", "name", "start", "nbytes", "nested", "outer")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.nbytes = 0
+        self.nested = 0.0  # Time spent in stages timed inside this one
+
+    def __enter__(self):
+        local = self.metrics.local
+        self.outer = getattr(local, "timer", None)
+        local.timer = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.local.timer = self.outer
+        if self.outer is not None:
+            self.outer.nested += elapsed
+        self.metrics.record(self.name, elapsed - self.nested, self.nbytes)
+
+
+class _NoTimer:
+    """Stands in for _StageTimer while metrics are off."""
+    nbytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+class Metrics:
+    """Collects stage timings, per-capture breakdowns and the slow-capture log."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.samples = 1024  # Recent durations kept per stage for percentiles
+        self.capture_budget = 1.0  # Seconds a key-press capture may take before it's logged as slow
+        self.frame_budget = 0.25  # Same for one frame of continuous capture
+        self.stage_budgets = {  # Seconds per stage before a capture is logged as slow
+            "grab": 0.1, "region": 2.0, "dedup": 0.1, "encode": 0.3,
+            "insert": 0.1, "journal": 0.05, "save": 0.5, "queue_wait": 0.5,
+        }
+        self.slow_log_path = None  # JSON lines, one per slow capture
+        self.prometheus_path = None  # node_exporter textfile, rewritten while running
+        self.prometheus_interval = 15  # Seconds between textfile updates
+        self.lock = threading.Lock()
+        self.local = threading.local()  # The capture in progress on each thread
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.stages = {}
+        self.captures = collections.Counter()  # Finished captures by kind
+        self.latency = {}  # Kind -> StageStats of whole-capture durations
+        self.slow = collections.Counter()  # Slow captures by kind
+        self.last_export = 0.0
+
+    def stage(self, name):
+        """Context manager timing one stage."""
+        if not self.enabled:
+            return _NO_TIMER
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds, nbytes=0):
+        """Add one measurement of stage ``name``, also to the capture in progress."""
+        if not self.enabled:
+            return
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats(self.samples)
+            stats.add(seconds, nbytes)
+        current = getattr(self.local, "capture", None)
+        if current is not None:
+            current["stages"][name] = current["stages"].get(name, 0.0) + seconds
+
+    def begin_capture(self, kind="capture", **details):
+        """Start a per-capture breakdown on this thread; ``details`` go into the slow log."""
+        if self.enabled:
+            self.local.capture = {"kind": kind, "start": time.perf_counter(), "stages": {}, **details}
+
+    def end_capture(self):
+        """Finish this thread's capture; logs it if it was slow. Returns its duration."""
+        current = getattr(self.local, "capture", None)
+        if current is None:
+            return 0.0
+        self.local.capture = None
+        kind = current.pop("kind")
+        elapsed = time.perf_counter() - current.pop("start")
+        stages = current.pop("stages")
+        # Time spent waiting in the queue happened before this thread picked the capture up
+        total = elapsed + stages.get("queue_wait", 0.0)
+        budget = self.frame_budget if kind == "frame" else self.capture_budget
+        over = [name for name, seconds in stages.items() if seconds > self.stage_budgets.get(name, budget)]
+        with self.lock:
+            self.captures[kind] += 1
+            latency = self.latency.get(kind)
+            if latency is None:
+                latency = self.latency[kind] = StageStats(self.samples)
+            latency.add(total, 0)
+            slow = total > budget or bool(over)
+            if slow:
+                self.slow[kind] += 1
+        if slow:
+            self.log_slow(kind, total, budget, stages, over, current)
+        return total
+
+    def log_slow(self, kind, total, budget, stages, over, details):
+        # The stages over their own budget, else whichever took longest
+        culprits = over or ([max(stages, key=stages.get)] if stages else [])
+        print(f"Slow {kind}: {total * 1000:.0f} ms (budget {budget * 1000:.0f} ms), "
+              f"mostly {', '.join(f'{name} {stages[name] * 1000:.0f} ms' for name in culprits)}")
+        if not self.slow_log_path:
+            return
+        entry = {
+            "time": round(time.time(), 3), "kind": kind, "total_ms": round(total * 1000, 1),
+            "budget_ms": round(budget * 1000, 1), "culprits": culprits,
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in stages.items()},
+            **details,
+        }
+        try:
+            with open(self.slow_log_path, "a") as log:
+                log.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Could not write slow-capture log: {e}")
+
+    def report(self):
+        """Everything recorded so far, as a JSON-ready dict."""
+        with self.lock:
+            order = sorted(self.stages, key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+            stages = {name: self.summary(self.stages[name]) for name in order}
+            latency = {kind: self.summary(stats) for kind, stats in self.latency.items()}
+            return {
+                "started": round(self.started, 3),
+                "duration_s": round(time.time() - self.started, 3),
+                "captures": dict(self.captures),
+                "slow_captures": dict(self.slow),
+                "bytes_written": sum(stats.bytes for stats in self.stages.values()),
+                "stages": stages,
+                "capture_latency": latency,
+            }
+
+    @staticmethod
+    def summary(stats):
+        return {
+            "count": stats.count,
+            "total_s": round(stats.total, 4),
+            "mean_ms": round(stats.total / stats.count * 1000, 2) if stats.count else 0.0,
+            "p50_ms": round(stats.percentile(0.50) * 1000, 2),
+            "p90_ms": round(stats.percentile(0.90) * 1000, 2),
+            "p99_ms": round(stats.percentile(0.99) * 1000, 2),
+            "max_ms": round(stats.max * 1000, 2),
+            "bytes": stats.bytes,
+        }
+
+    def write_report(self, path):
+        if not self.enabled or not path:
+            return
+        try:
+            with open(path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+            print(f"Performance report written to {path}")
+        except OSError as e:
+            print(f"Could not write performance report: {e}")
+
+    def prometheus_text(self):
+        with self.lock:
+            stages = list(self.stages.items())
+            captures, slow = dict(self.captures), dict(self.slow)
+            lines = [
+                "# HELP video_to_ppt_stage_seconds Time spent in each capture pipeline stage.",
+                "# TYPE video_to_ppt_stage_seconds summary",
+            ]
+            for name, stats in stages:
+                for quantile in (0.5, 0.9, 0.99):
+                    lines.append(f'video_to_ppt_stage_seconds{{stage="{name}",quantile="{quantile}"}} '
+                                 f'{stats.percentile(quantile):.6f}')
+                lines.append(f'video_to_ppt_stage_seconds_sum{{stage="{name}"}} {stats.total:.6f}')
+                lines.append(f'video_to_ppt_stage_seconds_count{{stage="{name}"}} {stats.count}')
+            lines += [
+                "# HELP video_to_ppt_stage_bytes_total Bytes written to disk by each stage.",
+                "# TYPE video_to_ppt_stage_bytes_total counter",
+            ]
+            for name, stats in stages:
+                if stats.bytes:
+                    lines.append(f'video_to_ppt_stage_bytes_total{{stage="{name}"}} {stats.bytes}')
+        for metric, counts, text in (("captures", captures, "Captures handled"),
+                                     ("slow_captures", slow, "Captures over their time budget")):
+            lines += [f"# HELP video_to_ppt_{metric}_total {text}, by kind.",
+                      f"# TYPE video_to_ppt_{metric}_total counter"]
+            for kind, count in counts.items():
+                lines.append(f'video_to_ppt_{metric}_total{{kind="{kind}"}} {count}')
+        lines += [
+            "# HELP video_to_ppt_start_time_seconds When this capture session started.",
+            "# TYPE video_to_ppt_start_time_seconds gauge",
+            f"video_to_ppt_start_time_seconds {self.started:.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, force=False):
+        """Rewrite the textfile if it is due (or ``force``); node_exporter never sees it half-written."""
+        if not self.enabled or not self.prometheus_path:
+            return
+        now = time.time()
+        if not force and now - self.last_export < self.prometheus_interval:
+            return
+        self.last_export = now
+        temp_path = self.prometheus_path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write(self.prometheus_text())
+            os.replace(temp_path, self.prometheus_path)
+        except OSError as e:
+            print(f"Could not write Prometheus textfile: {e}")
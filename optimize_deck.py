@@ -0,0 +1,278 @@
+"""Shrink a finished deck: resample, reframe and recompress its pictures.
+
+Captures go into the deck at the native resolution of the video region and
+are stretched over the whole slide, whatever their aspect ratio. A 4K
+region stores four times the pixels a 1080p projector shows, and a region
+that isn't 16:9 comes out distorted. This pass writes a new deck in which
+every picture is
+
+- resampled down to the pixels its frame covers when the slide is shown
+  ``display_width`` pixels wide (pictures are never scaled up),
+- fitted to its frame's aspect ratio: ``letterbox`` shrinks the frame to
+  the picture's shape, centred where it was; ``crop`` trims the picture's
+  edges to the frame's shape; ``stretch`` leaves both as they are,
+- re-encoded as PNG or JPEG, lowering JPEG quality (or reducing PNG to a
+  palette) until it fits ``max_kb`` if one is set.
+
+Each distinct picture is processed once, in a process pool; a picture that
+would come out larger and isn't cropped keeps its original bytes.
+Pictures already cropped in PowerPoint are left alone.
+
+    python optimize_deck.py "Introduction Module1.pptx" --display-width 1920 --format JPEG --max-kb 300
+"""
+import argparse
+import collections
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+FITS = ("letterbox", "crop", "stretch")
+FORMATS = ("keep", "PNG", "JPEG", "smallest")
+
+
+def fit_picture(image, box, fit):
+    """Crop ``image`` for ``fit`` and return it with the size it should be resampled to."""
+    width, height = image.size
+    box_width, box_height = box
+    if fit == "crop":
+        # Trim the longer dimension, keeping the middle of the picture
+        if width * box_height > height * box_width:
+            keep = round(height * box_width / box_height)
+            image = image.crop(((width - keep) // 2, 0, (width - keep) // 2 + keep, height))
+        elif width * box_height < height * box_width:
+            keep = round(width * box_height / box_width)
+            image = image.crop((0, (height - keep) // 2, width, (height - keep) // 2 + keep))
+        width, height = image.size
+        scale = min(1.0, box_width / width)
+        return image, (max(1, round(width * scale)), max(1, round(height * scale)))
+    if fit == "letterbox":
+        scale = min(1.0, box_width / width, box_height / height)
+        return image, (max(1, round(width * scale)), max(1, round(height * scale)))
+    return image, (min(width, box_width), min(height, box_height))
+
+
+def encode_picture(image, image_format, settings):
+    """Encode ``image`` as PNG or JPEG, lossier until it fits ``settings["max_kb"]``."""
+    limit = settings["max_kb"] * 1024 if settings.get("max_kb") else None
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        quality = settings["quality"]
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality, optimize=True)
+            if not limit or buffer.tell() <= limit or quality <= settings["min_quality"]:
+                return buffer.getvalue()
+            quality = max(settings["min_quality"], quality - 5)
+
+    if image.mode not in ("RGB", "RGBA", "L", "P"):
+        image = image.convert("RGB")
+    image.save(buffer, format="PNG", compress_level=settings["png_compress_level"])
+    if limit and buffer.tell() > limit and image.mode != "P":
+        # Slides are mostly flat colour, so a palette rarely shows
+        buffer = io.BytesIO()
+        image.quantize(256).save(buffer, format="PNG", compress_level=settings["png_compress_level"])
+    return buffer.getvalue()
+
+
+def optimize_picture(blob, box, settings):
+    """Worker: return (new bytes or None if unchanged, old pixel size, new pixel size)."""
+    with Image.open(io.BytesIO(blob)) as image:
+        image.load()
+        original_format, original_size = image.format, image.size
+        fitted, size = fit_picture(image, box, settings["fit"])
+        cropped = fitted.size != original_size
+        if size != fitted.size:
+            fitted = fitted.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+        image_format = settings["format"]
+        if image_format == "keep":
+            image_format = original_format if original_format in ("PNG", "JPEG") else "PNG"
+        if image_format == "smallest":
+            encoded = min((encode_picture(fitted, name, settings) for name in ("PNG", "JPEG")), key=len)
+        else:
+            encoded = encode_picture(fitted, image_format, settings)
+
+    # Fewer pixels don't always compress smaller (e.g. flat colours gain soft edges)
+    if not cropped and len(encoded) >= len(blob):
+        return None, original_size, original_size
+    return encoded, original_size, size
+
+
+class DeckOptimizer:
+    """Runs ``optimize_picture`` over a deck's pictures in a process pool."""
+
+    def __init__(self, workers=None, display_width=1920, fit="letterbox", image_format="keep",
+                 quality=85, min_quality=50, max_kb=None, png_compress_level=6):
+        self.workers = workers or os.cpu_count() or 1
+        self.display_width = display_width  # Pixels across the slide when it is shown
+        self.max_pending = 2 * self.workers  # Pictures read but not yet written back
+        self.settings = {"fit": fit, "format": image_format, "quality": quality,
+                         "min_quality": min_quality, "max_kb": max_kb,
+                         # Level 9 is several times slower on noisy captures for a few percent
+                         "png_compress_level": png_compress_level}
+
+    def plan(self, prs):
+        """Group the deck's pictures by (part, frame size in display pixels).
+
+        Returns {key: [(slide number, slide, picture), ...]} in slide order
+        and the number of pictures skipped because they are cropped.
+        """
+        from pptx.shapes.picture import Picture
+
+        pixels_per_emu = self.display_width / prs.slide_width
+        jobs = collections.OrderedDict()
+        skipped = 0
+        for number, slide in enumerate(prs.slides, 1):
+            for shape in slide.shapes:
+                if not isinstance(shape, Picture) or shape._element.blip_rId is None:
+                    continue
+                if any((shape.crop_left, shape.crop_top, shape.crop_right, shape.crop_bottom)):
+                    skipped += 1
+                    continue
+                part = slide.part.related_part(shape._element.blip_rId)
+                box = (max(1, round(shape.width * pixels_per_emu)), max(1, round(shape.height * pixels_per_emu)))
+                jobs.setdefault((part.partname, box), []).append((number, slide, shape))
+        return jobs, skipped
+
+    def run(self, path, output):
+        """Write the optimized copy of the deck at ``path`` to ``output``; returns the per-slide report."""
+        from deck_loader import open_presentation
+        from media import MediaStore, content_key
+
+        prs = open_presentation(path)
+        media = MediaStore()
+        media.adopt(prs)
+        jobs, skipped = self.plan(prs)
+        slides = {number: {"slide": number, "pictures": 0, "bytes_before": 0, "bytes_after": 0, "pixels": []}
+                  for number in range(1, len(prs.slides) + 1)}
+        counted_before, counted_after = set(), set()  # Parts already in the report
+
+        def finish(key, uses, future):
+            try:
+                encoded, old_size, new_size = future.result()
+            except Exception as e:
+                print(f"Could not optimize {key[0]}: {e}")
+                traceback.print_exc()
+                return
+            first = slides[uses[0][0]]
+            old_part = uses[0][1].part.related_part(uses[0][2]._element.blip_rId)
+            part = media.get_or_add(encoded)[0] if encoded is not None else old_part
+            for number, slide, shape in uses:
+                if self.settings["fit"] == "letterbox":
+                    letterbox(shape, new_size)
+                if part is not old_part:
+                    repoint(slide, shape, part)
+                slides[number]["pictures"] += 1
+            # A shared picture's bytes count on the first slide showing it
+            if old_part.partname not in counted_before:
+                counted_before.add(old_part.partname)
+                first["bytes_before"] += content_key(old_part)[1]
+            if part.partname not in counted_after:
+                counted_after.add(part.partname)
+                first["bytes_after"] += content_key(part)[1]
+            first["pixels"].append([list(old_size), list(new_size)])
+
+        # Spawn rather than fork, as in batch.py
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            # Only a bounded window of pictures is held in memory at once
+            pending = collections.deque()
+            for key, uses in jobs.items():
+                blob = uses[0][1].part.related_part(uses[0][2]._element.blip_rId).blob
+                pending.append((key, uses, pool.submit(optimize_picture, blob, key[1], self.settings)))
+                if len(pending) >= self.max_pending:
+                    finish(*pending.popleft())
+            while pending:
+                finish(*pending.popleft())
+
+        # Archived pictures are read back from ``path`` while saving, so never write over it directly
+        temp_path = output + ".tmp"
+        prs.save(temp_path)
+        os.replace(temp_path, output)
+        if skipped:
+            print(f"Left {skipped} cropped picture(s) as they were")
+        return [slides[number] for number in sorted(slides)]
+
+
+def letterbox(shape, size):
+    """Shrink ``shape``'s frame to the aspect ratio of ``size``, centred where it was."""
+    width, height = size
+    if abs(shape.width * height - shape.height * width) <= 0.005 * shape.width * height:
+        return
+    scale = min(shape.width / width, shape.height / height)
+    new_width, new_height = round(width * scale), round(height * scale)
+    shape.left += (shape.width - new_width) // 2
+    shape.top += (shape.height - new_height) // 2
+    shape.width, shape.height = new_width, new_height
+
+
+def repoint(slide, shape, part):
+    """Show ``part`` in ``shape`` instead of its current picture."""
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    blip = shape._element.blipFill.blip
+    old_rId = blip.rEmbed
+    blip.rEmbed = slide.part.relate_to(part, RT.IMAGE)
+    # python-pptx's drop_rel only counts r:id references, not r:embed
+    if old_rId not in slide.part._element.xpath("//@r:embed | //@r:id | //@r:link"):
+        slide.part._rels.pop(old_rId)
+
+
+def print_report(report):
+    print(f"{'slide':>5} {'pictures':>8} {'before KB':>10} {'after KB':>9} {'saved':>6}  pixels")
+    for row in report:
+        if not row["pictures"]:
+            continue
+        before, after = row["bytes_before"], row["bytes_after"]
+        saved = f"{(1 - after / before) * 100:5.0f}%" if before else "     -"
+        pixels = ", ".join(f"{old[0]}x{old[1]}->{new[0]}x{new[1]}" for old, new in row["pixels"])
+        print(f"{row['slide']:>5} {row['pictures']:>8} {before / 1024:>10.0f} {after / 1024:>9.0f} {saved}  {pixels}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample, reframe and recompress the pictures of a deck.")
+    parser.add_argument("deck", help="input .pptx")
+    parser.add_argument("-o", "--output", help="optimized .pptx (default: <deck>-optimized.pptx)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--display-width", type=int, default=1920, help="pixels across the slide when shown")
+    parser.add_argument("--fit", default="letterbox", choices=FITS,
+                        help="match pictures to their frame's aspect ratio")
+    parser.add_argument("--format", default="keep", choices=FORMATS, help="image codec for the pictures")
+    parser.add_argument("--quality", type=int, default=85, help="JPEG quality")
+    parser.add_argument("--min-quality", type=int, default=50, help="lowest JPEG quality to reach --max-kb")
+    parser.add_argument("--max-kb", type=float, help="target size per picture")
+    parser.add_argument("--png-level", type=int, default=6, help="PNG compression level, 0-9")
+    parser.add_argument("--report", help="also write the per-slide report as JSON")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.deck)[0] + "-optimized.pptx"
+    optimizer = DeckOptimizer(args.workers, args.display_width, args.fit, args.format,
+                              args.quality, args.min_quality, args.max_kb, args.png_level)
+    started = time.time()
+    try:
+        report = optimizer.run(args.deck, output)
+    except Exception as e:
+        print(f"Error optimizing {args.deck}: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    print_report(report)
+    before, after = os.path.getsize(args.deck), os.path.getsize(output)
+    print(f"{args.deck}: {before / 1e6:.1f} MB -> {output}: {after / 1e6:.1f} MB "
+          f"({(1 - after / before) * 100:.0f}% smaller, {time.time() - started:.1f} s)")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"deck": args.deck, "output": output, "bytes_before": before, "bytes_after": after,
+                       "slides": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Persistent cache of detected video regions.
+
+Running the full detector means a full-screen grab plus a computer-vision
+pass over it. On a known setup the player is almost always where it was
+last time, so detected regions are stored on disk, keyed by screen size
+(and the foreground window's position where the platform exposes it),
+together with a signature of the border ring just outside the region.
+The page chrome around a player is static while the video inside it
+changes, so comparing that ring with a fresh grab is a cheap, reliable way
+to tell whether the cached region still fits.
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+STRIP_SIZE = (256, 4)  # Each border strip is resampled to this size
+
+
+def layout_signature():
+    """Position of the foreground window, where the platform exposes it."""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        rect = wintypes.RECT()
+        if not user32.GetWindowRect(user32.GetForegroundWindow(), ctypes.byref(rect)):
+            return None
+        return f"{rect.left},{rect.top},{rect.right},{rect.bottom}"
+    except Exception:
+        return None
+
+
+def ring_signature(image, region, margin, origin=(0, 0)):
+    """Grayscale strips just outside ``region`` in ``image``, or None if off-screen.
+
+    ``origin`` is the screen position of the image's top-left corner, for
+    images that are a crop of the screen rather than the whole screen.
+    """
+    left, top, right, bottom = (region[0] - origin[0], region[1] - origin[1],
+                                region[2] - origin[0], region[3] - origin[1])
+    width, height = image.size
+    if left - margin < 0 or top - margin < 0 or right + margin > width or bottom + margin > height:
+        return None
+
+    gray = image.convert("L")
+    boxes = [
+        (left, top - margin, right, top),  # Above
+        (left, bottom, right, bottom + margin),  # Below
+        (left - margin, top, left, bottom),  # Left
+        (right, top, right + margin, bottom),  # Right
+    ]
+    strips = []
+    for index, box in enumerate(boxes):
+        strip = gray.crop(box)
+        if index >= 2:
+            strip = strip.transpose(Image.ROTATE_90)
+        strips.append(np.asarray(strip.resize(STRIP_SIZE, Image.BILINEAR)))
+    return np.stack(strips)
+
+
+class RegionCache:
+    """Video regions remembered across runs in a small JSON file."""
+
+    def __init__(self, path="video_regions.json"):
+        self.path = path
+        self.margin = 8  # Width in pixels of the border ring used for validation
+        self.tolerance = 12.0  # Mean grayscale difference a matching strip may have
+        self.min_matching_strips = 3  # Of the four, to allow for one busy edge
+        self.max_entries = 20
+        self.entries = self._load()
+
+    @staticmethod
+    def key(screen_size, layout=None):
+        key = f"{screen_size[0]}x{screen_size[1]}"
+        return f"{key}@{layout}" if layout else key
+
+    def lookup(self, screen_size, layout=None):
+        """Return (region, ring) for this setup or None."""
+        entry = self.entries.get(self.key(screen_size, layout))
+        if entry is None and layout:
+            entry = self.entries.get(self.key(screen_size))
+        if entry is None:
+            return None
+        ring = None
+        if entry.get("ring"):
+            ring = np.frombuffer(base64.b64decode(entry["ring"]), np.uint8).reshape(4, STRIP_SIZE[1], STRIP_SIZE[0])
+        return tuple(entry["region"]), ring
+
+    def store(self, screen_size, region, screen, layout=None, origin=(0, 0)):
+        """Remember ``region``, taking its border signature from ``screen``; returns the signature."""
+        ring = ring_signature(screen, region, self.margin, origin)
+        entry = {
+            "region": list(region),
+            "ring": base64.b64encode(ring.tobytes()).decode("ascii") if ring is not None else None,
+            "updated": time.time(),
+        }
+        self.entries[self.key(screen_size)] = entry
+        if layout:
+            self.entries[self.key(screen_size, layout)] = entry
+
+        # Keep only the most recently used setups
+        newest = sorted(self.entries.items(), key=lambda item: item[1]["updated"], reverse=True)
+        self.entries = dict(newest[:self.max_entries])
+        self._write()
+        return ring
+
+    def matches(self, ring, image, region, origin=(0, 0)):
+        """Whether the border ring around ``region`` in ``image`` still looks like ``ring``."""
+        if ring is None:
+            return False
+        current = ring_signature(image, region, self.margin, origin)
+        if current is None:
+            return False
+        diffs = np.abs(current.astype(np.int16) - ring).mean(axis=(1, 2))
+        return int(np.sum(diffs <= self.tolerance)) >= self.min_matching_strips
+
+    def expanded(self, region):
+        """``region`` grown by the ring margin: the only area validation needs to grab."""
+        left, top, right, bottom = region
+        return (left - self.margin, top - self.margin, right + self.margin, bottom + self.margin)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self):
+        # Write-then-rename so a crash never leaves a truncated cache
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not write region cache: {e}")
@@ -0,0 +1,154 @@
+"""Settle-aware slide-change detection for continuous capture.
+
+Comparing every grab with the last saved slide under one fixed threshold
+catches transitions half-way, captures each step of a fade-in and lets a
+slow animated reveal slip through several times. This engine instead
+watches the frame-to-frame difference of the cheap downscaled grayscale
+frames the duplicate detector already computes:
+
+- A frame is *changing* when its difference from the previous frame is
+  above an adaptive threshold: ``noise_sigmas`` standard deviations over
+  the running noise level (playback noise, a small webcam inset), and
+  never below ``min_change``.
+- After a change the content has to stay quiet for ``settle_time`` seconds
+  before it counts as a slide. The sharpest frame of the quiet window is
+  its representative.
+- A settled slide is held back until the next *different* slide settles.
+  When the next one is just a build step of the held slide (it would be a
+  duplicate), the more complete of the two - the one with more ink - is
+  kept instead of emitting both.
+"""
+import math
+
+import numpy as np
+
+from capture import retain
+from dedup import DuplicateDetector
+
+
+def laplacian(gray):
+    """Absolute 4-neighbour Laplacian of a 2-D uint8 array."""
+    g = gray.astype(np.int16)
+    lap = 4 * g[1:-1, 1:-1] - g[:-2, 1:-1] - g[2:, 1:-1] - g[1:-1, :-2] - g[1:-1, 2:]
+    return np.abs(lap)
+
+
+class SlideCandidate:
+    """The representative frame of one settled slide."""
+    __slots__ = ("timestamp", "image", "features", "sharpness", "ink")
+
+    def __init__(self, timestamp, image, features):
+        self.timestamp = timestamp
+        self.image = image
+        self.features = features
+        edges = laplacian(features.small)
+        self.sharpness = float(edges.var())  # Higher for crisper frames
+        self.ink = float(np.mean(edges > 16))  # Share of edge pixels: more content drawn
+
+
+class SlideChangeDetector:
+    """Streams (timestamp, frame) pairs and emits one frame per stable slide."""
+
+    def __init__(self, duplicate_detector=None):
+        self.duplicate_detector = duplicate_detector or DuplicateDetector()
+        self.min_change = 1.0  # Mean absolute difference (0-255) that always counts as a change
+        self.noise_sigmas = 4.0  # Change threshold above the running noise level
+        self.noise_alpha = 0.05  # How fast the noise estimate follows quiet frames
+        self.settle_time = 0.5  # Seconds without change before a slide counts as stable
+        self.max_change_time = 10.0  # Continuous motion longer than this becomes the new noise level
+        self.merge_builds = True  # Keep only the most complete step of an animated build
+        self.reset()
+
+    def reset(self):
+        """Forget all state, e.g. when the capture region changes."""
+        self.previous = None
+        self.noise_mean = 0.0
+        self.noise_var = 0.0
+        self.changing_since = None
+        self.last_change = None
+        self.diff = 0.0  # Difference between the last two frames
+        self.best = None  # Sharpest candidate of the current stable window
+        self.pending = None  # Settled slide waiting for the next different one
+        self.stats = {"frames": 0, "changes": 0, "slides": 0, "merged": 0}
+
+    @property
+    def threshold(self):
+        return max(self.min_change, self.noise_mean + self.noise_sigmas * math.sqrt(self.noise_var))
+
+    @property
+    def moving(self):
+        """True if the last frame differed visibly from the one before, change or noise."""
+        return self.diff > self.min_change
+
+    def feed(self, timestamp, image, features):
+        """Process one frame and return the list of candidates to emit (usually empty)."""
+        self.stats["frames"] += 1
+        small = features.small.astype(np.int16)
+        if self.previous is None or self.previous.shape != small.shape:
+            diff = math.inf
+        else:
+            diff = float(np.mean(np.abs(small - self.previous)))
+        self.previous = small
+        self.diff = diff
+
+        emitted = []
+        if diff > self.threshold:
+            if self.changing_since is None:
+                # A stable window just ended
+                self.stats["changes"] += 1
+                self.changing_since = timestamp
+                emitted = self.close_window()
+            self.last_change = timestamp
+
+            # Constant motion (a talking head, a ticking clock) would never
+            # settle, so after a while it is learned as the noise floor
+            if diff != math.inf and timestamp - self.changing_since > self.max_change_time:
+                self.update_noise(diff, alpha=0.5)
+            return emitted
+
+        self.update_noise(diff)
+        if self.changing_since is not None:
+            if timestamp - self.last_change < self.settle_time:
+                return emitted
+            self.changing_since = None
+
+        candidate = SlideCandidate(timestamp, image, features)
+        if self.best is None or candidate.sharpness > self.best.sharpness:
+            # Kept across grabs, so it can't stay in the grab buffer
+            candidate.image = retain(image)
+            self.best = candidate
+        return emitted
+
+    def flush(self):
+        """Emit whatever is still held, e.g. when capture stops."""
+        emitted = self.close_window()
+        if self.pending is not None:
+            emitted.append(self.pending)
+            self.stats["slides"] += 1
+            self.pending = None
+        return emitted
+
+    def close_window(self):
+        candidate, self.best = self.best, None
+        if candidate is None:
+            return []
+        if self.pending is None:
+            self.pending = candidate
+            return []
+
+        if self.duplicate_detector.compare(candidate.features, self.pending.features).is_duplicate:
+            # Same slide again: a build step, or a brief overlay that went away
+            self.stats["merged"] += 1
+            if self.merge_builds and candidate.ink >= self.pending.ink:
+                self.pending = candidate
+            return []
+
+        emitted, self.pending = [self.pending], candidate
+        self.stats["slides"] += 1
+        return emitted
+
+    def update_noise(self, diff, alpha=None):
+        alpha = self.noise_alpha if alpha is None else alpha
+        delta = diff - self.noise_mean
+        self.noise_mean += alpha * delta
+        self.noise_var = (1 - alpha) * (self.noise_var + alpha * delta * delta)
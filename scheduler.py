@@ -0,0 +1,87 @@
+"""Adaptive grab rate for continuous capture.
+
+A fixed 10 Hz loop wastes thousands of grabs on a static slide or a
+talking head and can still miss a slide during rapid flips. The scheduler
+sets the interval between grabs from what the last frames showed:
+
+- while the screen is changing it grabs every ``min_interval`` seconds,
+- every quiet frame after that stretches the interval by ``backoff``, up
+  to ``max_interval`` - or only up to ``motion_interval`` while the frames
+  still differ visibly (a talking head, playback noise): the change
+  detector learns that motion as its noise level, and it can only do that
+  from frames taken at a steady spacing,
+- the time spent on each frame (grab, fingerprint, compare) is averaged
+  and the interval never drops below ``busy / cpu_budget``, so the loop
+  uses at most that share of a core.
+
+The scheduler only does arithmetic on the timings it's given and sleeps
+through the ``clock``/``sleep`` pair it was created with, so it runs the
+same against a fake clock as against the real one.
+"""
+import time
+
+
+class CaptureScheduler:
+    """Decides how long capture_loop waits before the next grab."""
+
+    def __init__(self, clock=time.time, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.min_interval = 0.05  # Seconds between grabs while a change is in progress
+        self.max_interval = 2.0  # Seconds between grabs after a long quiet stretch
+        self.motion_interval = 0.25  # Longest interval while the frames still show motion
+        self.backoff = 1.25  # Interval growth per quiet frame
+        self.cpu_budget = 0.5  # Share of one core the grab-and-compare work may use
+        self.busy_alpha = 0.2  # How fast the per-frame cost estimate follows new frames
+        self.nominal_interval = 0.1  # The old fixed rate, for the skipped count
+        self.reset()
+
+    def reset(self):
+        self.interval = self.min_interval
+        self.wanted = self.min_interval  # Interval the change activity alone asks for
+        self.busy = 0.0  # Running average of seconds spent per frame
+        self.stats = {"frames": 0, "skipped": 0.0, "dropped": 0.0}
+
+    @property
+    def rate(self):
+        """Current grab rate in Hz."""
+        return 1.0 / self.interval
+
+    @property
+    def skipped(self):
+        """Grabs the old fixed-rate loop would have made that quiet frames made unnecessary."""
+        return int(self.stats["skipped"])
+
+    @property
+    def dropped(self):
+        """Grabs the change activity asked for that the CPU budget or slow frames didn't allow."""
+        return int(self.stats["dropped"])
+
+    def next_delay(self, changing, busy, moving=False):
+        """Seconds to wait before the next grab, given the last frame's activity and cost."""
+        self.stats["frames"] += 1
+        if self.stats["frames"] == 1:
+            self.busy = busy
+        else:
+            self.busy += self.busy_alpha * (busy - self.busy)
+
+        if changing:
+            self.wanted = self.min_interval
+        else:
+            longest = min(self.motion_interval, self.max_interval) if moving else self.max_interval
+            self.wanted = max(self.min_interval, min(longest, self.wanted * self.backoff))
+        wanted = self.wanted
+
+        self.interval = max(wanted, self.busy / self.cpu_budget, busy)
+        if self.interval > wanted:
+            self.stats["dropped"] += self.interval / wanted - 1
+        if not changing and self.interval > self.nominal_interval:
+            self.stats["skipped"] += self.interval / self.nominal_interval - 1
+        return max(0.0, self.interval - busy)
+
+    def wait(self, changing, busy, moving=False):
+        """Sleep until the next grab is due."""
+        delay = self.next_delay(changing, busy, moving)
+        if delay:
+            self.sleep(delay)
+        return delay
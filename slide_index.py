@@ -0,0 +1,231 @@
+"""Deck-wide index of slide fingerprints for near-duplicate lookups.
+
+The duplicate detector only compares a capture with the previous one, so
+flipping back to an earlier slide - or re-running a session on an
+existing deck - adds the same slide again. This index holds the 64-bit
+difference hash and 32x18 thumbnail of every picture in the deck. A
+table over the hashes answers "is there a slide within Hamming distance
+k" without scanning every slide (multi-index hashing: exact lookups on
+pieces of the hash), and the thumbnails confirm candidates.
+
+The index is persisted next to the deck as one JSON line per picture,
+keyed by the picture's CRC-32 and size - the same values the .pptx
+archive keeps in its directory - so on startup only pictures that are
+new to the deck (added or edited in PowerPoint) have to be decoded -
+on a background thread if the caller uses ``open`` and ``build``.
+"""
+import base64
+import io
+import json
+import os
+import threading
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from dedup import hamming
+from media import content_key
+
+
+class MultiIndexHash:
+    """Multi-index hashing over 64-bit hashes for Hamming-radius search.
+
+    The hash is split into ``max_distance + 1`` bit ranges. Two hashes
+    within ``max_distance`` bits of each other differ in at most that many
+    ranges, so they agree exactly on at least one (pigeonhole): only the
+    hashes sharing a range's value with the query are candidates.
+    """
+
+    def __init__(self, max_distance, bits=64):
+        self.max_distance = max_distance
+        chunks = max_distance + 1
+        bounds = [bits * i // chunks for i in range(chunks + 1)]
+        self.ranges = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+        self.tables = [{} for _ in self.ranges]  # Per range: value -> [item ids]
+        self.hashes = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, value_hash, value):
+        item = len(self.hashes)
+        self.hashes.append(value_hash)
+        self.values.append(value)
+        for table, (shift, mask) in zip(self.tables, self.ranges):
+            table.setdefault((value_hash >> shift) & mask, []).append(item)
+
+    def search(self, value_hash):
+        """Return [(distance, value)] for every hash within ``max_distance``, nearest first."""
+        candidates = set()
+        for table, (shift, mask) in zip(self.tables, self.ranges):
+            candidates.update(table.get((value_hash >> shift) & mask, ()))
+        found = []
+        for item in candidates:
+            distance = hamming(value_hash, self.hashes[item])
+            if distance <= self.max_distance:
+                found.append((distance, self.values[item]))
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class SlideIndex:
+    """Fingerprints of every picture in a deck, persisted next to it."""
+
+    def __init__(self):
+        self.max_distance = 6  # dHash bits that may differ for a candidate match (applies from the next load)
+        self.max_thumb_diff = 1.5  # Mean thumbnail difference (0-255) that confirms a match
+        self.path = None
+        self.hashes = MultiIndexHash(self.max_distance)
+        self.entries = {}  # (crc, size) -> (hash, thumbnail bytes)
+        self.stale = False  # The file has entries for pictures no longer in the deck
+        self.ready = True  # False while pictures from open still await build
+        self.generation = 0  # Bumped by open, so a build for an earlier deck stops
+        self.lock = threading.Lock()  # build can run on another thread alongside add and find
+
+    @staticmethod
+    def index_path(deck_path):
+        return os.path.splitext(deck_path)[0] + ".slideindex"
+
+    def load(self, prs, deck_path, features_for):
+        """Load the index for ``deck_path`` and reconcile it with the pictures in ``prs``.
+
+        ``features_for(image)`` computes dedup features for pictures the
+        index doesn't know yet.
+        """
+        return self.build(self.open(prs, deck_path), features_for)
+
+    def open(self, prs, deck_path):
+        """Load the stored entries for the pictures in ``prs``, without decoding any.
+
+        Returns the parts the index doesn't know yet, by content key; until
+        ``build`` has fingerprinted them the index isn't ``ready``.
+        """
+        path = self.index_path(deck_path)
+        stored = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        stored[(entry["crc"], entry["size"])] = (entry["hash"], base64.b64decode(entry["thumb"]))
+                    except (ValueError, KeyError):
+                        continue  # Torn last line after a crash
+        except OSError:
+            pass
+
+        pending = {}
+        with self.lock:
+            self.generation += 1
+            self.path = path
+            self.hashes = MultiIndexHash(self.max_distance)
+            self.entries = {}
+            for part in self.image_parts(prs):
+                key = content_key(part)
+                if key in stored:
+                    if key not in self.entries:
+                        self.insert(key, *stored[key])
+                else:
+                    pending.setdefault(key, part)
+            # Entries for pictures no longer in the deck are dropped by a rewrite
+            self.stale = len(stored) != len(self.entries)
+            self.ready = not pending
+            if self.ready and self.stale:
+                self.rewrite()
+        return pending
+
+    def build(self, pending, features_for, read_blob=None):
+        """Fingerprint the parts ``open`` returned and index them; returns how many were added.
+
+        Meant for a background thread: ``add`` and ``find`` can be used
+        meanwhile. ``read_blob(part)`` reads a picture's bytes (default
+        ``part.blob``).
+        """
+        generation = self.generation
+        added = 0
+        for key, part in pending.items():
+            try:
+                blob = read_blob(part) if read_blob else part.blob
+                features = features_for(Image.open(io.BytesIO(blob)))
+            except Exception as e:
+                print(f"Could not fingerprint {part.partname}: {e}")
+                continue
+            with self.lock:
+                if generation != self.generation:
+                    return added  # Opened again (e.g. for a new part); this build is out of date
+                if key not in self.entries:
+                    thumbnail = features.thumbnail.tobytes()
+                    self.insert(key, features.fingerprint, thumbnail)
+                    self.append(key, features.fingerprint, thumbnail)
+                    added += 1
+
+        with self.lock:
+            if generation == self.generation:
+                if self.stale:
+                    self.rewrite()
+                self.ready = True
+        return added
+
+    def find(self, features):
+        """Return (distance, key) of a matching slide, or None."""
+        thumbnail = features.thumbnail.astype(np.int16).ravel()
+        with self.lock:
+            for distance, key in self.hashes.search(features.fingerprint):
+                stored = np.frombuffer(self.entries[key][1], np.uint8)
+                if stored.size == thumbnail.size and np.mean(np.abs(thumbnail - stored)) <= self.max_thumb_diff:
+                    return distance, key
+        return None
+
+    def add(self, blob, features):
+        """Index a picture just added to the deck and append it to the index file."""
+        key = (zlib.crc32(blob), len(blob))
+        thumbnail = features.thumbnail.tobytes()
+        with self.lock:
+            if key in self.entries:
+                return
+            self.insert(key, features.fingerprint, thumbnail)
+            self.append(key, features.fingerprint, thumbnail)
+
+    def insert(self, key, fingerprint, thumbnail):
+        self.entries[key] = (fingerprint, thumbnail)
+        self.hashes.add(fingerprint, key)
+
+    def append(self, key, fingerprint, thumbnail):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "a") as f:
+                f.write(self.entry_line(key, fingerprint, thumbnail))
+        except OSError as e:
+            print(f"Could not update slide index: {e}")
+
+    def rewrite(self):
+        if not self.path:
+            return
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                for key, (fingerprint, thumbnail) in self.entries.items():
+                    f.write(self.entry_line(key, fingerprint, thumbnail))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not write slide index: {e}")
+
+    @staticmethod
+    def entry_line(key, fingerprint, thumbnail):
+        return json.dumps({"crc": key[0], "size": key[1], "hash": fingerprint,
+                           "thumb": base64.b64encode(thumbnail).decode("ascii")}) + "\n"
+
+    @staticmethod
+    def image_parts(prs):
+        """Picture parts used by the deck's slides."""
+        seen = set()
+        for slide in prs.slides:
+            for rel in slide.part.rels.values():
+                if rel.is_external or not rel.reltype.endswith("/image"):
+                    continue
+                part = rel.target_part
+                if id(part) not in seen:
+                    seen.add(id(part))
+                    yield part
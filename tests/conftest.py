@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))  # Synthetic desktops and sessions
+
+
+def slide_image(index, width=640, height=360):
+    """A distinct slide-like RGB picture for ``index``: title bar, text bars and a blocky figure."""
+    rng = np.random.default_rng(index)
+    frame = np.full((height, width, 3), 250, np.uint8)
+    unit = height // 20
+    frame[:2 * unit] = (30, 60, 120)
+    for line in range(2 + index % 4):
+        y = 4 * unit + line * 2 * unit
+        frame[y:y + unit, 2 * unit:2 * unit + int(width * rng.uniform(0.3, 0.7))] = 40
+    block = rng.integers(0, 255, (9, 16, 3), np.uint8)
+    figure = np.asarray(Image.fromarray(block).resize((width // 2 - 2 * unit, height // 2 - 2 * unit),
+                                                      Image.NEAREST))
+    frame[height // 2:height // 2 + figure.shape[0], width // 2:width // 2 + figure.shape[1]] = figure
+    return Image.fromarray(frame)
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build a VideoToPPT writing its deck into tmp_path and grabbing from ``source(bbox)``."""
+    from video_to_ppt import VideoToPPT
+    monkeypatch.chdir(tmp_path)  # The region cache lives in the working directory
+
+    def make(source, **attributes):
+        app = VideoToPPT()
+        app.deck_path = str(tmp_path / "deck.pptx")
+        app.capture_backend = "file"
+        app.capture_source = source
+        app.metrics.enabled = False
+        for name, value in attributes.items():
+            setattr(app, name, value)
+        return app
+    return make
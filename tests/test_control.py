@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from capture import create_backend
+from conftest import slide_image
+from control import ControlClient, ControlServer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """A control server on a Unix socket in tmp_path, with decks in tmp_path/decks."""
+    monkeypatch.chdir(tmp_path)
+    decks = tmp_path / "decks"
+    decks.mkdir()
+    socket_path = str(tmp_path / "control.sock")
+    index = [0]
+
+    def grab(bbox):
+        index[0] += 1
+        return slide_image(index[0])
+
+    def configure(app):
+        app.capture_backend = "file"
+        app.capture_source = grab
+        app.video_region = (0, 0, 640, 360)
+
+    control = ControlServer(str(decks / "main.pptx"), configure)
+    ready = threading.Event()
+    thread = threading.Thread(target=lambda: asyncio.run(control.serve(socket_path, ready=ready)))
+    thread.start()
+    ready.wait()
+    client = ControlClient(socket_path)
+    yield control, client, decks
+    client.call("shutdown")
+    client.close()
+    thread.join()
+
+
+def test_captures_into_the_default_deck(server):
+    control, client, decks = server
+    reply = client.call("capture", wait=True)
+    assert reply == {"ok": True, "added": True, "slides": 1}
+    assert client.call("stats")["captures"] == 1
+    assert client.call("flush")["ok"]
+    assert os.path.exists(decks / "main.pptx")
+
+
+def test_capture_adds_repeated_slides_like_a_key_press(server):
+    control, client, decks = server
+    client.call("capture", wait=True)
+    frame = slide_image(1)
+    control.sessions[str(decks / "main.pptx")].grabber = create_backend("file", source=lambda bbox: frame)
+    assert client.call("capture", wait=True)["added"]
+    assert client.call("capture", wait=True) == {"ok": True, "added": True, "slides": 3}
+
+
+def test_switch_deck_opens_a_session(server):
+    control, client, decks = server
+    other = str(decks / "other.pptx")
+    assert client.call("switch-deck", deck=other)["deck"] == other
+    client.call("capture", wait=True)
+    assert client.call("stats")["deck"] == other
+    assert sorted(control.sessions) == [str(decks / "main.pptx"), other]
+
+
+@pytest.mark.parametrize("command", ["stats", "flush", "close", "new-part", "refresh-region"])
+def test_other_commands_need_an_open_session(server, command):
+    control, client, decks = server
+    reply = client.call(command, deck=str(decks / "unopened.pptx"))
+    assert not reply["ok"] and "no session" in reply["error"]
+    assert str(decks / "unopened.pptx") not in control.sessions
+    assert not os.path.exists(decks / "unopened.pptx")
+
+
+def test_rejects_files_that_are_not_decks(server):
+    control, client, decks = server
+    notes = decks / "notes.pptx"
+    notes.write_bytes(b"not a deck")
+    for path in (str(notes), str(decks / "notes.txt"), str(decks.parent / "elsewhere.pptx"),
+                 str(decks / ".." / "escape.pptx")):
+        for command in ("switch-deck", "capture"):
+            reply = client.call(command, deck=path)
+            assert not reply["ok"], (command, path)
+    assert notes.read_bytes() == b"not a deck"
+    assert list(control.sessions) == [str(decks / "main.pptx")]
+
+
+def test_deck_dir_can_be_widened(tmp_path):
+    elsewhere = tmp_path / "elsewhere.pptx"
+    control = ControlServer(str(tmp_path / "decks" / "main.pptx"), deck_dir=str(tmp_path))
+    assert control.resolve_deck(str(elsewhere)) == str(elsewhere)
+    with pytest.raises(ValueError):
+        control.resolve_deck("/etc/passwd.pptx")
+    control.executor.shutdown()
@@ -0,0 +1,67 @@
+import io
+import json
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from conftest import slide_image
+from deck_parts import DeckParts, merge_parts
+
+
+def encoded(index):
+    buffer = io.BytesIO()
+    slide_image(index, 160, 90).save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+def shape_ids(slide):
+    return [int(node.get("id")) for node in slide.shapes._spTree.xpath(".//p:cNvPr")]
+
+
+def test_rolls_over_into_parts_and_merges_them(make_app):
+    index = [0]
+
+    def grab(bbox):
+        index[0] += 1
+        return slide_image(index[0])
+
+    app = make_app(grab, video_region=(0, 0, 640, 360), rollover_slides=4)
+    for _ in range(10):
+        app.toggle_capture()
+    app.shutdown()
+
+    with open(DeckParts.manifest_path(app.deck_path)) as f:
+        parts = json.load(f)["parts"]
+    assert [part["slides"] for part in parts] == [4, 4, 2]
+    assert [part["first_slide"] for part in parts] == [1, 5, 9]
+    assert parts[1]["path"] == "deck-part002.pptx"
+
+    merged = app.deck_path.replace(".pptx", "-merged.pptx")
+    assert merge_parts(DeckParts.manifest_path(app.deck_path), merged) == 10
+    pictures = [slide.shapes[-1].image.blob for slide in Presentation(merged).slides]
+    assert len(set(pictures)) == 10
+
+
+def test_merged_group_shapes_get_unique_ids(tmp_path):
+    deck = str(tmp_path / "deck.pptx")
+    parts = DeckParts(deck)
+    parts.load()
+    Presentation().save(deck)
+
+    # Part 2: a slide with a group of two pictures and a caption, edited in by hand
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_picture(encoded(1), 0, 0, Inches(2), Inches(1))
+    group.shapes.add_picture(encoded(2), Inches(2), 0, Inches(2), Inches(1))
+    slide.shapes.add_textbox(0, Inches(2), Inches(4), Inches(1)).text = "caption"
+    prs.save(parts.start_next("chapter break"))
+
+    merged = str(tmp_path / "merged.pptx")
+    assert merge_parts(parts.path, merged) == 1
+    slide = Presentation(merged).slides[0]
+    ids = shape_ids(slide)
+    assert len(ids) == 5  # The slide's shape tree, the group, its two pictures and the caption
+    assert len(set(ids)) == len(ids)
+    assert len(slide.shapes[0].shapes) == 2
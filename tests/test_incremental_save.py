@@ -0,0 +1,104 @@
+import io
+import os
+import zipfile
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from conftest import slide_image
+from incremental_save import ArchivedImagePart, IncrementalSaver
+
+
+def add_slide(prs, index):
+    buffer = io.BytesIO()
+    slide_image(index, 160, 90).save(buffer, "PNG")
+    buffer.seek(0)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_picture(buffer, 0, 0, Inches(4), Inches(2.25))
+
+
+def pictures(path):
+    return [slide.shapes[0].image.blob for slide in Presentation(path).slides]
+
+
+def test_appends_after_the_first_full_save(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    saver = IncrementalSaver()
+    add_slide(prs, 0)
+    assert saver.save(prs, path) == "full"
+
+    for index in range(1, 4):
+        size = os.path.getsize(path)
+        add_slide(prs, index)
+        assert saver.save(prs, path) == "append"
+        # The previous archive stays intact in front of the appended entries
+        assert os.path.getsize(path) > size
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+    assert len(pictures(path)) == 4
+
+
+def test_torn_append_is_undone_by_truncating(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    saver = IncrementalSaver()
+    add_slide(prs, 0)
+    saver.save(prs, path)
+    add_slide(prs, 1)
+    saver.save(prs, path)
+    size = os.path.getsize(path)
+    add_slide(prs, 2)
+    saver.save(prs, path)
+
+    with open(path, "rb+") as f:
+        f.truncate(size)
+    assert len(pictures(path)) == 2
+
+
+def test_rewrites_when_the_file_changed_underneath(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    saver = IncrementalSaver()
+    add_slide(prs, 0)
+    saver.save(prs, path)
+    Presentation(path).save(path)  # e.g. saved from PowerPoint
+    add_slide(prs, 1)
+    assert saver.save(prs, path) == "full"
+    assert len(pictures(path)) == 2
+
+
+def test_compacts_once_dead_space_grows(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    saver = IncrementalSaver(compact_ratio=0.01)
+    add_slide(prs, 0)
+    saver.save(prs, path)
+    modes = []
+    for index in range(1, 6):
+        add_slide(prs, index)
+        modes.append(saver.save(prs, path))
+    assert "append" in modes and "full" in modes[1:]
+    assert len(pictures(path)) == 6
+
+
+def test_release_media_reads_pictures_back_from_the_file(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    saver = IncrementalSaver(release_media=True)
+    add_slide(prs, 0)
+    expected = prs.slides[0].shapes[0].image.blob
+    saver.save(prs, path)
+
+    slide = prs.slides[0]
+    part = slide.part.related_part(slide.shapes[0]._element.blip_rId)
+    assert isinstance(part, ArchivedImagePart)
+    assert "_blob" not in part.__dict__
+    assert part.blob == expected
+
+    # A full rewrite still has the bytes to copy
+    add_slide(prs, 1)
+    saver.compact_ratio = -1
+    assert saver.save(prs, path) == "full"
+    assert pictures(path)[0] == expected
@@ -0,0 +1,149 @@
+import os
+import time
+import zipfile
+
+from pptx import Presentation
+
+from conftest import slide_image
+from journal import CHECKPOINT, PICTURE, REFERENCE, CaptureJournal
+
+
+def slides():
+    """Grab source showing a new slide on every grab."""
+    index = [0]
+
+    def grab(bbox):
+        index[0] += 1
+        return slide_image(index[0])
+    return grab
+
+
+def journaling_app(make_app, source):
+    # Only the journal makes captures durable; the deck isn't written until exit
+    return make_app(source, video_region=(0, 0, 640, 360),
+                    materialize_every=1000, materialize_interval=1e9)
+
+
+def test_records_round_trip(tmp_path):
+    journal = CaptureJournal()
+    deck = str(tmp_path / "deck.pptx")
+    assert journal.recover(deck) == []
+    journal.open()
+    journal.add_picture(1, b"picture one")
+    journal.add_reference(2, (1234, 11))
+    journal.checkpoint(4096)
+    journal.close()
+
+    records, length = CaptureJournal.read(journal.journal_path(deck))
+    assert [record.kind for record in records] == [PICTURE, REFERENCE, CHECKPOINT]
+    assert records[0].payload == b"picture one"
+    assert length == os.path.getsize(journal.journal_path(deck))
+    # Checkpoints are used up by recover, not handed back
+    assert [record.slide_number for record in journal.recover(deck)] == [1, 2]
+
+
+def test_torn_record_is_dropped(tmp_path):
+    journal = CaptureJournal()
+    deck = str(tmp_path / "deck.pptx")
+    journal.recover(deck)
+    journal.open()
+    journal.add_picture(1, b"kept")
+    journal.add_picture(2, b"torn by a crash")
+    journal.close()
+    path = journal.journal_path(deck)
+    with open(path, "rb+") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    records = journal.recover(deck)
+    assert [record.payload for record in records] == [b"kept"]
+    assert os.path.getsize(path) == CaptureJournal.read(path)[1]
+
+
+def test_replays_captures_after_a_crash(make_app):
+    app = journaling_app(make_app, slides())
+    for _ in range(3):
+        app.toggle_capture()
+    app.save_ppt(final=True)
+    for _ in range(4):
+        app.toggle_capture()
+    assert len(Presentation(app.deck_path).slides) == 3
+    # Crash: nothing else is saved, the journal file is left as it is
+
+    restarted = journaling_app(make_app, slides())
+    restarted.initialize_ppt()
+    assert len(restarted.ppt.slides) == 7
+    assert len(Presentation(app.deck_path).slides) == 7
+    assert os.path.getsize(restarted.journal.path) == 0
+    restarted.shutdown()
+
+
+def test_replays_shared_pictures(make_app):
+    frame = slide_image(1)
+    app = journaling_app(make_app, lambda bbox: frame)
+    app.toggle_capture()
+    app.save_ppt(final=True)
+    app.toggle_capture()  # Same pixels: journaled as a reference to the saved picture
+
+    restarted = journaling_app(make_app, lambda bbox: frame)
+    restarted.initialize_ppt()
+    assert len(restarted.ppt.slides) == 2
+    restarted.shutdown()
+
+
+def test_torn_append_is_truncated_and_replayed(make_app):
+    app = journaling_app(make_app, slides())
+    for _ in range(3):
+        app.toggle_capture()
+    app.save_ppt(final=True)
+    for _ in range(2):
+        app.toggle_capture()
+    # Crash while appending: the checkpoint is written, then only part of
+    # the new entries - the old directory record is still in the last 64 KB
+    size = os.path.getsize(app.deck_path)
+    app.journal.checkpoint(size)
+    with open(app.deck_path, "ab") as f:
+        f.write(b"PK\x03\x04" + os.urandom(2000))
+    assert CaptureJournal.archive_ends_at(app.deck_path, size)
+
+    restarted = journaling_app(make_app, slides())
+    restarted.initialize_ppt()
+    assert len(restarted.ppt.slides) == 5
+    with zipfile.ZipFile(app.deck_path) as archive:
+        assert archive.testzip() is None
+    assert len(Presentation(app.deck_path).slides) == 5
+    restarted.shutdown()
+
+
+def test_completed_full_save_is_left_alone(make_app):
+    app = journaling_app(make_app, slides())
+    app.toggle_capture()
+    app.save_ppt(final=True)
+    app.toggle_capture()
+    size = os.path.getsize(app.deck_path)
+    app.journal.checkpoint(size)
+    # The save was a full rewrite that finished, then the crash hit before the journal was emptied
+    app.ppt.save(app.deck_path + ".saving")
+    os.replace(app.deck_path + ".saving", app.deck_path)
+    assert not CaptureJournal.archive_ends_at(app.deck_path, size)
+
+    restarted = journaling_app(make_app, slides())
+    restarted.initialize_ppt()
+    assert len(restarted.ppt.slides) == 2
+    restarted.shutdown()
+
+
+def test_deck_is_saved_on_a_timer(make_app):
+    app = journaling_app(make_app, slides())
+    app.initialize_ppt()
+    app.materialize_interval = 0.2
+    app.last_materialized = time.time()
+    app.request_capture()
+    app.capture_queue.join()
+    assert app.unsaved_captures == 1  # Only in the journal so far
+
+    deadline = time.time() + 5
+    while app.unsaved_captures and time.time() < deadline:
+        time.sleep(0.05)
+    assert app.unsaved_captures == 0
+    assert len(Presentation(app.deck_path).slides) == 1
+    app.shutdown()
@@ -0,0 +1,60 @@
+import io
+import zlib
+
+from pptx import Presentation
+
+from conftest import slide_image
+from incremental_save import IncrementalSaver
+from media import MediaStore, content_key, pixel_key
+
+
+def encoded(index):
+    buffer = io.BytesIO()
+    slide_image(index).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_identical_bytes_share_one_part():
+    prs = Presentation()
+    store = MediaStore()
+    store.adopt(prs)
+    first, existing = store.get_or_add(encoded(1))
+    assert not existing
+    again, existing = store.get_or_add(encoded(1))
+    assert existing and again is first
+    other, existing = store.get_or_add(encoded(2))
+    assert not existing and other.partname != first.partname
+    assert store.shared == 1
+
+
+def test_pixel_key_skips_encoding_repeats():
+    prs = Presentation()
+    store = MediaStore()
+    store.adopt(prs)
+    key = pixel_key(slide_image(1))
+    part, _ = store.get_or_add(encoded(1), key)
+    assert store.find(pixel_key(slide_image(1))) is part
+    assert store.find(pixel_key(slide_image(2))) is None
+
+
+def test_shared_part_survives_save_and_reload(tmp_path):
+    path = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    store = MediaStore()
+    store.adopt(prs)
+    for index in (1, 1, 2):
+        part, _ = store.get_or_add(encoded(index))
+        store.add_picture(prs.slides.add_slide(prs.slide_layouts[6]), part, 0, 0, 100, 100)
+    IncrementalSaver(release_media=True).save(prs, path)
+
+    reloaded = Presentation(path)
+    blobs = [slide.shapes[0].image.blob for slide in reloaded.slides]
+    assert blobs == [encoded(1), encoded(1), encoded(2)]
+
+    # Adopting the saved deck indexes its pictures by (CRC-32, size), and numbers new ones after them
+    store.adopt(reloaded)
+    assert {(zlib.crc32(encoded(i)), len(encoded(i))) for i in (1, 2)} <= set(store.by_content)
+    part, existing = store.get_or_add(encoded(2))
+    assert existing and content_key(part) == (zlib.crc32(encoded(2)), len(encoded(2)))
+    part, existing = store.get_or_add(encoded(3))
+    assert not existing and str(part.partname) == "/ppt/media/image3.png"
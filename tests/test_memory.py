@@ -0,0 +1,59 @@
+import ctypes
+import gc
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+WIDTH, HEIGHT = 480, 270
+
+
+def rss_mb():
+    """Current resident set size in MB, after handing freed heap pages back to the system."""
+    gc.collect()
+    try:
+        # Otherwise glibc keeps freed picture buffers around and RSS counts them
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise OSError("no VmRSS")
+
+
+def noise_frames():
+    """Grab source of random frames: PNG can't compress them, so every capture adds a full frame to the deck."""
+    rng = np.random.default_rng(0)
+
+    def grab(bbox):
+        return Image.fromarray(rng.integers(0, 256, (HEIGHT, WIDTH, 3), np.uint8))
+    return grab
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads RSS from /proc")
+def test_rss_stays_flat_over_many_captures(make_app):
+    app = make_app(noise_frames(), video_region=(0, 0, WIDTH, HEIGHT), rollover_slides=0, rollover_mb=0,
+                   png_compress_level=1)
+    # Let imports, codec tables and the first full save settle first
+    for _ in range(50):
+        app.toggle_capture()
+    app.save_ppt(final=True)
+    baseline = rss_mb()
+    deck_before = os.path.getsize(app.deck_path) / 1e6
+
+    captures = 1000
+    for _ in range(captures):
+        app.toggle_capture()
+    app.save_ppt(final=True)
+    grown = rss_mb() - baseline
+    written = os.path.getsize(app.deck_path) / 1e6 - deck_before
+    app.shutdown()
+
+    assert len(app.ppt.slides) == 50 + captures
+    assert written > 300
+    # Pictures live in the saved deck, not in memory: keeping them would grow RSS by about ``written``
+    assert grown < 0.1 * written, f"RSS grew {grown:.1f} MB while {written:.1f} MB went into the deck"
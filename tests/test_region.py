@@ -0,0 +1,100 @@
+import pytest
+from PIL import ImageChops, ImageDraw
+
+import video_to_ppt
+from desktop_fixtures import FIXTURES, iou, make_desktop
+from region_detect import PyramidRegionDetector
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    """Skip the two seconds detect_video_region gives the user to position the video."""
+    monkeypatch.setattr(video_to_ppt.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda f: f"{f[0][0]}x{f[0][1]}-{f[1]:.0%}")
+def test_pyramid_detector_finds_the_player(fixture):
+    desktop, truth = make_desktop(*fixture)
+    assert iou(PyramidRegionDetector().detect(desktop), truth) > 0.95
+
+
+def test_pyramid_detector_returns_the_coarse_box_without_budget():
+    desktop, truth = make_desktop(*FIXTURES[5])
+    rect = PyramidRegionDetector(time_budget=0).detect(desktop)
+    assert iou(rect, truth) > 0.9
+
+
+def desktop_source(desktop):
+    """File-backend source showing ``desktop`` as the whole screen."""
+    screen = {"image": desktop}
+
+    def grab(bbox):
+        return screen["image"].crop(bbox) if bbox else screen["image"]
+    grab.screen = screen
+    return grab
+
+
+def test_detects_the_region_without_a_display(make_app, no_wait):
+    desktop, truth = make_desktop(*FIXTURES[0])
+    app = make_app(desktop_source(desktop), region_check_interval=0)
+    app.toggle_capture()
+
+    assert iou(app.video_region, truth) > 0.9
+    picture = app.ppt.slides[0].shapes[-1].image
+    assert picture.size == (app.video_region[2] - app.video_region[0],
+                            app.video_region[3] - app.video_region[1])
+    app.shutdown()
+
+
+def test_revalidates_and_redetects_through_the_backend(make_app, no_wait):
+    desktop, truth = make_desktop(*FIXTURES[0])
+    source = desktop_source(desktop)
+    app = make_app(source, region_check_interval=0)
+    app.toggle_capture()
+    assert app.region_ring is not None
+
+    # The browser moved: the border check notices and detection runs again
+    source.screen["image"] = ImageChops.offset(desktop, 150, 80)
+    moved_truth = (truth[0] + 150, truth[1] + 80, truth[2] + 150, truth[3] + 80)
+    app.check_region()
+    app.region_thread.join()
+    assert iou(app.video_region, moved_truth) > 0.9
+    app.shutdown()
+
+
+def test_cache_miss_waits_for_the_first_capture(make_app, no_wait):
+    desktop, truth = make_desktop(*FIXTURES[0])
+    app = make_app(desktop_source(desktop))
+    app.prepare_region()
+    app.region_thread.join()
+    assert app.video_region is None
+    assert app.region_cache.entries == {}
+
+    app.toggle_capture()
+    assert iou(app.video_region, truth) > 0.9
+    assert app.region_cache.lookup(desktop.size)[0] == app.video_region
+    app.shutdown()
+
+
+def test_launch_screen_does_not_replace_the_cached_region(make_app, no_wait):
+    desktop, truth = make_desktop(*FIXTURES[0])
+    app = make_app(desktop_source(desktop))
+    app.toggle_capture()
+    app.shutdown()
+
+    # At launch the terminal the tool was started from covers the player's lower left
+    launch = desktop.copy()
+    ImageDraw.Draw(launch).rectangle((truth[0] - 120, truth[1] + 250, truth[0] + 500, truth[3] + 100),
+                                     fill=(30, 30, 30))
+    source = desktop_source(launch)
+    restarted = make_app(source)
+    restarted.prepare_region()
+    restarted.region_thread.join()
+    assert restarted.video_region is None
+    assert restarted.region_cache.lookup(desktop.size)[0] == app.video_region
+
+    # By the first capture the terminal is out of the way
+    source.screen["image"] = desktop
+    restarted.toggle_capture()
+    assert iou(restarted.video_region, truth) > 0.9
+    restarted.shutdown()
@@ -0,0 +1,126 @@
+import pytest
+
+from conftest import slide_image
+from scheduler import CaptureScheduler
+
+
+class FakeClock:
+    """Time that only moves when the scheduler sleeps or a frame's work is simulated."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return CaptureScheduler(clock=clock, sleep=clock.sleep)
+
+
+def run(scheduler, clock, frames, busy=0.0, changing=False, moving=False):
+    """Simulate ``frames`` iterations of capture_loop; returns the interval after each."""
+    intervals = []
+    for _ in range(frames):
+        clock.now += busy
+        scheduler.wait(changing, busy, moving)
+        intervals.append(scheduler.interval)
+    return intervals
+
+
+def test_backs_off_geometrically_on_static_frames(scheduler, clock):
+    intervals = run(scheduler, clock, 30)
+    expected = [min(scheduler.max_interval, scheduler.min_interval * scheduler.backoff ** n) for n in range(1, 31)]
+    assert intervals == pytest.approx(expected)
+    assert intervals[-1] == scheduler.max_interval
+    assert clock.sleeps == pytest.approx(intervals)
+
+
+def test_change_snaps_back_to_the_fastest_rate(scheduler, clock):
+    run(scheduler, clock, 30)
+    assert scheduler.rate == pytest.approx(1 / scheduler.max_interval)
+    run(scheduler, clock, 1, changing=True)
+    assert scheduler.interval == scheduler.min_interval
+    # And backs off again from there
+    assert run(scheduler, clock, 1) == pytest.approx([scheduler.min_interval * scheduler.backoff])
+
+
+def test_motion_caps_the_interval(scheduler, clock):
+    intervals = run(scheduler, clock, 40, moving=True)
+    assert max(intervals) == pytest.approx(scheduler.motion_interval)
+    assert intervals[-1] == pytest.approx(scheduler.motion_interval)
+    # Once the motion stops the backoff continues up to the maximum
+    assert run(scheduler, clock, 40)[-1] == scheduler.max_interval
+
+
+def test_cpu_budget_bounds_the_rate(scheduler, clock):
+    # 60 ms of work per frame at a 50% budget: never more often than every 120 ms
+    intervals = run(scheduler, clock, 20, busy=0.06, changing=True)
+    assert intervals == pytest.approx([0.12] * 20)
+    # Sleeps make up the rest of each interval
+    assert clock.sleeps == pytest.approx([0.06] * 20)
+    assert clock.now == pytest.approx(20 * 0.12)
+
+
+def test_slow_frames_are_not_slept_after(scheduler, clock):
+    scheduler.cpu_budget = 1.0
+    intervals = run(scheduler, clock, 5, busy=0.3, changing=True)
+    assert intervals == pytest.approx([0.3] * 5)
+    assert clock.sleeps == []
+
+
+def test_counts_dropped_grabs(scheduler, clock):
+    run(scheduler, clock, 10, busy=0.06, changing=True)
+    # Each frame wanted 50 ms but took 120 ms: 1.4 grabs short per frame
+    assert scheduler.stats["dropped"] == pytest.approx(10 * (0.12 / 0.05 - 1))
+    assert scheduler.dropped == 14
+    assert scheduler.skipped == 0  # Changing frames never count as skipped
+
+
+def test_counts_skipped_grabs_against_the_fixed_rate(scheduler, clock):
+    intervals = run(scheduler, clock, 30)
+    expected = sum(interval / scheduler.nominal_interval - 1
+                   for interval in intervals if interval > scheduler.nominal_interval)
+    assert scheduler.stats["skipped"] == pytest.approx(expected)
+    assert scheduler.skipped == int(expected)
+    assert scheduler.dropped == 0
+    # A fixed 10 Hz loop would have grabbed about this many times over the same span
+    assert scheduler.skipped + scheduler.stats["frames"] == pytest.approx(clock.now / 0.1, abs=5)
+
+
+def test_reset_starts_over(scheduler, clock):
+    run(scheduler, clock, 30, busy=0.01)
+    scheduler.reset()
+    assert scheduler.interval == scheduler.min_interval
+    assert scheduler.stats == {"frames": 0, "skipped": 0.0, "dropped": 0.0}
+    assert scheduler.busy == 0.0
+
+
+def test_capture_loop_catches_every_slide_with_fewer_grabs(make_app, clock):
+    grabs = []
+
+    def screen(bbox):
+        grabs.append(clock.now)
+        return slide_image(int(clock.now // 10))  # A new slide every 10 s
+
+    app = make_app(screen, video_region=(0, 0, 640, 360), max_capture_time=59.9)
+    app.scheduler = CaptureScheduler(clock=clock, sleep=clock.sleep)
+    app.running = True
+    app.start_time = clock.now
+    app.capture_loop()
+
+    assert len(app.captures) == 6
+    # A fixed 10 Hz loop would have grabbed 600 times
+    assert len(grabs) < 200
+    assert app.scheduler.skipped > 400
@@ -0,0 +1,122 @@
+import io
+import os
+import random
+
+from pptx import Presentation
+
+from conftest import slide_image
+from dedup import DuplicateDetector, hamming
+from slide_index import MultiIndexHash, SlideIndex
+
+
+def test_multi_index_hash_matches_a_linear_scan():
+    rng = random.Random(0)
+    tree = MultiIndexHash(max_distance=6)
+    hashes = [rng.getrandbits(64) for _ in range(500)]
+    # Near copies of a few hashes, 1-8 bits apart
+    for value in hashes[:50]:
+        flipped = value
+        for bit in rng.sample(range(64), rng.randint(1, 8)):
+            flipped ^= 1 << bit
+        hashes.append(flipped)
+    for item, value in enumerate(hashes):
+        tree.add(value, item)
+
+    for query in hashes[:60] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted(item for item, value in enumerate(hashes) if hamming(query, value) <= 6)
+        found = tree.search(query)
+        assert sorted(item for _, item in found) == expected
+        assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
+
+
+def encoded(index):
+    buffer = io.BytesIO()
+    slide_image(index).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_finds_earlier_slides_only():
+    detector = DuplicateDetector()
+    index = SlideIndex()
+    for number in range(5):
+        index.add(encoded(number), detector.features(slide_image(number)))
+
+    assert index.find(detector.features(slide_image(3))) is not None
+    assert index.find(detector.features(slide_image(7))) is None
+
+
+def test_persists_and_fingerprints_only_new_pictures(tmp_path):
+    detector = DuplicateDetector()
+    deck = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    for number in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_picture(io.BytesIO(encoded(number)), 0, 0)
+    prs.save(deck)
+
+    index = SlideIndex()
+    assert index.load(Presentation(deck), deck, detector.features) == 3
+
+    prs = Presentation(deck)
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_picture(io.BytesIO(encoded(3)), 0, 0)
+    fingerprinted = []
+
+    def features_for(image):
+        fingerprinted.append(image)
+        return detector.features(image)
+    reloaded = SlideIndex()
+    assert reloaded.load(prs, deck, features_for) == 1
+    assert len(fingerprinted) == 1
+    assert reloaded.find(detector.features(slide_image(0))) is not None
+
+
+def test_builds_missing_entries_alongside_captures(tmp_path):
+    detector = DuplicateDetector()
+    deck = str(tmp_path / "deck.pptx")
+    prs = Presentation()
+    for number in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        slide.shapes.add_picture(io.BytesIO(encoded(number)), 0, 0)
+    prs.save(deck)
+
+    index = SlideIndex()
+    pending = index.open(Presentation(deck), deck)
+    assert len(pending) == 3 and not index.ready
+    # A capture made while the build hasn't run yet
+    index.add(encoded(5), detector.features(slide_image(5)))
+    assert index.build(pending, detector.features) == 3
+    assert index.ready
+
+    reloaded = SlideIndex()
+    assert reloaded.open(Presentation(deck), deck) == {}
+    assert reloaded.ready
+    assert len(reloaded.entries) == 3  # The capture isn't in the saved deck
+    assert reloaded.find(detector.features(slide_image(2))) is not None
+
+
+def test_deck_without_an_index_is_indexed_in_the_background(make_app):
+    index = [0]
+
+    def grab(bbox):
+        index[0] += 1
+        return slide_image(index[0])
+
+    app = make_app(grab, video_region=(0, 0, 640, 360))
+    for _ in range(4):
+        app.toggle_capture()
+    app.shutdown()
+    os.remove(SlideIndex.index_path(app.deck_path))  # Saved before decks had an index
+
+    restarted = make_app(lambda bbox: slide_image(1), video_region=(0, 0, 640, 360))
+    with restarted.ppt_lock:
+        restarted.initialize_ppt()
+        # Nothing was fingerprinted under the lock: the deck-wide lookup waits, last-slide dedup doesn't
+        assert not restarted.slide_index.ready
+        assert not restarted.is_duplicate(slide_image(1))
+        assert restarted.is_duplicate(slide_image(4))
+    restarted.slide_index_thread.join()
+    assert restarted.slide_index.ready
+    assert restarted.is_duplicate(slide_image(1))
+    assert os.path.exists(SlideIndex.index_path(app.deck_path))
+    restarted.shutdown()
@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+import pytest
+from pptx import Presentation
+
+from batch import BatchConverter, plan_segments
+from conftest import slide_image
+from video_file import iter_video_frames, video_to_deck
+
+FPS = 10
+SIZE = (320, 180)
+
+
+def write_video(path, order, hold=3.0, fade=0.5):
+    """Write an mp4 showing slide_image(n) for each n in ``order``, cross-fading between them."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, SIZE)
+    if not writer.isOpened():
+        pytest.skip("no mp4v encoder in this OpenCV build")
+    previous = None
+    for number in order:
+        frame = cv2.cvtColor(np.asarray(slide_image(number, *SIZE)), cv2.COLOR_RGB2BGR)
+        fade_frames = int(fade * FPS) if previous is not None else 0
+        for step in range(fade_frames):
+            alpha = (step + 1) / (fade_frames + 1)
+            writer.write(cv2.addWeighted(frame, alpha, previous, 1 - alpha, 0))
+        for _ in range(int(hold * FPS) - fade_frames):
+            writer.write(frame)
+        previous = frame
+    writer.release()
+    return str(path)
+
+
+def slide_pictures(path):
+    return [slide.shapes[-1].image.sha1 for slide in Presentation(path).slides]
+
+
+def test_samples_frames_on_the_interval(tmp_path):
+    video = write_video(tmp_path / "lecture.mp4", range(2), hold=2.0)
+    seconds = [round(s, 2) for s, _ in iter_video_frames(video, interval=0.5)]
+    assert seconds == [i * 0.5 for i in range(8)]
+    assert [round(s, 2) for s, _ in iter_video_frames(video, interval=0.5, seek=True)] == seconds
+
+    _, frame = next(iter_video_frames(video, region=(10, 20, 110, 70)))
+    assert frame.size == (100, 50)
+
+
+def test_one_slide_per_shown_slide(tmp_path):
+    video = write_video(tmp_path / "lecture.mp4", range(5))
+    output = str(tmp_path / "lecture.pptx")
+    app = video_to_deck(video, output, interval=0.5, settle=True)
+    assert len(app.captures) == 5
+    assert len(Presentation(output).slides) == 5
+
+
+def test_batch_matches_a_sequential_run(tmp_path):
+    video = write_video(tmp_path / "lecture.mp4", range(8))
+    sequential = str(tmp_path / "sequential.pptx")
+    video_to_deck(video, sequential)
+
+    # 6 s segments split slides across segment boundaries
+    assert len(plan_segments(video, 1.0, 6.0)) == 4
+    converter = BatchConverter(workers=2, segment_seconds=6.0)
+    results = converter.run([video], str(tmp_path / "batch"))
+    assert slide_pictures(results[video]) == slide_pictures(sequential)
+    assert len(slide_pictures(sequential)) == 8
+
+
+def test_batch_segment_ending_on_an_earlier_slide(tmp_path):
+    # The second segment's last slide repeats slide 1, so the deck-wide
+    # index drops it and the deck's last slide is from the middle of the segment
+    video = write_video(tmp_path / "lecture.mp4", [0, 1, 2, 3, 4, 1, 5, 6, 7], fade=0)
+    sequential = str(tmp_path / "sequential.pptx")
+    video_to_deck(video, sequential)
+
+    converter = BatchConverter(workers=2, segment_seconds=9.0)
+    results = converter.run([video], str(tmp_path / "batch"))
+    assert converter.errors == {}
+    assert slide_pictures(results[video]) == slide_pictures(sequential)
+    assert len(slide_pictures(sequential)) == 8
+
+
+def test_batch_reports_failed_segments(tmp_path, monkeypatch):
+    video = write_video(tmp_path / "lecture.mp4", range(4))
+    converter = BatchConverter(workers=1, segment_seconds=6.0)
+    merge, merged = converter.merge_segment, []
+
+    def fail_second(app, candidates, output):
+        merged.append(candidates)
+        if len(merged) == 2:
+            raise ValueError("corrupt segment")
+        merge(app, candidates, output)
+    monkeypatch.setattr(converter, "merge_segment", fail_second)
+
+    results = converter.run([video], str(tmp_path / "batch"))
+    assert results == {}
+    assert converter.errors == {video: ["segment 2: corrupt segment"]}
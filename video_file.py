@@ -0,0 +1,153 @@
+"""Build a deck straight from a video file, without screen capture.
+
+Live capture needs the video playing on screen in real time. This reads the
+file with OpenCV instead, runs the sampled frames through the same duplicate
+detection as the live tool and writes the deck headlessly, so a long lecture
+converts in a fraction of its running time on a machine without a display.
+
+    python video_file.py lecture.mp4 -o lecture.pptx --interval 1.0
+"""
+import argparse
+import os
+import time
+import traceback
+
+import cv2
+from PIL import Image
+
+from video_to_ppt import VideoToPPT
+
+
+def video_info(path):
+    """Return (fps, frame count) of a video file."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    try:
+        return capture.get(cv2.CAP_PROP_FPS) or 30.0, int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+
+
+def iter_video_frames(path, interval=1.0, start=0.0, end=None, region=None, seek=False):
+    """Yield (seconds, PIL image) for one frame every ``interval`` seconds.
+
+    Frames between samples are skipped with ``grab()``, which demuxes and
+    decodes but skips the colour conversion and copy of ``retrieve()``. With
+    ``seek`` the reader jumps straight to each sample instead, which is faster
+    for sparse sampling of videos with frequent keyframes. ``region`` is an
+    optional (left, top, right, bottom) crop, as in live capture.
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video: {path}")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        step = max(1, round(interval * fps))
+        index = int(round(start * fps))
+        last = int(round(end * fps)) if end is not None else total
+        if index:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+
+        while last is None or index < last:
+            if not capture.grab():
+                break
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+
+            if region:
+                left, top, right, bottom = region
+                frame = frame[top:bottom, left:right]
+            # OpenCV decodes to BGR
+            yield index / fps, Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+            # Skip to the next sample
+            if seek:
+                index += step
+                capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                continue
+            skipped = 1
+            while skipped < step and (last is None or index + skipped < last):
+                if not capture.grab():
+                    return
+                skipped += 1
+            index += step
+    finally:
+        capture.release()
+
+
+def video_to_deck(path, output, interval=1.0, start=0.0, end=None, region=None,
+                  seek=False, app=None, settle=False):
+    """Convert ``path`` into a deck at ``output`` and return the VideoToPPT used.
+
+    With ``settle`` the frames go through the slide-change engine, which
+    waits for transitions to finish and keeps one frame per slide; sample
+    densely (an ``interval`` of 0.2-0.5 s) so it can see them settle.
+    """
+    if app is None:
+        app = VideoToPPT()
+    if app.ppt is None:
+        app.new_presentation()
+    app.slide_changes.reset()
+
+    def commit(image, features):
+        # Periodic saves are cheap appends
+        if app.commit_capture(image, features) and app.capture_count % app.save_interval == 0:
+            app.saver.save(app.ppt, output)
+
+    started = time.time()
+    sampled = 0
+    try:
+        for seconds, frame in iter_video_frames(path, interval, start, end, region, seek):
+            sampled += 1
+            features = app.duplicate_detector.features(frame)
+            if settle:
+                for candidate in app.slide_changes.feed(seconds, frame, features):
+                    commit(candidate.image, candidate.features)
+            else:
+                commit(frame, features)
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        traceback.print_exc()
+
+    if settle:
+        for candidate in app.slide_changes.flush():
+            commit(candidate.image, candidate.features)
+
+    if app.captures:
+        app.saver.save(app.ppt, output)
+    print(f"{os.path.basename(path)}: {sampled} frames sampled, {len(app.captures)} slides, "
+          f"{time.time() - started:.1f} s -> {output}")
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a video file into a PowerPoint deck.")
+    parser.add_argument("video", help="input video file")
+    parser.add_argument("-o", "--output", help="output .pptx (default: next to the video)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between sampled frames")
+    parser.add_argument("--start", type=float, default=0.0, help="start time in seconds")
+    parser.add_argument("--end", type=float, help="end time in seconds")
+    parser.add_argument("--region", help="crop as left,top,right,bottom")
+    parser.add_argument("--seek", action="store_true", help="seek to each sample instead of grabbing through")
+    parser.add_argument("--threshold", type=float, default=0.85, help="SSIM similarity threshold for duplicates")
+    parser.add_argument("--format", default="PNG", choices=["PNG", "JPEG"], help="image codec for slides")
+    parser.add_argument("--settle", action="store_true",
+                        help="wait for transitions to settle and keep the best frame per slide")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.video)[0] + ".pptx"
+    region = tuple(map(int, args.region.split(","))) if args.region else None
+
+    app = VideoToPPT()
+    app.similarity_threshold = args.threshold
+    app.image_format = args.format
+    video_to_deck(args.video, output, args.interval, args.start, args.end, region, args.seek, app,
+                  args.settle)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,315 @@
 import time
 import os
-from PIL import ImageGrab, Image
-from pynput import keyboard
-import numpy as np
-from skimage.metrics import structural_similarity as ssim
-from pptx import Presentation
-from pptx.util import Inches
-import cv2
-import tkinter as tk
-from tkinter import simpledialog
+import io
 import threading
+import queue
 import sys
 import traceback
 import shutil
+from journal import CaptureJournal, REFERENCE, REFERENCE_PAYLOAD
+from metrics import Metrics
+from scheduler import CaptureScheduler
+# PIL, numpy, pptx, OpenCV and tkinter are imported where they are used, so
+# the hotkey listener is up before they have loaded (see preload)
+
+class CaptureRecord:
+    """Compact bookkeeping for one capture - the pixels themselves aren't kept."""
+    __slots__ = ("index", "timestamp", "nbytes", "fingerprint", "thumbnail")
+    
+    def __init__(self, index, timestamp, nbytes, fingerprint, thumbnail):
+        self.index = index
+        self.timestamp = timestamp
+        self.nbytes = nbytes  # Bytes the picture added to the deck (0 when shared)
+        self.fingerprint = fingerprint  # 64-bit difference hash
+        self.thumbnail = thumbnail  # Raw grayscale bytes at dedup.THUMBNAIL_SIZE
+    
+    @classmethod
+    def from_features(cls, index, features, nbytes, timestamp=None):
+        return cls(index, timestamp or time.time(), nbytes,
+                   features.fingerprint, features.thumbnail.tobytes())
 
 class VideoToPPT:
     def __init__(self):
+        self.component_lock = threading.RLock()  # Guards building the helpers below on first use
         self.running = False
-        self.images = []
+        self.captures = []  # CaptureRecord per slide added this session
         self.ppt = None
         self.video_region = None
         self.last_image = None
+        self.last_features = None  # Dedup features of last_image
+        self.last_duplicate_result = None  # Which tier decided the last is_duplicate call
         self.similarity_threshold = 0.85  # Lowered from 0.95 to be less strict on similarity
+        self.deck_wide_dedup = True  # Also skip captures matching any earlier slide in the deck
+        self.share_media = True  # Slides showing identical pixels share one picture in the deck
+        self.settle_detection = True  # capture_loop waits for slides to settle and keeps the best frame
+        self.scheduler = CaptureScheduler()  # capture_loop's grab rate, adapted to on-screen activity
+        self.region_ring = None  # Border signature used to revalidate video_region
+        self.region_checked_at = 0
+        self.region_check_interval = 30  # Seconds between cheap checks that the player hasn't moved
+        self.region_thread = None
+        self.slide_index_thread = None  # Fingerprints slides missing from the duplicate index
+        self.pyramid_detection = True  # Coarse-to-fine detector; False runs the full-resolution one
+        self.capture_backend = "pillow"  # pillow, buffer (region grabs into reused buffers) or file (see capture.py)
+        self.capture_source = None  # Video file, image folder or callable for the file backend
         self.capture_count = 0
         self.max_capture_time = 60  # Auto-save after 60 seconds regardless
         self.start_time = 0
         self.save_interval = 5  # Save every 5 captures as backup
         self.text_detection_enabled = True  # Enable text-based comparison
+        self.capture_queue = queue.Queue(maxsize=32)  # Pending key-press captures (bounded)
+        self.capture_worker = None
+        self.ppt_lock = threading.RLock()  # Serializes slide insertion and saving
+        self.incremental_save = True  # Append new slides to the saved file instead of rewriting it
+        self.journal_enabled = True  # Journal each capture; write the deck only now and then
+        self.journal = CaptureJournal()
+        self.materialize_interval = 30  # Seconds captures may wait in the journal before the deck is saved
+        self.materialize_every = 20  # Captures between deck saves while capturing
+        self.last_materialized = time.time()
+        self.unsaved_captures = 0  # Captures only in the journal so far
+        self.image_format = "PNG"  # PNG (lossless) or JPEG (lossy, much smaller decks)
+        self.png_compress_level = 6  # 0-9: lower encodes faster, higher gives smaller files
+        self.jpeg_quality = 85  # 1-95 for JPEG captures
+        self.lazy_deck = True  # Leave existing pictures in the file when loading the deck
+        self.deck_path = "Introduction Module1.pptx"  # Output deck; its other files are kept next to it
+        self.rollover_slides = 300  # Start a new part file after this many slides (0: never)
+        self.rollover_mb = 250  # Or once the part file reaches this size in MB (0: never)
+        self.rollover_pause = 30 * 60  # Or after this many seconds without a capture (0: never)
+        self.rollover_requested = None  # Why the next capture starts a new part, e.g. a chapter break
+        self.part_path = None  # Part file captures currently go to (see deck_parts.py)
+        self.last_capture_at = None
+        self.metrics = Metrics()  # Per-stage timings; set metrics.enabled = False to turn them off
+        self.metrics.slow_log_path = None  # Captures that blew their time budget (default: <deck>.slow.log)
+        self.metrics.prometheus_path = None  # e.g. node_exporter's textfile directory + "/video_to_ppt.prom"
+        self.metrics_report_path = None  # Timing report written at exit (default: <deck>.metrics.json)
+        self.preload_thread = None
+        # Built on first use (see __getattr__): duplicate_detector, slide_index,
+        # media, slide_changes, region_cache, region_detector, saver, grabber,
+        # deck_parts
         
+    def __getattr__(self, name):
+        # The helpers' modules pull in numpy, pptx or OpenCV, so they are
+        # only built (and imported) when something first needs them
+        build = getattr(type(self), "build_" + name, None)
+        if build is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        with self.component_lock:
+            if name not in self.__dict__:
+                self.__dict__[name] = build(self)
+        return self.__dict__[name]
+    
+    def build_duplicate_detector(self):
+        from dedup import DuplicateDetector
+        return DuplicateDetector(self.similarity_threshold)
+    
+    def build_slide_index(self):
+        from slide_index import SlideIndex
+        return SlideIndex()
+    
+    def build_media(self):
+        from media import MediaStore
+        return MediaStore()
+    
+    def build_slide_changes(self):
+        from scene import SlideChangeDetector
+        return SlideChangeDetector(self.duplicate_detector)
+    
+    def build_region_cache(self):
+        from region_cache import RegionCache
+        return RegionCache()  # Detected regions remembered across runs
+    
+    def build_region_detector(self):
+        from region_detect import PyramidRegionDetector
+        return PyramidRegionDetector()
+    
+    def build_saver(self):
+        from incremental_save import IncrementalSaver
+        saver = IncrementalSaver(release_media=True)  # Picture bytes live in the saved file, not RAM
+        saver.fsync = True  # The journal is emptied right after a deck save, so the save must be on disk
+        return saver
+    
+    def build_deck_parts(self):
+        from deck_parts import DeckParts
+        return DeckParts(self.deck_path)
+    
+    def build_grabber(self):
+        from capture import PillowBackend, create_backend
+        options = {"source": self.capture_source} if self.capture_backend == "file" else {}
+        try:
+            return create_backend(self.capture_backend, **options)
+        except ImportError as e:
+            print(f"Capture backend {self.capture_backend!r} unavailable ({e}) - using Pillow")
+            return PillowBackend()
+    
+    def preload(self):
+        """Import the capture pipeline and open the deck in the background, after startup."""
+        self.preload_thread = threading.Thread(target=self.preload_deck, name="preload", daemon=True)
+        self.preload_thread.start()
+    
+    def preload_deck(self):
+        try:
+            started = time.time()
+            with self.ppt_lock:
+                if not self.ppt:
+                    self.initialize_ppt()
+            # Build what the first capture needs, so it doesn't wait on imports
+            for name in ("duplicate_detector", "media", "slide_index", "saver", "grabber"):
+                getattr(self, name)
+            print(f"Deck ready ({time.time() - started:.2f} s)")
+        except Exception as e:
+            print(f"Error preloading deck: {e}")
+            traceback.print_exc()
+    
     def toggle_capture(self):
         """Take a single screenshot instead of continuous capturing."""
         try:
-            # Initialize ppt if not already done
-            if not self.ppt:
-                self.initialize_ppt()
-                
-            # Detect video region if not already done    
-            if not self.video_region:
-                self.detect_video_region()
-            
-            # Take a single screenshot
-            print("Taking screenshot...")
-            screenshot = ImageGrab.grab(bbox=self.video_region)
-            
-            # Add screenshot to presentation (no duplicate check)
-            self.add_to_presentation(screenshot)
-            
-            # Save immediately
-            self.save_ppt(final=True)
+            self.metrics.begin_capture("capture")
+            with self.ppt_lock:
+                self.process_capture(None)
             print("Screenshot captured and saved to PowerPoint.")
             
         except Exception as e:
             print(f"Error capturing screenshot: {e}")
             traceback.print_exc()
             self.emergency_save()
+        finally:
+            self.metrics.end_capture()
+            self.metrics.write_prometheus()
+    
+    def request_capture(self):
+        """Grab a frame on the caller's thread and hand it to the capture worker.
+        
+        Only the screen grab happens here, so the keyboard listener is never
+        blocked by encoding or saving no matter how big the deck gets.
+        """
+        from capture import retain
+        requested_at = time.time()
+        self.start_worker()
+        
+        # Until the region is known the worker has to detect it first,
+        # so just queue the request timestamp
+        screenshot = None
+        if self.video_region:
+            # Queued frames outlive the grab buffer they came in
+            with self.metrics.stage("grab"):
+                screenshot = retain(self.grabber.grab(self.video_region))
+            
+        try:
+            self.capture_queue.put_nowait((requested_at, screenshot, time.time()))
+        except queue.Full:
+            print(f"Capture queue full ({self.capture_queue.maxsize} pending) - dropping this capture")
+            return False
+            
+        print(f"Capture queued ({self.capture_queue.qsize()} pending, "
+              f"{(time.time() - requested_at) * 1000:.0f} ms)")
+        return True
+    
+    def start_worker(self):
+        """Start the background capture worker if it isn't running yet."""
+        if self.capture_worker and self.capture_worker.is_alive():
+            return
+        self.capture_worker = threading.Thread(target=self.capture_worker_loop,
+                                               name="capture-worker", daemon=True)
+        self.capture_worker.start()
+    
+    def capture_worker_loop(self):
+        """Consume queued captures: insert slides and save."""
+        while True:
+            try:
+                # Wake up when a capture arrives, or when the deck is due to be written
+                item = self.capture_queue.get(timeout=self.materialize_interval)
+            except queue.Empty:
+                self.materialize()
+                continue
+            try:
+                # None is the shutdown sentinel, queued behind any pending captures
+                if item is None:
+                    return
+                    
+                requested_at, screenshot, queued_at = item
+                self.metrics.begin_capture("capture")
+                self.metrics.record("queue_wait", time.time() - queued_at)
+                with self.ppt_lock:
+                    self.process_capture(screenshot)
+                    
+                    # Coalesce saves during bursts - the last capture in the
+                    # burst makes everything queued before it durable
+                    if self.capture_queue.empty():
+                        self.checkpoint()
+                        
+                print(f"Capture done in {time.time() - requested_at:.2f} s since key press")
+                
+            except Exception as e:
+                print(f"Error in capture worker: {e}")
+                traceback.print_exc()
+                self.emergency_save()
+            finally:
+                self.metrics.end_capture()
+                self.metrics.write_prometheus()
+                self.capture_queue.task_done()
+    
+    def process_capture(self, screenshot):
+        """Add one capture to the presentation, grabbing it first if needed."""
+        # Initialize ppt if not already done
+        if not self.ppt:
+            self.initialize_ppt()
+            
+        # Detect video region if not already done    
+        with self.metrics.stage("region"):
+            if not self.video_region:
+                self.detect_video_region()
+            else:
+                self.check_region()
+        
+        # Take a single screenshot
+        if screenshot is None:
+            print("Taking screenshot...")
+            with self.metrics.stage("grab"):
+                screenshot = self.grabber.grab(self.video_region)
+        
+        # Add screenshot to presentation (no duplicate check)
+        self.add_to_presentation(screenshot)
+        
+        # Save immediately unless the worker is coalescing saves
+        if threading.current_thread() is not self.capture_worker:
+            self.checkpoint()
+    
+    def checkpoint(self):
+        """Make the captures so far durable: fsync the journal, and write the deck when it's due."""
+        if self.journal_enabled and self.journal.file is not None:
+            self.journal.sync()
+            due = (self.unsaved_captures >= self.materialize_every
+                   or time.time() - self.last_materialized >= self.materialize_interval)
+            if not due:
+                return True
+        return self.save_ppt(final=True)
+    
+    def materialize(self):
+        """Write the deck if captures have waited in the journal for ``materialize_interval``."""
+        try:
+            with self.ppt_lock:
+                if self.unsaved_captures and self.journal.file is not None:
+                    self.checkpoint()
+        except Exception as e:
+            print(f"Error saving journaled captures: {e}")
+            traceback.print_exc()
+    
+    def shutdown(self):
+        """Drain pending captures, stop the worker and do a final save."""
+        if self.capture_worker and self.capture_worker.is_alive():
+            pending = self.capture_queue.qsize()
+            if pending:
+                print(f"Finishing {pending} pending capture(s)...")
+            self.capture_queue.put(None)
+            self.capture_worker.join()
+        self.capture_worker = None
+        
+        with self.ppt_lock:
+            self.save_ppt(final=True)
+            self.journal.close()
+        if "grabber" in self.__dict__:
+            self.grabber.close()
+        self.metrics.write_prometheus(force=True)
+        self.metrics.write_report(self.metrics_report_path or self.session_file(".metrics.json"))
     
     def auto_timeout(self):
         """Automatically stop capture after max_capture_time."""
@@ -73,16 +329,82 @@ class VideoToPPT:
             
     def initialize_ppt(self):
         """Initialize the PowerPoint presentation - load existing if available, preserving user edits."""
+        if self.part_path is None:
+            # Pick up the session where it left off: the last part in the manifest
+            self.part_path = self.deck_parts.load()
+            self.last_capture_at = self.deck_parts.last_activity
+            if self.metrics.slow_log_path is None:
+                self.metrics.slow_log_path = self.session_file(".slow.log")
+        main_filename = self.part_path
+        records = self.recover_journal(main_filename)
+        self.load_deck(main_filename)
+        self.load_last_slide()
+        self.load_slide_index(main_filename)
+        self.replay_journal(records)
+        if self.deck_parts.current["slides"] != len(self.ppt.slides):
+            self.deck_parts.record(len(self.ppt.slides))
+    
+    def part_variant(self, suffix):
+        """The current part's path with ``suffix`` before the extension, e.g. "_TEMP"."""
+        base, ext = os.path.splitext(self.part_path or self.deck_path)
+        return base + suffix + ext
+    
+    def session_file(self, extension):
+        """A file kept next to the deck for the whole session, e.g. ".metrics.json"."""
+        return os.path.splitext(self.deck_path)[0] + extension
+    
+    def maybe_roll_over(self):
+        """Start a new part file before this capture if the current one is full, or after a long pause."""
+        if not self.ppt or self.part_path is None:
+            return
+        reason, self.rollover_requested = self.rollover_requested, None
+        slides = len(self.ppt.slides)
+        if not slides:
+            return
+        if reason is None:
+            now = time.time()
+            if self.rollover_slides and slides >= self.rollover_slides:
+                reason = f"{slides} slides"
+            elif (self.rollover_mb and os.path.exists(self.part_path)
+                  and os.path.getsize(self.part_path) >= self.rollover_mb * 1e6):
+                reason = f"over {self.rollover_mb} MB"
+            elif self.rollover_pause and self.last_capture_at and now - self.last_capture_at >= self.rollover_pause:
+                reason = f"paused {(now - self.last_capture_at) / 60:.1f} min"
+        if reason:
+            self.roll_over(reason)
+    
+    def roll_over(self, reason):
+        """Finish the current part file and continue capturing into a new one."""
+        with self.ppt_lock:
+            self.save_ppt(final=True)
+            # Never leave journaled captures behind in a part that won't be loaded again
+            if self.unsaved_captures:
+                print(f"Could not finish {self.part_path} - continuing in it")
+                return False
+            self.journal.close()
+            self.part_path = self.deck_parts.start_next(reason)
+            print(f"Starting a new part ({reason}): {self.part_path}")
+            self.ppt = None
+            self.initialize_ppt()
+            return True
+    
+    def request_new_part(self, reason="chapter break"):
+        """Make the next capture start a new part file."""
+        self.rollover_requested = reason
+        print("The next capture starts a new part file")
+    
+    def load_deck(self, main_filename):
+        """Load the main deck, else the temp copy, else start a new one."""
         try:
-            main_filename = "Introduction Module1.pptx"
-            temp_filename = "Introduction Module1_TEMP.pptx"
-            backup_filename = "Introduction Module1_BACKUP.pptx"
+            temp_filename = self.part_variant("_TEMP")
             
             # First try to load the main file
             if os.path.exists(main_filename):
                 try:
                     print(f"Loading existing presentation: {main_filename}")
-                    self.ppt = Presentation(main_filename)
+                    self.ppt = self.open_deck(main_filename)
+                    self.saver.adopt(self.ppt, main_filename)
+                    self.media.adopt(self.ppt)
                     existing_slides = len(self.ppt.slides)
                     print(f"Found {existing_slides} existing slides")
                     return
@@ -93,44 +415,270 @@ class VideoToPPT:
             if os.path.exists(temp_filename):
                 try:
                     print(f"Loading temp file: {temp_filename}")
-                    self.ppt = Presentation(temp_filename)
+                    self.ppt = self.open_deck(temp_filename)
+                    self.media.adopt(self.ppt)
                     return
                 except:
                     print("Could not load temp file")
                     
             # Create new presentation if no existing files found
             print("Creating new presentation")
-            self.ppt = Presentation()
-            self.ppt.slide_width = Inches(13.33)  # Widescreen 16:9
-            self.ppt.slide_height = Inches(7.5)
+            self.new_presentation()
             
         except Exception as e:
             print(f"Error initializing PowerPoint: {e}")
             traceback.print_exc()
-            self.ppt = Presentation()
-            self.ppt.slide_width = Inches(13.33)
-            self.ppt.slide_height = Inches(7.5)
+            self.new_presentation()
+    
+    def load_last_slide(self):
+        """Fingerprint the deck's last picture, so the first capture is checked against it."""
+        if self.last_features is not None or not len(self.ppt.slides):
+            return
+        try:
+            from PIL import Image
+            slide = self.ppt.slides[len(self.ppt.slides) - 1]
+            for rel in slide.part.rels.values():
+                if not rel.is_external and rel.reltype.endswith("/image"):
+                    picture = Image.open(io.BytesIO(rel.target_part.blob))
+                    self.last_features = self.duplicate_detector.features(picture)
+                    return
+        except Exception as e:
+            print(f"Could not read the last slide: {e}")
+    
+    def open_deck(self, filename):
+        """Open a saved deck; with lazy_deck its pictures stay in the file until needed."""
+        if self.lazy_deck:
+            from deck_loader import open_presentation
+            return open_presentation(filename)
+        from pptx import Presentation
+        return Presentation(filename)
+    
+    def recover_journal(self, deck_filename):
+        """Read the capture journal left by an earlier session, repairing the deck if a save was torn."""
+        if not self.journal_enabled:
+            return []
+        try:
+            return self.journal.recover(deck_filename)
+        except Exception as e:
+            print(f"Error reading capture journal: {e}")
+            traceback.print_exc()
+            return []
+    
+    def replay_journal(self, records):
+        """Add journaled captures missing from the loaded deck, then start journaling."""
+        from PIL import Image
+        if not self.journal_enabled:
+            return
+        try:
+            replayed = 0
+            for record in records:
+                # Slides up to the end of the deck were saved before the crash
+                if record.slide_number <= len(self.ppt.slides):
+                    continue
+                blob = record.payload
+                if record.kind == REFERENCE:
+                    part = self.media.by_content.get(REFERENCE_PAYLOAD.unpack(blob))
+                    if part is None:
+                        print(f"Journal refers to a picture that is gone - skipping slide {record.slide_number}")
+                        continue
+                    blob = part.blob
+                features = self.duplicate_detector.features(Image.open(io.BytesIO(blob)))
+                self.add_encoded_to_presentation(io.BytesIO(blob), features)
+                replayed += 1
+            
+            if replayed:
+                print(f"Recovered {replayed} capture(s) from the journal")
+                self.save_ppt(final=True)
+            elif records:
+                self.journal.reset()
+        except Exception as e:
+            print(f"Error replaying capture journal: {e}")
+            traceback.print_exc()
+        
+        try:
+            self.journal.open()
+        except OSError as e:
+            print(f"Could not open capture journal, saving the deck after every capture: {e}")
+    
+    def load_slide_index(self, deck_filename):
+        """Load the deck-wide duplicate index kept next to the deck.
+        
+        Slides it doesn't know yet (a deck saved before the index existed, or
+        slides added in PowerPoint) are fingerprinted on a background thread,
+        outside ppt_lock; until that's done captures are only compared with
+        the previous slide.
+        """
+        if not self.deck_wide_dedup:
+            return
+        try:
+            pending = self.slide_index.open(self.ppt, deck_filename)
+        except Exception as e:
+            print(f"Error loading slide index: {e}")
+            traceback.print_exc()
+            return
+        if pending:
+            print(f"Fingerprinting {len(pending)} slide(s) not yet in the duplicate index in the background")
+            self.slide_index_thread = threading.Thread(target=self.index_slides,
+                                                       args=(pending, self.duplicate_detector.features),
+                                                       name="slide-index", daemon=True)
+            self.slide_index_thread.start()
+    
+    def index_slides(self, pending, features_for):
+        """Fingerprint the slides missing from the duplicate index (on slide_index_thread)."""
+        def read_blob(part):
+            # Only the read needs the lock: a save may be rewriting the file the picture is in
+            with self.ppt_lock:
+                return part.blob
+        try:
+            started = time.time()
+            added = self.slide_index.build(pending, features_for, read_blob)
+            print(f"Fingerprinted {added} slide(s) for the duplicate index ({time.time() - started:.1f} s)")
+        except Exception as e:
+            print(f"Error building slide index: {e}")
+            traceback.print_exc()
+    
+    def new_presentation(self):
+        """Start an empty widescreen presentation."""
+        from pptx import Presentation
+        from pptx.util import Inches
+        self.ppt = Presentation()
+        self.ppt.slide_width = Inches(13.33)  # Widescreen 16:9
+        self.ppt.slide_height = Inches(7.5)
+        self.media.adopt(self.ppt)
+    
+    def prepare_region(self):
+        """Check the cached video region in the background, before the first capture."""
+        self.region_thread = threading.Thread(target=self.load_cached_region,
+                                              name="region-cache", daemon=True)
+        self.region_thread.start()
+    
+    def load_cached_region(self):
+        """Use the cached region for this screen if its surroundings still match.
+        
+        Nothing is detected here otherwise: at launch the screen usually still
+        shows the terminal the tool was started from, so detection waits for
+        the first capture (and its positioning pause).
+        """
+        from region_cache import layout_signature
+        try:
+            screen = self.grabber.grab(None)
+            cached = self.region_cache.lookup(screen.size, layout_signature())
+            if not cached:
+                print("No cached video region for this screen - will detect on first capture")
+                return
+                
+            region, ring = cached
+            # Without a border signature (region touches the screen edge) there's nothing to compare
+            if ring is None or self.region_cache.matches(ring, screen, region):
+                self.video_region, self.region_ring = region, ring
+                self.region_checked_at = time.time()
+                print(f"Using cached video region: {region}")
+            else:
+                print("Cached video region no longer matches the screen - will detect on first capture")
+        except Exception as e:
+            print(f"Error checking cached video region: {e}")
     
     def detect_video_region(self):
         """Detect the video region on screen."""
+        from capture import retain
+        # The startup cache check may already have found it
+        if self.region_thread:
+            self.region_thread.join()
+            self.region_thread = None
+            if self.video_region:
+                return
+        
         print("Detecting video region...")
         print("Please ensure your video is clearly visible on screen.")
         time.sleep(2)  # Give user time to position video
         
-        # First try automatic detection
-        self.video_region = self.auto_detect_video()
+        # First try automatic detection; the screen is kept for the region cache
+        screen = retain(self.grabber.grab(None))
+        self.video_region = self.auto_detect_video(screen)
         
         # If automatic detection fails or results are poor, offer manual entry
         if not self.video_region:
             self.video_region = self.manual_region_entry()
             
         print(f"Final video region: {self.video_region}")
+        self.remember_region(screen)
     
-    def auto_detect_video(self):
+    def remember_region(self, screen):
+        """Store video_region in the region cache, with its border signature from screen."""
+        from region_cache import layout_signature
+        try:
+            self.region_ring = self.region_cache.store(screen.size, self.video_region, screen, layout_signature())
+            self.region_checked_at = time.time()
+        except Exception as e:
+            print(f"Error caching video region: {e}")
+    
+    def check_region(self):
+        """Cheaply check that the player hasn't moved; re-detect in the background if it has."""
+        if self.region_ring is None or time.time() - self.region_checked_at < self.region_check_interval:
+            return
+        self.region_checked_at = time.time()
+        
+        # Just the region plus its thin border ring, not the whole screen
+        box = self.region_cache.expanded(self.video_region)
+        try:
+            around = self.grabber.grab(box)
+            if self.region_cache.matches(self.region_ring, around, self.video_region, origin=box[:2]):
+                return
+        except Exception as e:
+            print(f"Error checking video region: {e}")
+            return
+            
+        print("Video region seems to have moved - re-detecting in the background")
+        self.refresh_region()
+    
+    def refresh_region(self):
+        """Re-run full detection in the background; captures keep the old region meanwhile."""
+        if self.region_thread and self.region_thread.is_alive():
+            return
+        self.region_thread = threading.Thread(target=self.redetect_region,
+                                              name="region-detect", daemon=True)
+        self.region_thread.start()
+    
+    def redetect_region(self):
+        """Run full detection on a fresh grab and switch to the region it finds."""
+        from capture import retain
+        try:
+            screen = retain(self.grabber.grab(None))
+            region = self.auto_detect_video(screen)
+            if region and region != self.video_region:
+                self.video_region = region
+                self.slide_changes.reset()
+                print(f"Video region updated: {region}")
+            if region:
+                self.remember_region(screen)
+        except Exception as e:
+            print(f"Error re-detecting video region: {e}")
+    
+    def auto_detect_video(self, screen=None):
         """Automatically detect video region using computer vision with focus on web video players."""
+        if not self.pyramid_detection:
+            return self.auto_detect_video_full(screen)
+            
+        try:
+            if screen is None:
+                screen = self.grabber.grab(None)
+            region = self.region_detector.detect(screen)
+            if region:
+                print(f"Video region auto-detected: {region}")
+            return region
+        except Exception as e:
+            print(f"Error in auto detection: {e}")
+            return None
+    
+    def auto_detect_video_full(self, screen=None):
+        """Single-scale detector: full-resolution edges and per-contour polygon scoring."""
+        import cv2
+        import numpy as np
         try:
             # Take a full screenshot for processing
-            screen = np.array(ImageGrab.grab())
+            if screen is None:
+                screen = self.grabber.grab(None)
+            screen = np.array(screen)
             screen_size = (screen.shape[1], screen.shape[0])
             
             # Convert to different color spaces for better detection
@@ -259,11 +807,13 @@ class VideoToPPT:
     
     def manual_region_entry(self):
         """Allow manual entry of video region coordinates."""
+        import tkinter as tk
+        from tkinter import simpledialog
         print("\nAutomatic detection failed or produced suboptimal results.")
         print("Please enter the video region coordinates manually.")
         
         # Get screen dimensions for reference
-        screen_size = ImageGrab.grab().size
+        screen_size = self.grabber.grab(None).size
         print(f"Your screen size is: {screen_size[0]}x{screen_size[1]}")
         
         try:
@@ -292,33 +842,54 @@ class VideoToPPT:
             
         except Exception as e:
             print(f"Error in manual entry: {e}")
-            screen_size = ImageGrab.grab().size
+            screen_size = self.grabber.grab(None).size
             return (0, 0, screen_size[0], screen_size[1])
     
     def capture_loop(self):
         """Continuously capture screenshots while running."""
         try:
+            if not self.ppt:
+                self.initialize_ppt()
+            self.slide_changes.reset()
+            self.scheduler.reset()
             while self.running:
                 # Capture the video region
-                screenshot = ImageGrab.grab(bbox=self.video_region)
+                started = self.scheduler.clock()
+                self.metrics.begin_capture("frame")
+                with self.metrics.stage("grab"):
+                    screenshot = self.grabber.grab(self.video_region)
+                with self.metrics.stage("dedup"):
+                    features = self.duplicate_detector.features(screenshot)
                 
-                # Check if this image is similar to the last one
-                if not self.is_duplicate(screenshot):
-                    self.add_to_presentation(screenshot)
-                    self.capture_count += 1
-                    
-                    # Save periodically as backup
-                    if self.capture_count % self.save_interval == 0:
-                        self.save_ppt(final=False)
+                if self.settle_detection:
+                    # Only settled slides come out, one representative frame each
+                    with self.metrics.stage("dedup"):
+                        candidates = self.slide_changes.feed(started, screenshot, features)
+                    for candidate in candidates:
+                        self.commit_capture(candidate.image, candidate.features)
+                    changing = self.slide_changes.changing_since is not None
+                    moving = self.slide_changes.moving
+                else:
+                    changing = moving = self.commit_capture(screenshot, features)
+                # A static screen adds no captures, but the journaled ones still get saved on time
+                self.materialize()
+                self.metrics.end_capture()
+                self.metrics.write_prometheus()
                 
                 # Check if we should auto-stop
-                elapsed = time.time() - self.start_time
+                elapsed = self.scheduler.clock() - self.start_time
                 if elapsed > self.max_capture_time:
                     print(f"\nAUTO-TIMEOUT: Capture ran for {elapsed:.1f} seconds")
                     self.running = False
                     break
                     
-                time.sleep(0.1)  # Capture frequency as needed
+                # Grab faster while the screen changes, back off while it doesn't
+                self.scheduler.wait(changing, self.scheduler.clock() - started, moving)
+                
+            # The last slide is still held back waiting for the next one
+            if self.settle_detection:
+                for candidate in self.slide_changes.flush():
+                    self.commit_capture(candidate.image, candidate.features)
                 
             # Final save when loop exits
             if not self.running:
@@ -329,76 +900,199 @@ class VideoToPPT:
             traceback.print_exc()
             self.emergency_save()
     
-    def is_duplicate(self, new_image):
-        """Check if the new image is too similar to the last captured image."""
-        if not self.last_image:
+    def commit_capture(self, image, features):
+        """Add a capture unless it duplicates the last slide; returns True if added."""
+        # Check if this image is similar to the last one
+        with self.metrics.stage("dedup"):
+            duplicate = self.is_duplicate(image, features)
+        if duplicate:
             return False
             
-        try:
-            # Convert images to numpy arrays for comparison
-            new_array = np.array(new_image)
-            last_array = np.array(self.last_image)
+        self.add_to_presentation(image, features)
+        self.capture_count += 1
+        
+        # Sync the journal; the deck itself is written when it's due
+        if self.journal.file is not None:
+            self.checkpoint()
+        elif self.capture_count % self.save_interval == 0:
+            self.save_ppt(final=False)
+        return True
+    
+    def is_duplicate(self, new_image, features=None):
+        """Check if the new image is too similar to the last captured image (or any slide in the deck)."""
+        from dedup import DuplicateResult
+        deck_wide = self.deck_wide_dedup and self.slide_index.ready  # Not until the index is built
+        if self.last_features is None and not (deck_wide and len(self.slide_index.hashes)):
+            return False
             
-            # Ensure both images are the same size
-            if new_array.shape != last_array.shape:
-                return False
-                
-            # Calculate structural similarity index
-            similarity = ssim(new_array, last_array, multichannel=True)
+        try:
+            # Cheap hash test first, downscaled SSIM only when that is unsure
+            self.duplicate_detector.similarity_threshold = self.similarity_threshold
+            if features is None:
+                features = self.duplicate_detector.features(new_image)
+            if self.last_features is not None:
+                self.last_duplicate_result = self.duplicate_detector.compare(features, self.last_features)
+                if self.last_duplicate_result.is_duplicate:
+                    return True
             
-            # If similarity is above threshold, consider it a duplicate
-            return similarity > self.similarity_threshold
+            # A slide shown earlier, e.g. the lecturer flipped back
+            if deck_wide:
+                match = self.slide_index.find(features)
+                if match:
+                    self.last_duplicate_result = DuplicateResult(True, "index", match[0])
+                    return True
+            return False
             
         except Exception as e:
             print(f"Error in duplicate detection: {e}")
             return False
     
-    def add_to_presentation(self, image):
+    def encode_image(self, image):
+        """Encode a capture with the configured codec into an in-memory buffer."""
+        buffer = io.BytesIO()
+        image_format = self.image_format.upper()
+        
+        if image_format in ("JPEG", "JPG"):
+            # JPEG has no alpha channel
+            if image.mode not in ("RGB", "RGBX"):
+                image = image.convert("RGB")
+            image.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=False)
+        elif image_format == "PNG":
+            # Frames from the buffered capture backends are RGBX, which PNG can't store
+            if image.mode not in ("RGB", "RGBA", "L"):
+                image = image.convert("RGB")
+            image.save(buffer, format="PNG", compress_level=self.png_compress_level)
+        else:
+            raise ValueError(f"Unsupported image format: {self.image_format} (use PNG or JPEG)")
+            
+        buffer.seek(0)
+        return buffer
+    
+    def add_to_presentation(self, image, features=None):
         """Add the captured image to PowerPoint presentation."""
+        from media import pixel_key
         try:
-            # Save image temporarily
-            temp_path = 'temp_screenshot.png'
-            image.save(temp_path)
-            
-            # Add a new slide
-            slide_layout = self.ppt.slide_layouts[5]  # Blank layout
-            slide = self.ppt.slides.add_slide(slide_layout)
-            
-            # Add the image to completely fill the slide (no margins)
-            left = Inches(0)
-            top = Inches(0)
-            width = self.ppt.slide_width
-            height = self.ppt.slide_height
-            
-            slide.shapes.add_picture(temp_path, left, top, width, height)
-            
-            # Add to our collection
-            self.images.append(image)
-            self.last_image = image
-            print(f"Added image {len(self.images)} to presentation (full-slide size)")
-            
-            # Save backup after first capture
-            if len(self.images) == 1:
-                self.save_ppt(final=False)
+            self.maybe_roll_over()
+            with self.metrics.stage("dedup"):
+                if features is None:
+                    features = self.duplicate_detector.features(image)
+                
+                # Pixels already in the deck: reuse that picture, no need to encode again
+                key = part = None
+                if self.share_media:
+                    key = pixel_key(image)
+                    part = self.media.find(key)
+            if part is not None:
+                with self.metrics.stage("insert"):
+                    self.add_part_to_presentation(part, features, 0, image)
+                return
+            
+            # Encode in memory - no temp file round-trip
+            with self.metrics.stage("encode"):
+                encoded = self.encode_image(image)
+            with self.metrics.stage("insert"):
+                self.add_encoded_to_presentation(encoded, features, image, key)
                 
         except Exception as e:
             print(f"Error adding to presentation: {e}")
             traceback.print_exc()
     
+    def add_encoded_to_presentation(self, encoded, features, image=None, key=None):
+        """Add an already encoded capture (file-like object) as a full-slide picture."""
+        if not self.share_media:
+            self.add_part_to_presentation(encoded, features, encoded.getbuffer().nbytes, image)
+            return
+        
+        blob = encoded.getvalue()
+        part, existing = self.media.get_or_add(blob, key)
+        self.add_part_to_presentation(part, features, 0 if existing else len(blob), image)
+        if self.deck_wide_dedup:
+            self.slide_index.add(blob, features)
+    
+    def add_part_to_presentation(self, picture, features, nbytes, image=None):
+        """Add a full-slide picture: a media part from ``self.media`` or an encoded file-like object."""
+        from pptx.util import Inches
+        from capture import retain
+        # Add a new slide
+        slide_layout = self.ppt.slide_layouts[5]  # Blank layout
+        slide = self.ppt.slides.add_slide(slide_layout)
+        
+        # Add the image to completely fill the slide (no margins)
+        left = Inches(0)
+        top = Inches(0)
+        width = self.ppt.slide_width
+        height = self.ppt.slide_height
+        
+        if self.share_media:
+            self.media.add_picture(slide, picture, left, top, width, height)
+        else:
+            slide.shapes.add_picture(picture, left, top, width, height)
+            if self.deck_wide_dedup:
+                self.slide_index.add(picture.getvalue(), features)
+        self.journal_capture(picture, nbytes, len(self.ppt.slides))
+        self.unsaved_captures += 1
+        self.last_capture_at = time.time()
+        
+        # Keep only a compact record; the last frame is kept for duplicate checks
+        record = CaptureRecord.from_features(len(self.captures) + 1, features, nbytes)
+        self.captures.append(record)
+        self.last_image = retain(image) if image is not None else None
+        self.last_features = features
+        shared = " (shared picture)" if self.share_media and not nbytes else ""
+        print(f"Added image {record.index} to presentation (full-slide size){shared}")
+        
+        # Save backup after first capture
+        if len(self.captures) == 1:
+            self.save_ppt(final=False)
+    
+    def journal_capture(self, picture, nbytes, slide_number):
+        """Record a new slide's picture - or which existing picture it shows - in the journal."""
+        from media import content_key
+        try:
+            with self.metrics.stage("journal") as timer:
+                if not self.share_media:
+                    timer.nbytes = self.journal.add_picture(slide_number, picture.getvalue())
+                elif nbytes:
+                    timer.nbytes = self.journal.add_picture(slide_number, picture.blob)
+                else:
+                    timer.nbytes = self.journal.add_reference(slide_number, content_key(picture))
+        except OSError as e:
+            print(f"Could not write capture journal: {e}")
+    
     def save_ppt(self, final=True):
         """Save the PowerPoint presentation while preserving user edits."""
         if not self.ppt:
             return False
         
         try:
-            main_filename = "Introduction Module1.pptx"
-            temp_filename = "Introduction Module1_TEMP.pptx"
+            main_filename = self.part_path or self.deck_path
+            temp_filename = self.part_variant("_TEMP")
             
             if final:
                 try:
                     # Try to save directly to main file
-                    self.ppt.save(main_filename)
-                    print(f"Saved to {main_filename}")
+                    save_start = time.time()
+                    size_before = os.path.getsize(main_filename) if os.path.exists(main_filename) else 0
+                    with self.metrics.stage("save") as timer:
+                        if self.journal.file is not None and size_before:
+                            # Lets the next start undo an append torn by a crash
+                            self.journal.checkpoint(size_before)
+                        if self.incremental_save:
+                            mode = self.saver.save(self.ppt, main_filename)
+                        else:
+                            self.ppt.save(main_filename)
+                            mode = "full"
+                        # An append only adds to the end; a full save writes the whole file
+                        size_after = os.path.getsize(main_filename)
+                        timer.nbytes = size_after - size_before if mode == "append" else size_after
+                    print(f"Saved to {main_filename} ({mode} save, {time.time() - save_start:.2f} s)")
+                    
+                    # Everything journaled is in the deck now
+                    self.journal.reset()
+                    self.unsaved_captures = 0
+                    self.last_materialized = time.time()
+                    if self.part_path:
+                        self.deck_parts.record(len(self.ppt.slides))
                     
                     # Clean up temp file if it exists
                     if os.path.exists(temp_filename):
@@ -414,13 +1108,6 @@ class VideoToPPT:
                     print(f"Changes saved to: {temp_filename}")
                     print("Close PowerPoint and copy this temp file over the original")
                 
-            # Clean up temp screenshot if it exists
-            if os.path.exists('temp_screenshot.png'):
-                try:
-                    os.remove('temp_screenshot.png')
-                except:
-                    pass
-                
             return True
             
         except Exception as e:
@@ -432,10 +1119,16 @@ class VideoToPPT:
         """Last resort save attempt if something goes wrong."""
         try:
             print("\n!!! EMERGENCY SAVE ATTEMPT !!!")
-            if self.ppt and self.images:
+            # Journaled captures are recovered into the deck on the next start
+            try:
+                self.journal.sync()
+            except:
+                pass
+            if self.ppt and self.captures:
                 try:
-                    self.ppt.save("Introduction Module1_EMERGENCY.pptx")
-                    print("Emergency save successful: Introduction Module1_EMERGENCY.pptx")
+                    emergency_filename = self.part_variant("_EMERGENCY")
+                    self.ppt.save(emergency_filename)
+                    print(f"Emergency save successful: {emergency_filename}")
                 except:
                     pass
                     
@@ -471,19 +1164,28 @@ def on_key_release(key):
         # Check for END key
         if key == keyboard.Key.end:
             print("END key pressed - taking a screenshot")
-            app.toggle_capture()
+            app.request_capture()
         # Alternative key: F12
         elif key == keyboard.Key.f12:
             print("F12 key pressed - taking a screenshot")
-            app.toggle_capture()
+            app.request_capture()
         # Alternative key: pressing 'p'
         elif hasattr(key, 'char') and key.char == 'p':
             print("'p' key pressed - taking a screenshot")
-            app.toggle_capture()
+            app.request_capture()
+        # Re-detect the video region (e.g. after moving the browser)
+        elif hasattr(key, 'char') and key.char == 'r':
+            print("'r' key pressed - re-detecting video region")
+            app.refresh_region()
+        # Chapter break: the next capture goes into a new part file
+        elif hasattr(key, 'char') and key.char == 'n':
+            print("'n' key pressed - starting a new part")
+            app.request_new_part()
         # Exit on ESC
         elif key == keyboard.Key.esc:
             print("ESC key pressed - exiting program")
-            # Stop the listener
+            # Finish queued captures before stopping the listener
+            app.shutdown()
             return False
     except Exception as e:
         print(f"Error handling key: {e}")
@@ -492,6 +1194,15 @@ def on_key_release(key):
         
     return True
 
+def listen_for_keys(target):
+    """Handle hotkeys until ESC, sending them to ``target``: a VideoToPPT, or a control.RemoteApp."""
+    global app, listener, keyboard
+    # Imported here since pynput needs a display, and the module is also used headless
+    from pynput import keyboard
+    app = target
+    with keyboard.Listener(on_release=on_key_release) as listener:
+        listener.join()
+
 def emergency_exit_handler():
     global app
     if app and app.running:
@@ -510,15 +1221,19 @@ if __name__ == "__main__":
         import atexit
         atexit.register(emergency_exit_handler)
         
+        # Check the cached video region and open the deck while the user gets ready
+        app.prepare_region()
+        app.preload()
+        
         print("Video to PowerPoint Screenshot Tool")
         print("===================================")
         print("Press END, F12, or 'p' key to take a screenshot")
+        print("Press 'r' to re-detect the video region")
+        print("Press 'n' to start a new part file (chapter break)")
         print("Each key press captures one screenshot")
         print("Press ESC to exit the program")
         
-        # Start listening for key presses
-        with keyboard.Listener(on_release=on_key_release) as listener:
-            listener.join()
+        listen_for_keys(app)
             
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")